@@ -0,0 +1,79 @@
+"""
+Benchmark notebook execution time with and without a BytecodeCache
+
+    python benchmarks/bytecode_cache.py --n-cells 300 --n-runs 5
+"""
+
+import tempfile
+from time import perf_counter
+from statistics import mean, median
+
+import click
+import nbformat
+
+from ploomber_engine.ipython import PloomberClient
+from ploomber_engine.bytecode import BytecodeCache
+from ploomber_engine.pool import ShellPool
+
+_CELL = """
+def transform_{i}(values):
+    result = []
+    for value in values:
+        if value % 2:
+            result.append(value * {i})
+        else:
+            result.append(value + {i})
+    return result
+
+data_{i} = transform_{i}(range(10))
+summary_{i} = {{"min": min(data_{i}), "max": max(data_{i})}}
+"""
+
+
+def _make_notebook(n_cells):
+    nb = nbformat.v4.new_notebook()
+    nb.cells = [nbformat.v4.new_code_cell(_CELL.format(i=i)) for i in range(n_cells)]
+    return nb
+
+
+def _time_runs(n_runs, n_cells, shell_pool, bytecode_cache):
+    timings = []
+
+    for _ in range(n_runs):
+        client = PloomberClient(
+            _make_notebook(n_cells),
+            progress_bar=False,
+            shell_pool=shell_pool,
+            bytecode_cache=bytecode_cache,
+        )
+        start = perf_counter()
+        client.execute()
+        timings.append(perf_counter() - start)
+
+    return timings
+
+
+@click.command()
+@click.option("--n-cells", default=300, help="Cells in the notebook")
+@click.option("--n-runs", default=5, help="Notebooks to execute per mode")
+def cli(n_cells, n_runs):
+    """Compare notebook execution time with and without a bytecode cache"""
+    with ShellPool(size=1) as pool, tempfile.TemporaryDirectory() as tmp:
+        without = _time_runs(n_runs, n_cells, pool, bytecode_cache=None)
+
+        cache = BytecodeCache(tmp)
+        # populate the cache
+        _time_runs(1, n_cells, pool, bytecode_cache=cache)
+        with_cache = _time_runs(n_runs, n_cells, pool, bytecode_cache=cache)
+
+    for name, timings in (("no cache", without), ("cache", with_cache)):
+        click.echo(
+            f"{name:>8}: mean={mean(timings) * 1000:.2f}ms "
+            f"median={median(timings) * 1000:.2f}ms"
+        )
+
+    click.echo(f"hits={cache.hits} misses={cache.misses}")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,66 @@
+"""
+Benchmark the per-cell overhead of PloomberNotebookClient, compared with the
+kernel's round-trip time (executing an empty statement with a bare client)
+
+    python benchmarks/client_overhead.py --n-cells 50
+"""
+
+from time import perf_counter
+from statistics import mean, median
+
+import click
+import nbformat
+from jupyter_client.manager import start_new_kernel
+
+from ploomber_engine.client import PloomberNotebookClient
+
+
+def _round_trips(n_cells):
+    km, kc = start_new_kernel()
+    timings = []
+
+    try:
+        for _ in range(n_cells):
+            start = perf_counter()
+            kc.execute_interactive("1 + 1", output_hook=lambda msg: None)
+            timings.append(perf_counter() - start)
+    finally:
+        kc.stop_channels()
+        km.shutdown_kernel(now=True)
+
+    return timings
+
+
+def _client_cells(n_cells):
+    nb = nbformat.v4.new_notebook()
+    nb.cells = [nbformat.v4.new_code_cell("1 + 1") for _ in range(n_cells)]
+    client = PloomberNotebookClient(nb)
+    timings = []
+
+    with client.setup_kernel():
+        for index, cell in enumerate(nb.cells):
+            start = perf_counter()
+            client.execute_cell(cell, index)
+            timings.append(perf_counter() - start)
+
+    return timings
+
+
+@click.command()
+@click.option("--n-cells", default=50, help="Cells to execute per mode")
+def cli(n_cells):
+    """Compare per-cell latency of PloomberNotebookClient with the kernel's
+    round-trip time
+    """
+    for name, timings in (
+        ("round-trip", _round_trips(n_cells)),
+        ("client", _client_cells(n_cells)),
+    ):
+        click.echo(
+            f"{name:>10}: mean={mean(timings) * 1000:.2f}ms "
+            f"median={median(timings) * 1000:.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,61 @@
+"""
+Benchmark per-cell overhead with and without the fast path
+
+    python benchmarks/fast_path.py --n-cells 2000 --n-runs 5
+"""
+
+from time import perf_counter
+from statistics import mean, median
+
+import click
+import nbformat
+
+from ploomber_engine.ipython import PloomberClient
+from ploomber_engine.pool import ShellPool
+
+
+def _make_notebook(n_cells):
+    nb = nbformat.v4.new_notebook()
+    # cells without outputs, so timings only include the execution overhead
+    nb.cells = [nbformat.v4.new_code_cell(f"x_{i} = {i} + 1") for i in range(n_cells)]
+    return nb
+
+
+def _time_runs(n_runs, n_cells, shell_pool, fast_path):
+    timings = []
+
+    for _ in range(n_runs):
+        client = PloomberClient(
+            _make_notebook(n_cells),
+            progress_bar=False,
+            shell_pool=shell_pool,
+            fast_path=fast_path,
+        )
+        start = perf_counter()
+        client.execute()
+        timings.append((perf_counter() - start) / n_cells)
+
+    return timings
+
+
+@click.command()
+@click.option("--n-cells", default=2000, help="Cells in the notebook")
+@click.option("--n-runs", default=5, help="Notebooks to execute per mode")
+def cli(n_cells, n_runs):
+    """Compare per-cell overhead of run_cell and the fast path"""
+    with ShellPool(size=1) as pool:
+        # warm up
+        _time_runs(1, 10, pool, fast_path=False)
+
+        run_cell = _time_runs(n_runs, n_cells, pool, fast_path=False)
+        fast_path = _time_runs(n_runs, n_cells, pool, fast_path=True)
+
+    for name, timings in (("run_cell", run_cell), ("fast path", fast_path)):
+        click.echo(
+            f"{name:>9}: mean={mean(timings) * 1e6:.1f}us/cell "
+            f"median={median(timings) * 1e6:.1f}us/cell"
+        )
+
+
+if __name__ == "__main__":
+    cli()
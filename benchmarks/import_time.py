@@ -0,0 +1,60 @@
+"""
+Measure the import time of the package and the command-line interface with
+python -X importtime, exits with an error if any exceeds its budget. Timings
+depend on the machine, so CI does not run it: tests/test_import.py checks
+which modules each import loads instead
+
+    python benchmarks/import_time.py --budget-package 50 --budget-cli 200
+"""
+
+import sys
+import subprocess
+from statistics import median
+
+import click
+
+
+def _import_time(module):
+    """Returns the cumulative import time of a module (in milliseconds) in a
+    new interpreter
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    # lines look like: "import time: self [us] | cumulative | imported package"
+    for line in result.stderr.splitlines():
+        _, cumulative, name = line.split("|")
+
+        if name.strip() == module:
+            return int(cumulative) / 1000
+
+    raise RuntimeError(f"Could not find {module!r} in the -X importtime output")
+
+
+@click.command()
+@click.option("--n-runs", default=5, help="Runs per module, reports the median")
+@click.option("--budget-package", default=50.0, help="Budget for ploomber_engine (ms)")
+@click.option("--budget-cli", default=200.0, help="Budget for ploomber_engine.cli (ms)")
+def cli(n_runs, budget_package, budget_cli):
+    """Check the import time of ploomber_engine and its CLI"""
+    over_budget = False
+
+    for module, budget in (
+        ("ploomber_engine", budget_package),
+        ("ploomber_engine.cli", budget_cli),
+    ):
+        elapsed = median(_import_time(module) for _ in range(n_runs))
+        status = "ok" if elapsed <= budget else "OVER BUDGET"
+        over_budget = over_budget or elapsed > budget
+        click.echo(f"{module:>20}: {elapsed:.1f}ms (budget {budget:g}ms) {status}")
+
+    if over_budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    cli()
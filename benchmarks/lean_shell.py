@@ -0,0 +1,68 @@
+"""
+Benchmark shell startup time and memory per run with and without a lean shell
+
+    python benchmarks/lean_shell.py --n-runs 50
+"""
+
+from time import perf_counter
+from statistics import mean, median
+
+import click
+import nbformat
+import psutil
+
+from ploomber_engine.ipython import PloomberClient, PloomberShell
+
+
+def _make_notebook():
+    nb = nbformat.v4.new_notebook()
+    nb.cells = [
+        nbformat.v4.new_code_cell("x = list(range(100_000))"),
+        nbformat.v4.new_code_cell("len(x)"),
+        nbformat.v4.new_code_cell("print(len(x))"),
+    ]
+    return nb
+
+
+def _time_startup(n_runs, lean):
+    timings = []
+
+    for _ in range(n_runs):
+        start = perf_counter()
+        shell = PloomberShell(lean=lean)
+        timings.append(perf_counter() - start)
+        shell.clear_instance()
+
+    return timings
+
+
+def _memory_per_run(n_runs, lean):
+    process = psutil.Process()
+    start = process.memory_info().rss
+
+    for _ in range(n_runs):
+        PloomberClient(_make_notebook(), progress_bar=False, lean=lean).execute()
+
+    return (process.memory_info().rss - start) / n_runs
+
+
+@click.command()
+@click.option("--n-runs", default=50, help="Shells to create per mode")
+def cli(n_runs):
+    """Compare the default and the lean shell"""
+    # warm up imports so the first run does not skew the results
+    _memory_per_run(1, lean=False)
+    _memory_per_run(1, lean=True)
+
+    for name, lean in (("default", False), ("lean", True)):
+        startup = _time_startup(n_runs, lean)
+        memory = _memory_per_run(n_runs, lean)
+        click.echo(
+            f"{name:>7}: startup mean={mean(startup) * 1000:.2f}ms "
+            f"median={median(startup) * 1000:.2f}ms "
+            f"memory/run={memory / 1024:.1f}KB"
+        )
+
+
+if __name__ == "__main__":
+    cli()
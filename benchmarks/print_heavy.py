@@ -0,0 +1,58 @@
+"""
+Benchmark a print-heavy notebook with PloomberNotebookClient and nbclient's
+NotebookClient
+
+    python benchmarks/print_heavy.py --n-lines 20000
+"""
+
+from time import perf_counter, process_time
+
+import click
+import nbformat
+from nbclient import NotebookClient
+
+from ploomber_engine.client import PloomberNotebookClient
+
+
+def _make_notebook(n_lines):
+    nb = nbformat.v4.new_notebook()
+    nb.cells = [
+        nbformat.v4.new_code_cell(
+            f"import sys\nfor i in range({n_lines}):\n"
+            "    print(i)\n    sys.stdout.flush()"
+        )
+    ]
+    return nb
+
+
+def _time_cell(client_class, n_lines):
+    nb = _make_notebook(n_lines)
+    client = client_class(nb)
+
+    with client.setup_kernel():
+        start, start_cpu = perf_counter(), process_time()
+        client.execute_cell(nb.cells[0], 0)
+        elapsed, cpu = perf_counter() - start, process_time() - start_cpu
+
+    return elapsed, cpu, len(nb.cells[0].outputs)
+
+
+@click.command()
+@click.option("--n-lines", default=20_000, help="Lines the cell prints")
+def cli(n_lines):
+    """Compare the time to execute a cell that prints many lines, and the CPU
+    time the client spends processing its messages
+    """
+    for name, client_class in (
+        ("nbclient", NotebookClient),
+        ("ploomber", PloomberNotebookClient),
+    ):
+        elapsed, cpu, n_outputs = _time_cell(client_class, n_lines)
+        click.echo(
+            f"{name:>10}: {elapsed * 1000:.0f}ms ({n_lines / elapsed:.0f} lines/s), "
+            f"client CPU time: {cpu * 1000:.0f}ms, outputs: {n_outputs}"
+        )
+
+
+if __name__ == "__main__":
+    cli()
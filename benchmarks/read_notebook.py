@@ -0,0 +1,61 @@
+"""
+Benchmark loading a notebook with large outputs
+
+    python benchmarks/read_notebook.py --output-mb 200
+"""
+
+import tracemalloc
+from time import perf_counter
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import click
+import nbformat
+
+from ploomber_engine._reader import read_without_outputs
+
+
+def _make_notebook(path, output_mb, n_cells=100):
+    nb = nbformat.v4.new_notebook()
+    size = output_mb * 1_000_000 // n_cells
+
+    for i in range(n_cells):
+        cell = nbformat.v4.new_code_cell(f"plot({i})")
+        cell.outputs = [
+            nbformat.v4.new_output("display_data", data={"image/png": "A" * size})
+        ]
+        nb.cells.append(cell)
+
+    nbformat.write(nb, path, version=nbformat.NO_CONVERT)
+
+
+def _measure(function, path):
+    tracemalloc.start()
+    start = perf_counter()
+    function(path)
+    elapsed = perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+@click.command()
+@click.option("--output-mb", default=200, help="Size of the outputs in MB")
+def cli(output_mb):
+    """Compare nbformat.read with the reader that skips outputs"""
+    with TemporaryDirectory() as tmp:
+        path = Path(tmp, "nb.ipynb")
+        _make_notebook(path, output_mb)
+
+        readers = (
+            ("nbformat", lambda p: nbformat.read(p, as_version=nbformat.NO_CONVERT)),
+            ("skip outputs", read_without_outputs),
+        )
+
+        for name, function in readers:
+            elapsed, peak = _measure(function, path)
+            click.echo(f"{name:>12}: {elapsed:.2f}s peak={peak / 1e6:.1f}MB")
+
+
+if __name__ == "__main__":
+    cli()
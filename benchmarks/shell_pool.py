@@ -0,0 +1,60 @@
+"""
+Benchmark per-notebook latency with and without a ShellPool
+
+    python benchmarks/shell_pool.py --n-runs 50
+"""
+
+from time import perf_counter
+from statistics import mean, median
+
+import click
+import nbformat
+
+from ploomber_engine.ipython import PloomberClient
+from ploomber_engine.pool import ShellPool
+
+
+def _make_notebook():
+    nb = nbformat.v4.new_notebook()
+    nb.cells = [
+        nbformat.v4.new_code_cell("x = 1"),
+        nbformat.v4.new_code_cell("y = x + 1"),
+        nbformat.v4.new_code_cell("print(y)"),
+    ]
+    return nb
+
+
+def _time_runs(n_runs, shell_pool):
+    timings = []
+
+    for _ in range(n_runs):
+        start = perf_counter()
+        PloomberClient(
+            _make_notebook(), progress_bar=False, shell_pool=shell_pool
+        ).execute()
+        timings.append(perf_counter() - start)
+
+    return timings
+
+
+@click.command()
+@click.option("--n-runs", default=50, help="Notebooks to execute per mode")
+def cli(n_runs):
+    """Compare per-notebook latency with and without a shell pool"""
+    # warm up imports so the first run does not skew the results
+    _time_runs(1, shell_pool=None)
+
+    without = _time_runs(n_runs, shell_pool=None)
+
+    with ShellPool(size=1) as pool:
+        with_pool = _time_runs(n_runs, shell_pool=pool)
+
+    for name, timings in (("no pool", without), ("shell pool", with_pool)):
+        click.echo(
+            f"{name:>10}: mean={mean(timings) * 1000:.2f}ms "
+            f"median={median(timings) * 1000:.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    cli()
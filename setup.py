@@ -53,6 +53,8 @@ DEV = [
     "jupytext",
     # optional dependency for memory profiling
     "psutil",
+    # optional dependency for storing functions in incremental execution
+    "cloudpickle",
 ]
 
 
@@ -100,11 +102,11 @@ setup(
     },
     entry_points={
         "papermill.engine": [
-            "debug=ploomber_engine.engine:DebugEngine",
-            "debuglater=ploomber_engine.engine:DebugLaterEngine",
-            "embedded=ploomber_engine.engine:ProfilingEngine",
+            "debug=ploomber_engine._engines:DebugEngine",
+            "debuglater=ploomber_engine._engines:DebugLaterEngine",
+            "embedded=ploomber_engine._engines:ProfilingEngine",
             # we keep this here for backwards compatibility
-            "profiling=ploomber_engine.engine:ProfilingEngine",
+            "profiling=ploomber_engine._engines:ProfilingEngine",
         ],
         "console_scripts": ["ploomber-engine=ploomber_engine.cli:cli"],
     },
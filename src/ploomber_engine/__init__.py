@@ -1,14 +1,24 @@
-from ploomber_engine.execute import execute_notebook
-
 __version__ = "0.0.34dev"
 
+__all__ = ["execute_notebook", "execute_notebooks", "execute_notebooks_async"]
+
+
+def __getattr__(name):
+    # import lazily, so importing the package (or any of its modules) does not
+    # import IPython
+    if name == "execute_notebook":
+        from ploomber_engine.execute import execute_notebook
+
+        return execute_notebook
+
+    if name == "execute_notebooks":
+        from ploomber_engine.batch import execute_notebooks
+
+        return execute_notebooks
 
-# NOTE: fully initialize papermill here to prevent circular import
-try:
-    import papermill  # noqa
-except ModuleNotFoundError:
-    # optional dependency, so do not throw an error if missing
-    pass
+    if name == "execute_notebooks_async":
+        from ploomber_engine.batch import execute_notebooks_async
 
+        return execute_notebooks_async
 
-__all__ = ["execute_notebook"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,663 @@
+"""
+Static analysis of the variables each cell reads and writes
+"""
+
+import ast
+import builtins
+
+from IPython.core.inputtransformer2 import TransformerManager
+
+# calling these makes the cell's effect on the namespace impossible to predict
+_UNSAFE_CALLS = {
+    "globals",
+    "locals",
+    "vars",
+    "exec",
+    "eval",
+    "get_ipython",
+    "__import__",
+}
+
+_BUILTINS = set(dir(builtins))
+
+# builtins that do not modify their arguments
+_NON_MUTATING = _BUILTINS | {"display"}
+
+_transformer_manager = None
+
+
+def _transform_cell(source):
+    """Translate IPython syntax (magics, shell escapes) into Python code"""
+    global _transformer_manager
+
+    if _transformer_manager is None:
+        _transformer_manager = TransformerManager()
+
+    return _transformer_manager.transform_cell(source)
+
+
+class CellInfo:
+    """Variables a cell reads and writes at the notebook (global) level
+
+    Parameters
+    ----------
+    reads : set
+        Names the cell loads
+
+    writes : set
+        Names the cell binds or deletes (assignments, imports, definitions)
+
+    mutates : set
+        Names the cell may modify in place (e.g., ``x.append(1)``,
+        ``x[0] = 1``, ``f(x)``)
+
+    imports : set
+        Names bound by import statements
+
+    safe : bool
+        False if the cell's effect on the namespace cannot be determined
+        statically (e.g., it uses magics, ``exec``, or ``import *``)
+
+    definitions : dict
+        Maps the functions and classes the cell defines to the global names
+        they read when called
+
+    effects : dict
+        Maps the functions and classes the cell defines to the global names
+        they bind or modify when called
+
+    calls : set
+        Global names the cell calls (including calls in lambdas)
+
+    deferred : set
+        Global names modified by the lambdas the cell defines
+
+    restorable : bool
+        False if the cell calls a function whose effects are unknown, so its
+        effects cannot be restored from a previous execution
+    """
+
+    def __init__(
+        self,
+        reads,
+        writes,
+        mutates,
+        imports,
+        safe,
+        definitions=None,
+        effects=None,
+        calls=None,
+        deferred=None,
+        definition_calls=None,
+    ):
+        self.reads = reads
+        self.writes = writes
+        self.mutates = mutates
+        self.imports = imports
+        self.safe = safe
+        self.definitions = definitions or {}
+        self.effects = effects or {}
+        self.calls = calls or set()
+        self.deferred = deferred or set()
+        # global names called by each definition
+        self.definition_calls = definition_calls or {}
+        # effects of using the names this cell binds (e.g., an alias of a
+        # function that modifies a global)
+        self.carried = set()
+        self.restorable = True
+
+    def __repr__(self):
+        return (
+            f"{type(self).__name__}(reads={sorted(self.reads)!r}, "
+            f"writes={sorted(self.writes)!r}, mutates={sorted(self.mutates)!r}, "
+            f"safe={self.safe!r})"
+        )
+
+    @property
+    def modifies(self):
+        """Names the cell binds, deletes, or may modify in place"""
+        return self.writes | self.mutates
+
+
+def _target_names(node):
+    """Names bound by an assignment target"""
+    return {
+        n.id
+        for n in ast.walk(node)
+        if isinstance(n, ast.Name) and isinstance(n.ctx, (ast.Store, ast.Del))
+    }
+
+
+def _base_name(node):
+    """Returns the name at the root of an attribute/subscript chain"""
+    while isinstance(node, (ast.Attribute, ast.Subscript, ast.Call)):
+        node = node.func if isinstance(node, ast.Call) else node.value
+
+    return node.id if isinstance(node, ast.Name) else None
+
+
+_COMPREHENSIONS = (ast.ListComp, ast.SetComp, ast.GeneratorExp, ast.DictComp)
+
+
+def _local_names(node):
+    """Names that are local to a function or class (arguments and names bound
+    in its body, ignoring nested functions, classes and comprehensions)
+    """
+    args = getattr(node, "args", None)
+    names = (
+        {
+            arg.arg
+            for arg in args.posonlyargs
+            + args.args
+            + args.kwonlyargs
+            + [args.vararg, args.kwarg]
+            if arg is not None
+        }
+        if args is not None
+        else set()
+    )
+    declared_global = set()
+
+    def collect(current):
+        if isinstance(current, (ast.Global, ast.Nonlocal)):
+            declared_global.update(current.names)
+        elif isinstance(current, ast.Name) and isinstance(
+            current.ctx, (ast.Store, ast.Del)
+        ):
+            names.add(current.id)
+        elif isinstance(current, (ast.Import, ast.ImportFrom)):
+            names.update(_imported_names(current))
+        elif isinstance(current, ast.ExceptHandler) and current.name:
+            names.add(current.name)
+
+        if isinstance(current, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(current.name)
+        elif isinstance(current, ast.Lambda):
+            pass
+        elif isinstance(current, _COMPREHENSIONS):
+            # comprehension targets are local to the comprehension, but the
+            # walrus operator binds in the function
+            names.update(
+                n.target.id for n in ast.walk(current) if isinstance(n, ast.NamedExpr)
+            )
+        else:
+            for child in ast.iter_child_nodes(current):
+                collect(child)
+
+    for statement in node.body if isinstance(node.body, list) else [node.body]:
+        collect(statement)
+
+    return names - declared_global
+
+
+def _imported_names(node):
+    return {
+        (alias.asname or alias.name).split(".")[0]
+        for alias in node.names
+        if alias.name != "*"
+    }
+
+
+class _Visitor(ast.NodeVisitor):
+    def __init__(self):
+        self.reads = set()
+        self.writes = set()
+        self.mutates = set()
+        self.imports = set()
+        self.safe = True
+        self.definitions = {}
+        self.effects = {}
+        self.definition_calls = {}
+        self.calls = set()
+        # names modified (and called) by function bodies, which run when
+        # called instead of when defined
+        self.deferred = set()
+        self.deferred_calls = set()
+        self._in_function = False
+        # (local names, is comprehension) for every enclosing function, class
+        # and comprehension
+        self._scopes = []
+
+    def _is_global(self, name, skip_comprehensions=False):
+        return not any(
+            name in names
+            for names, is_comprehension in self._scopes
+            if not (skip_comprehensions and is_comprehension)
+        )
+
+    def _write(self, name):
+        if self._is_global(name):
+            self.writes.add(name)
+
+    def _mutate(self, name):
+        if name is not None and self._is_global(name):
+            self.mutates.add(name)
+
+    def visit_Name(self, node):
+        if isinstance(node.ctx, ast.Load):
+            if self._is_global(node.id):
+                self.reads.add(node.id)
+        else:
+            self._write(node.id)
+
+    def visit_Import(self, node):
+        for name in _imported_names(node):
+            self._write(name)
+
+            if not self._scopes:
+                self.imports.add(name)
+
+    def visit_ImportFrom(self, node):
+        if any(alias.name == "*" for alias in node.names):
+            self.safe = False
+
+        self.visit_Import(node)
+
+    def visit_Global(self, node):
+        for name in node.names:
+            self.writes.add(name)
+
+    def _visit_function_body(self, visit_body):
+        """Visit the body of a function or lambda: the names it binds, modifies
+        and calls are deferred until the function is called
+        """
+        if self._in_function:
+            visit_body()
+            return
+
+        outer = self.writes, self.mutates, self.calls
+        self.writes, self.mutates, self.calls = set(), set(), set()
+        self._in_function = True
+
+        try:
+            visit_body()
+        finally:
+            self._in_function = False
+            self.deferred |= self.writes | self.mutates
+            self.deferred_calls |= self.calls
+            self.writes, self.mutates, self.calls = outer
+
+    def _visit_body(self, node):
+        """Visit the body of a function or class, keeping track of the global
+        names read, modified and called by top-level definitions
+        """
+        top_level = not self._scopes
+
+        if top_level:
+            outer = self.reads, self.deferred, self.deferred_calls
+            self.reads, self.deferred, self.deferred_calls = set(), set(), set()
+
+        self._scopes.append((_local_names(node), False))
+
+        def visit_body():
+            for statement in node.body:
+                self.visit(statement)
+
+        if isinstance(node, ast.ClassDef):
+            # the class body runs when defining it, methods are deferred
+            visit_body()
+        else:
+            self._visit_function_body(visit_body)
+
+        self._scopes.pop()
+
+        if top_level:
+            self.definitions[node.name] = self.reads
+            self.effects[node.name] = self.deferred
+            self.definition_calls[node.name] = self.deferred_calls
+            reads, deferred, deferred_calls = outer
+            self.reads = reads | self.reads
+            self.deferred, self.deferred_calls = deferred, deferred_calls
+
+    def visit_FunctionDef(self, node):
+        self._write(node.name)
+
+        for decorator in node.decorator_list:
+            self.visit(decorator)
+
+        self.visit(node.args)
+
+        if node.returns is not None:
+            self.visit(node.returns)
+
+        self._visit_body(node)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Lambda(self, node):
+        self.visit(node.args)
+        self._scopes.append((_local_names(node), False))
+        self._visit_function_body(lambda: self.visit(node.body))
+        self._scopes.pop()
+
+    def visit_arguments(self, node):
+        # only default values and annotations are evaluated when defining
+        # the function
+        for default in node.defaults + node.kw_defaults:
+            if default is not None:
+                self.visit(default)
+
+        for arg in node.posonlyargs + node.args + node.kwonlyargs:
+            if arg.annotation is not None:
+                self.visit(arg.annotation)
+
+    def visit_ClassDef(self, node):
+        self._write(node.name)
+
+        for child in node.decorator_list + node.bases + node.keywords:
+            self.visit(child)
+
+        self._visit_body(node)
+
+    def _visit_comprehension(self, node):
+        targets = set()
+
+        for generator in node.generators:
+            targets |= _target_names(generator.target)
+
+        # the first iterable is evaluated in the enclosing scope
+        self.visit(node.generators[0].iter)
+        self._scopes.append((targets, True))
+
+        for i, generator in enumerate(node.generators):
+            if i:
+                self.visit(generator.iter)
+
+            for condition in generator.ifs:
+                self.visit(condition)
+
+        for field in ("elt", "key", "value"):
+            if hasattr(node, field):
+                self.visit(getattr(node, field))
+
+        self._scopes.pop()
+
+    visit_ListComp = _visit_comprehension
+    visit_SetComp = _visit_comprehension
+    visit_GeneratorExp = _visit_comprehension
+    visit_DictComp = _visit_comprehension
+
+    def visit_NamedExpr(self, node):
+        # the walrus operator binds in the enclosing function (or the notebook)
+        # even if used inside a comprehension
+        if self._is_global(node.target.id, skip_comprehensions=True):
+            self.writes.add(node.target.id)
+
+        self.visit(node.value)
+
+    def visit_AugAssign(self, node):
+        if isinstance(node.target, ast.Name):
+            self.visit_Name(ast.Name(id=node.target.id, ctx=ast.Load()))
+
+        self.generic_visit(node)
+
+    def visit_Attribute(self, node):
+        if isinstance(node.ctx, (ast.Store, ast.Del)):
+            self._mutate(_base_name(node))
+
+        self.visit(node.value)
+
+    def visit_Subscript(self, node):
+        if isinstance(node.ctx, (ast.Store, ast.Del)):
+            self._mutate(_base_name(node))
+
+        self.visit(node.value)
+        self.visit(node.slice)
+
+    def visit_Call(self, node):
+        func = node.func
+
+        if isinstance(func, ast.Name):
+            if func.id in _UNSAFE_CALLS:
+                self.safe = False
+
+            if self._is_global(func.id):
+                self.calls.add(func.id)
+
+            callee_mutates = func.id not in _NON_MUTATING
+        else:
+            callee_mutates = True
+
+        # x.method(...) may modify x
+        if isinstance(func, ast.Attribute):
+            self._mutate(_base_name(func.value))
+
+        # so can f(x)
+        if callee_mutates:
+            for arg in node.args + [k.value for k in node.keywords]:
+                if isinstance(arg, ast.Starred):
+                    arg = arg.value
+
+                self._mutate(_base_name(arg))
+
+        self.generic_visit(node)
+
+    def visit_ExceptHandler(self, node):
+        if node.name:
+            self._write(node.name)
+
+        self.generic_visit(node)
+
+    def visit_MatchAs(self, node):
+        if node.name:
+            self._write(node.name)
+
+        self.generic_visit(node)
+
+    visit_MatchStar = visit_MatchAs
+
+    def visit_MatchMapping(self, node):
+        if node.rest:
+            self._write(node.rest)
+
+        self.generic_visit(node)
+
+
+def analyze_cell(source):
+    """Find the variables a cell reads and writes
+
+    Parameters
+    ----------
+    source : str
+        Cell source, may contain IPython syntax
+
+    Returns
+    -------
+    CellInfo
+    """
+    try:
+        module = ast.parse(_transform_cell(source))
+    except SyntaxError:
+        return CellInfo(
+            reads=set(), writes=set(), mutates=set(), imports=set(), safe=False
+        )
+
+    visitor = _Visitor()
+    visitor.visit(module)
+
+    return CellInfo(
+        reads=visitor.reads,
+        writes=visitor.writes,
+        mutates=visitor.mutates - visitor.writes,
+        imports=visitor.imports,
+        safe=visitor.safe,
+        definitions=visitor.definitions,
+        effects=visitor.effects,
+        calls=visitor.calls | visitor.deferred_calls,
+        deferred=visitor.deferred,
+        definition_calls=visitor.definition_calls,
+    )
+
+
+def analyze_cells(sources):
+    """Analyze the cells of a notebook. Calling a method on an imported
+    module (e.g., ``pd.read_csv``) is not considered a modification. Cells
+    that call functions defined in the notebook also modify what those
+    functions modify
+
+    Returns
+    -------
+    list of CellInfo
+    """
+    infos = [analyze_cell(source) for source in sources]
+    imported = set().union(*(info.imports for info in infos))
+
+    for info in infos:
+        info.mutates -= imported
+        info.deferred -= imported
+
+        for effects in info.effects.values():
+            effects -= imported
+
+    for pos in range(len(infos)):
+        _add_call_effects(infos, pos)
+
+    return infos
+
+
+def _definer(infos, name, pos):
+    """Position of the cell that binds ``name`` as seen by the cell at ``pos``
+    (or the last cell before it that cannot be analyzed)
+    """
+    if name in infos[pos].definitions:
+        return pos
+
+    for previous in range(pos - 1, -1, -1):
+        info = infos[previous]
+
+        if not info.safe or name in info.writes:
+            return previous
+
+    return None
+
+
+def _is_library_function(infos, name, before):
+    """
+    True if ``name`` was last bound by an import (or is a builtin) before
+    ``before``, assuming cells that cannot be analyzed do not rebind it. Such
+    functions only modify the notebook's variables passed to them
+    """
+    for previous in range(before - 1, -1, -1):
+        info = infos[previous]
+
+        if info.safe and name in info.writes:
+            return name in info.imports
+
+    return name in _BUILTINS
+
+
+def _add_call_effects(infos, pos):
+    """
+    Add the names modified by the functions a cell uses (directly, through
+    other functions, or through aliases) to the ones it modifies. If a called
+    function may be bound by a cell that cannot be analyzed (e.g., ``%run``),
+    its effects are unknown and the cell is marked as unsafe and not
+    restorable
+    """
+    info = infos[pos]
+
+    if not info.safe:
+        return
+
+    # lambdas may be called in the same cell
+    effects = set(info.deferred)
+    called = set(info.calls)
+    pending = list(info.reads | info.mutates)
+    seen = set()
+
+    while pending:
+        name = pending.pop()
+
+        if name in seen:
+            continue
+
+        seen.add(name)
+        definer = _definer(infos, name, pos)
+
+        if definer is None:
+            continue
+
+        other = infos[definer]
+
+        if not other.safe:
+            if name in called and not _is_library_function(infos, name, definer):
+                info.safe = False
+                info.restorable = False
+                return
+        elif name in other.definitions:
+            effects |= other.effects[name]
+            called |= other.definition_calls[name]
+            pending.extend(other.definitions[name])
+        elif definer != pos:
+            effects |= other.carried
+
+    info.mutates |= effects - info.writes
+    info.carried = effects
+
+
+def add_definition_reads(infos, names, pos, find_writer):
+    """
+    Add the global names used by the functions and classes in ``names``
+    (e.g., if a cell calls a function, it also needs the variables the
+    function uses). ``find_writer(name, pos)`` returns the position of the
+    cell that defines ``name`` as seen by the cell at ``pos``
+    """
+    names = set(names)
+    pending = list(names)
+
+    while pending:
+        name = pending.pop()
+        writer = find_writer(name, pos)
+
+        if writer is None:
+            continue
+
+        for used in infos[writer].definitions.get(name, set()) - names:
+            names.add(used)
+            pending.append(used)
+
+    return names
+
+
+def find_dependencies(infos):
+    """Find which cells must be executed before each cell. A cell depends on
+    a previous one if it uses a variable the previous one modifies, or if it
+    modifies a variable the previous one uses. Cells that cannot be analyzed
+    depend on (and are a dependency of) every other cell
+
+    Returns
+    -------
+    list of set
+        Positions of the cells each cell depends on
+    """
+
+    def find_writer(name, pos):
+        for previous in range(pos - 1, -1, -1):
+            if name in infos[previous].modifies:
+                return previous
+
+        return None
+
+    uses = [
+        add_definition_reads(infos, info.reads | info.mutates, pos, find_writer)
+        for pos, info in enumerate(infos)
+    ]
+    dependencies = []
+
+    for pos, info in enumerate(infos):
+        upstream = set()
+
+        for previous in range(pos):
+            other = infos[previous]
+
+            if (
+                not info.safe
+                or not other.safe
+                or uses[pos] & other.modifies
+                or info.modifies & (uses[previous] | other.modifies)
+            ):
+                upstream.add(previous)
+
+        dependencies.append(upstream)
+
+    return dependencies
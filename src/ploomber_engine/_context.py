@@ -0,0 +1,442 @@
+"""
+Execution context for running several notebooks in threads of the same
+process. While executions are running, process-wide state (the active shell,
+sys.stdout/sys.stderr, the display hook and builtins) is patched with objects
+that look up the current execution in context variables. The working directory
+is also process-wide, so only executions that use the same one run at the same
+time
+"""
+
+import os
+import sys
+import builtins
+import threading
+import contextlib
+from contextvars import ContextVar
+
+from IPython.core.builtin_trap import BuiltinTrap
+from IPython.core.display_trap import DisplayTrap
+from IPython.core.getipython import get_ipython
+from IPython.core.interactiveshell import InteractiveShell
+from traitlets.config.configurable import SingletonConfigurable
+
+# the shell executing code in the current context
+_SHELL = ContextVar("ploomber_engine_shell", default=None)
+# the (stdout, stderr) streams capturing text printed in the current context
+_STREAMS = ContextVar("ploomber_engine_streams", default=None)
+# number of (nested) holds of the working directory in the current context
+_HOLDS_CWD = ContextVar("ploomber_engine_holds_cwd", default=0)
+
+_MISSING = object()
+
+
+class SharedPatch:
+    """Applies a process-wide patch while at least one execution needs it.
+    ``install`` returns the state that ``uninstall`` needs to revert it
+    """
+
+    def __init__(self, install, uninstall):
+        self._install = install
+        self._uninstall = uninstall
+        self._lock = threading.Lock()
+        self._count = 0
+        self._state = None
+
+    def acquire(self):
+        with self._lock:
+            if self._count == 0:
+                self._state = self._install()
+
+            self._count += 1
+
+    def release(self):
+        with self._lock:
+            self._count -= 1
+
+            if self._count == 0:
+                self._uninstall(self._state)
+                self._state = None
+
+
+def current_shell():
+    """Returns the shell executing code in the current context (None if
+    there isn't one)
+    """
+    return _SHELL.get()
+
+
+_instance_original = SingletonConfigurable.instance.__func__
+_initialized_original = SingletonConfigurable.initialized.__func__
+
+
+def _instance(cls, *args, **kwargs):
+    shell = _SHELL.get()
+
+    if shell is not None and isinstance(shell, cls):
+        return shell
+
+    return _instance_original(cls, *args, **kwargs)
+
+
+def _initialized(cls):
+    shell = _SHELL.get()
+
+    if shell is not None and isinstance(shell, cls):
+        return True
+
+    return _initialized_original(cls)
+
+
+def _install_shell_lookup():
+    state = {
+        name: InteractiveShell.__dict__.get(name, _MISSING)
+        for name in ("instance", "initialized")
+    }
+    InteractiveShell.instance = classmethod(_instance)
+    InteractiveShell.initialized = classmethod(_initialized)
+    return state
+
+
+def _uninstall_shell_lookup(state):
+    for name, value in state.items():
+        if value is _MISSING:
+            delattr(InteractiveShell, name)
+        else:
+            setattr(InteractiveShell, name, value)
+
+
+_SHELL_LOOKUP = SharedPatch(_install_shell_lookup, _uninstall_shell_lookup)
+
+
+@contextlib.contextmanager
+def active_shell(shell):
+    """Make ``shell`` the one returned by ``InteractiveShell.instance()`` and
+    ``get_ipython()`` (and used by ``display()`` and others) in the current
+    context. While there are active shells, ``InteractiveShell.instance()``
+    looks up the one in the current context, falling back to the singleton
+    """
+    _SHELL_LOOKUP.acquire()
+    token = _SHELL.set(shell)
+
+    try:
+        yield shell
+    finally:
+        _SHELL.reset(token)
+        _SHELL_LOOKUP.release()
+
+
+class _StreamRouter:
+    """Replaces sys.stdout/sys.stderr, writes to the stream capturing the
+    output in the current context or to the original one
+    """
+
+    def __init__(self, index, default):
+        self._index = index
+        self._default = default
+
+    def _target(self):
+        streams = _STREAMS.get()
+        return self._default if streams is None else streams[self._index]
+
+    def write(self, s):
+        return self._target().write(s)
+
+    def flush(self):
+        return self._target().flush()
+
+    def __getattr__(self, key):
+        return getattr(self._target(), key)
+
+
+def _install_router():
+    stdout, stderr = sys.stdout, sys.stderr
+    sys.stdout = _StreamRouter(0, stdout)
+    sys.stderr = _StreamRouter(1, stderr)
+    return stdout, stderr
+
+
+def _uninstall_router(state):
+    sys.stdout, sys.stderr = state
+
+
+_ROUTER = SharedPatch(_install_router, _uninstall_router)
+
+
+def _resolve(stream):
+    return stream._target() if isinstance(stream, _StreamRouter) else stream
+
+
+def std_streams():
+    """Returns the streams that text printed in the current context is written
+    to (stdout, stderr)
+    """
+    streams = _STREAMS.get()
+
+    if streams is not None:
+        return streams
+
+    return _resolve(sys.stdout), _resolve(sys.stderr)
+
+
+@contextlib.contextmanager
+def redirect_std(stdout, stderr):
+    """
+    Send the text printed in the current context to ``stdout`` and ``stderr``.
+    Other threads keep writing to the original streams
+    """
+    _ROUTER.acquire()
+    token = _STREAMS.set((stdout, stderr))
+
+    try:
+        yield stdout, stderr
+    finally:
+        _STREAMS.reset(token)
+        _ROUTER.release()
+
+
+def _install_builtins():
+    bdict = builtins.__dict__
+    state = {name: bdict.pop(name, _MISSING) for name in ("exit", "quit")}
+    state["get_ipython"] = bdict.get("get_ipython", _MISSING)
+    bdict["get_ipython"] = get_ipython
+    return state
+
+
+def _uninstall_builtins(state):
+    bdict = builtins.__dict__
+
+    for name, value in state.items():
+        if value is _MISSING:
+            bdict.pop(name, None)
+        else:
+            bdict[name] = value
+
+
+_BUILTINS = SharedPatch(_install_builtins, _uninstall_builtins)
+
+
+class SharedBuiltinTrap(BuiltinTrap):
+    """
+    Like IPython's ``BuiltinTrap``, but all the shells share the patched
+    builtins so they can execute code at the same time: the builtin
+    ``get_ipython`` returns the shell active in the current context
+    """
+
+    def activate(self):
+        _BUILTINS.acquire()
+
+    def deactivate(self):
+        # revert names added with add_builtin
+        super().deactivate()
+        _BUILTINS.release()
+
+
+def _install_displayhook():
+    original = sys.displayhook
+
+    def displayhook(value):
+        shell = _SHELL.get()
+
+        if shell is None:
+            original(value)
+        else:
+            shell.displayhook(value)
+
+    sys.displayhook = displayhook
+    return original
+
+
+def _uninstall_displayhook(original):
+    sys.displayhook = original
+
+
+_DISPLAYHOOK = SharedPatch(_install_displayhook, _uninstall_displayhook)
+
+
+class SharedDisplayTrap(DisplayTrap):
+    """
+    Like IPython's ``DisplayTrap``, but all the shells share the patched
+    ``sys.displayhook``, which sends results to the shell active in the current
+    context
+    """
+
+    def set(self):
+        _DISPLAYHOOK.acquire()
+
+    def unset(self):
+        _DISPLAYHOOK.release()
+
+
+class _WorkingDirectory:
+    """
+    The working directory is process-wide: executions that use the same one
+    run at the same time, and the ones that use a different one wait until
+    the others finish. An execution nested in another one (in the same
+    context) cannot wait, so it changes the working directory only if no
+    other executions are using it, and raises an error otherwise
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._count = 0
+        # nested executions that changed the working directory, others
+        # wait until they finish
+        self._nested = 0
+        self._path = None
+        self._original = None
+        self._sys_path = {}
+
+    @contextlib.contextmanager
+    def hold(self, path, chdir):
+        with self._condition:
+            path = self._absolute(path)
+            previous = self._enter(path, chdir)
+            self._add_to_sys_path(path)
+
+        token = _HOLDS_CWD.set(_HOLDS_CWD.get() + 1)
+
+        try:
+            yield
+        finally:
+            _HOLDS_CWD.reset(token)
+
+            with self._condition:
+                self._remove_from_sys_path(path)
+                self._exit(previous)
+
+    def _absolute(self, path):
+        """
+        Relative paths are relative to the working directory the process had
+        before other executions changed it (or to the current one, if nested)
+        """
+        if path is None:
+            return None
+
+        if self._path is None or _HOLDS_CWD.get():
+            return os.path.abspath(path)
+
+        return os.path.normpath(os.path.join(self._original, path))
+
+    def _enter(self, path, chdir):
+        """Returns the directory to go back to when exiting, if this is a
+        nested execution that changed it
+        """
+        if not chdir or path is None:
+            self._count += 1
+            return _MISSING
+
+        holds = _HOLDS_CWD.get()
+
+        if holds and path != self._path:
+            # nested in an execution that already holds it: waiting would
+            # deadlock, and changing it would affect the other executions
+            if self._count > holds:
+                raise RuntimeError(
+                    f"Cannot change the working directory to {path!r} while "
+                    "other executions in this process are using it"
+                )
+
+            previous = self._path
+            self._change(path)
+            self._count += 1
+            self._nested += 1
+            return previous
+
+        while (
+            not holds
+            and self._count
+            and (self._nested or self._path not in (path, None))
+        ):
+            self._condition.wait()
+
+        if self._path is None:
+            self._change(path)
+
+        self._count += 1
+        return _MISSING
+
+    def _exit(self, previous):
+        self._count -= 1
+
+        if previous is not _MISSING:
+            self._change(previous)
+            self._nested -= 1
+
+        if self._count == 0 and self._path is not None:
+            self._change(None)
+
+        self._condition.notify_all()
+
+    def _change(self, path):
+        if self._path is None:
+            self._original = os.getcwd()
+
+        os.chdir(self._original if path is None else path)
+        self._path = path
+
+    def _add_to_sys_path(self, path):
+        if path is None:
+            return
+
+        if self._sys_path.get(path, 0) == 0:
+            sys.path.insert(0, path)
+
+        self._sys_path[path] = self._sys_path.get(path, 0) + 1
+
+    def _remove_from_sys_path(self, path):
+        if path is None:
+            return
+
+        self._sys_path[path] -= 1
+
+        if self._sys_path[path] == 0:
+            del self._sys_path[path]
+
+            if path in sys.path:
+                sys.path.remove(path)
+
+    def snapshot(self):
+        """Returns the working directory and sys.path, or None if there are
+        executions running
+        """
+        with self._condition:
+            if self._count:
+                return None
+
+            return os.getcwd(), list(sys.path)
+
+    def restore(self, snapshot):
+        """Restore a snapshot unless there are executions running"""
+        if snapshot is None:
+            return
+
+        with self._condition:
+            if self._count == 0:
+                cwd, sys_path = snapshot
+                os.chdir(cwd)
+                sys.path[:] = sys_path
+
+
+_WORKING_DIRECTORY = _WorkingDirectory()
+
+
+def working_directory(path, chdir=True):
+    """
+    Add ``path`` to sys.path and (if ``chdir``) make it the working directory
+    while the context manager is active
+    """
+    return _WORKING_DIRECTORY.hold(path, chdir=chdir)
+
+
+def process_state():
+    """Returns the working directory and sys.path (None if there are
+    executions running, since they may have modified them)
+    """
+    return _WORKING_DIRECTORY.snapshot()
+
+
+def restore_process_state(state):
+    """Restore the output of ``process_state``, unless there are executions
+    running
+    """
+    _WORKING_DIRECTORY.restore(state)
@@ -0,0 +1,170 @@
+"""
+papermill engines, papermill loads them through the entry points declared in
+setup.py. Import them from ploomber_engine.engine
+"""
+
+import os
+import warnings
+
+import nbformat
+from nbclient.util import run_sync
+
+from papermill.engines import Engine
+from papermill.utils import merge_kwargs, remove_args
+from papermill.log import logger
+from papermill.clientwrap import PapermillNotebookClient
+
+from ploomber_engine.ipython import PloomberManagedClient
+from ploomber_engine.client import _release_kernel
+
+
+def _execute_client(client_class, nb_man, kernel_pool, **kwargs):
+    """Execute the notebook in a new kernel, or in one from the pool"""
+    if kernel_pool is None:
+        return client_class(nb_man, **kwargs).execute()
+
+    # papermill already moved to the directory the notebook runs in
+    km = kernel_pool.acquire(cwd=os.getcwd())
+    client = client_class(nb_man, km=km, **kwargs)
+
+    try:
+        return client.execute()
+    finally:
+        run_sync(_release_kernel)(client, kernel_pool)
+
+
+class DebugEngine(Engine):
+    """An engine that starts a debugging session once the notebook fails. Pass
+    ``kernel_pool`` (a ``KernelPool``) to use a running kernel
+    """
+
+    @classmethod
+    def execute_managed_notebook(
+        cls,
+        nb_man,
+        kernel_name,
+        log_output=False,
+        stdout_file=None,
+        stderr_file=None,
+        start_timeout=60,
+        execution_timeout=None,
+        kernel_pool=None,
+        **kwargs,
+    ):
+        # Exclude parameters that named differently downstream
+        safe_kwargs = remove_args(["timeout", "startup_timeout"], **kwargs)
+
+        # Nicely handle preprocessor arguments prioritizing values set by
+        # engine
+        final_kwargs = merge_kwargs(
+            safe_kwargs,
+            timeout=execution_timeout if execution_timeout else kwargs.get("timeout"),
+            startup_timeout=start_timeout,
+            kernel_name=kernel_name,
+            log=logger,
+            log_output=log_output,
+            stdout_file=stdout_file,
+            stderr_file=stderr_file,
+        )
+
+        cell = nbformat.versions[nb_man.nb["nbformat"]].new_code_cell(
+            source="%pdb on", metadata=dict(tags=[], papermill=dict())
+        )
+        nb_man.nb.cells.insert(0, cell)
+
+        # imported here since ploomber_engine.papermill imports papermill, which
+        # imports this module
+        from ploomber_engine.papermill import PapermillPloomberNotebookClient
+
+        #  use our Papermill client
+        return _execute_client(
+            PapermillPloomberNotebookClient, nb_man, kernel_pool, **final_kwargs
+        )
+
+
+class DebugLaterEngine(Engine):
+    """An engine that stores the traceback object for later debugging. Pass
+    ``kernel_pool`` (a ``KernelPool``) to use a running kernel
+    """
+
+    @classmethod
+    def execute_managed_notebook(
+        cls,
+        nb_man,
+        kernel_name,
+        log_output=False,
+        stdout_file=None,
+        stderr_file=None,
+        start_timeout=60,
+        execution_timeout=None,
+        kernel_pool=None,
+        **kwargs,
+    ):
+        # Exclude parameters that named differently downstream
+        safe_kwargs = remove_args(["timeout", "startup_timeout"], **kwargs)
+
+        # Nicely handle preprocessor arguments prioritizing values set by
+        # engine
+        final_kwargs = merge_kwargs(
+            safe_kwargs,
+            timeout=execution_timeout if execution_timeout else kwargs.get("timeout"),
+            startup_timeout=start_timeout,
+            kernel_name=kernel_name,
+            log=logger,
+            log_output=log_output,
+            stdout_file=stdout_file,
+            stderr_file=stderr_file,
+        )
+
+        path_to_dump = kwargs.get("path_to_dump")
+
+        if path_to_dump is None:
+            warnings.warn(
+                "Did not pass path_to_dump to "
+                "DebugLaterEngine.execute_managed_notebook, "
+                "the default value will be used"
+            )
+            source = """
+from debuglater import patch_ipython
+patch_ipython()
+"""
+        else:
+            source = f"""
+from debuglater import patch_ipython
+patch_ipython({path_to_dump!r})
+"""
+
+        cell = nbformat.versions[nb_man.nb["nbformat"]].new_code_cell(
+            source=source, metadata=dict(tags=[], papermill=dict())
+        )
+        nb_man.nb.cells.insert(0, cell)
+
+        return _execute_client(
+            PapermillNotebookClient, nb_man, kernel_pool, **final_kwargs
+        )
+
+
+class ProfilingEngine(Engine):
+    """
+    An engine that runs the notebook in the current process and can be used
+    for resource usage profiling
+    """
+
+    @classmethod
+    def execute_managed_notebook(
+        cls,
+        nb_man,
+        kernel_name,
+        log_output=False,
+        stdout_file=None,
+        stderr_file=None,
+        start_timeout=60,
+        execution_timeout=None,
+        **kwargs,
+    ):
+        return PloomberManagedClient(
+            nb_man,
+            cell_timeout=(
+                execution_timeout if execution_timeout else kwargs.get("timeout")
+            ),
+        ).execute()
@@ -0,0 +1,71 @@
+import os
+import sys
+import pickle
+import traceback
+import multiprocessing
+
+
+class _RemoteTraceback(Exception):
+    """Used to keep the traceback of an exception raised in a forked process"""
+
+    def __init__(self, tb):
+        self.tb = tb
+
+    def __str__(self):
+        return self.tb
+
+
+def _picklable_exception(exc):
+    tb = "".join(traceback.format_exception(type(exc), exc, exc.__traceback__))
+
+    try:
+        pickle.loads(pickle.dumps(exc))
+    except Exception:
+        exc = RuntimeError(f"{type(exc).__name__}: {exc}")
+
+    return exc, tb
+
+
+def run_in_fork(function, *args, **kwargs):
+    """Run a function in a forked process and return its result (it must be
+    picklable). Exceptions raised in the child are re-raised in the parent
+    """
+    if not hasattr(os, "fork"):
+        raise RuntimeError("Forking processes is not supported in this platform")
+
+    reader, writer = multiprocessing.Pipe(duplex=False)
+    pid = os.fork()
+
+    if pid == 0:
+        reader.close()
+
+        try:
+            try:
+                message = ("ok", function(*args, **kwargs))
+                writer.send(message)
+            except BaseException as e:
+                writer.send(("error", _picklable_exception(e)))
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(0)
+
+    writer.close()
+
+    try:
+        status, value = reader.recv()
+    except EOFError:
+        _, exit_status = os.waitpid(pid, 0)
+        raise ChildProcessError(
+            f"Forked process exited unexpectedly (exit status: {exit_status})"
+        ) from None
+    finally:
+        reader.close()
+
+    os.waitpid(pid, 0)
+
+    if status == "error":
+        exc, tb = value
+        raise exc from _RemoteTraceback(tb)
+
+    return value
@@ -0,0 +1,101 @@
+"""
+Serialization of the variables in a notebook's namespace
+"""
+
+import types
+import pickle
+import importlib
+from pathlib import Path
+
+try:
+    import cloudpickle
+except ModuleNotFoundError:
+    cloudpickle = None
+
+
+class _ModuleReference:
+    """Stored in place of modules, which cannot be pickled"""
+
+    def __init__(self, name):
+        self.name = name
+
+
+def _dumps(value):
+    if isinstance(value, types.ModuleType):
+        value = _ModuleReference(value.__name__)
+
+    # cloudpickle can serialize functions and classes defined in the notebook
+    return (cloudpickle or pickle).dumps(value)
+
+
+def _loads(data):
+    value = pickle.loads(data)
+
+    if isinstance(value, _ModuleReference):
+        value = importlib.import_module(value.name)
+
+    return value
+
+
+def dump_variables(namespace, names, directory):
+    """
+    Store variables, one file per variable. Returns a dictionary mapping
+    variable names to files (relative to directory); variables that cannot be
+    serialized are skipped
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    stored = {}
+
+    for i, name in enumerate(sorted(names)):
+        if name not in namespace:
+            continue
+
+        try:
+            data = _dumps(namespace[name])
+        except Exception:
+            continue
+
+        filename = f"{i}.pkl"
+        Path(directory, filename).write_bytes(data)
+        stored[name] = filename
+
+    return stored
+
+
+def load_variable(path, namespace):
+    """Load a variable stored with ``dump_variables``. Functions and classes
+    defined in the notebook are bound to the passed namespace, so they see the
+    current value of global variables
+    """
+    return _rebind(_loads(Path(path).read_bytes()), namespace)
+
+
+def _rebind_function(function, namespace):
+    rebound = types.FunctionType(
+        function.__code__,
+        namespace,
+        function.__name__,
+        function.__defaults__,
+        function.__closure__,
+    )
+    rebound.__kwdefaults__ = function.__kwdefaults__
+    rebound.__dict__.update(function.__dict__)
+    rebound.__qualname__ = function.__qualname__
+    rebound.__module__ = function.__module__
+    rebound.__doc__ = function.__doc__
+    return rebound
+
+
+def _rebind(value, namespace):
+    main = namespace.get("__name__", "__main__")
+
+    if isinstance(value, types.FunctionType) and value.__module__ == main:
+        return _rebind_function(value, namespace)
+
+    if isinstance(value, type) and value.__module__ == main:
+        for key, attribute in list(vars(value).items()):
+            if isinstance(attribute, types.FunctionType):
+                setattr(value, key, _rebind_function(attribute, namespace))
+
+    return value
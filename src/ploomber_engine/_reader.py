@@ -0,0 +1,209 @@
+"""
+Read notebooks without loading their outputs
+"""
+
+import re
+import json
+import mmap
+
+import nbformat
+from nbformat.validator import ValidationError
+from nbformat.v4.nbjson import JSONReader
+from traitlets.log import get_logger
+
+_WHITESPACE = re.compile(rb"[ \t\n\r]*")
+# the next character that can open or close a container or a string
+_STRUCTURAL = re.compile(rb'["\[\]{}]')
+# numbers, true, false, null
+_SCALAR = re.compile(rb"[^,\]} \t\n\r]+")
+
+
+class _Scanner:
+    """Walks a JSON document, parsing some values and skipping others"""
+
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+
+    def skip_whitespace(self):
+        self.pos = _WHITESPACE.match(self.data, self.pos).end()
+
+    def peek(self):
+        self.skip_whitespace()
+        return self.data[self.pos : self.pos + 1]
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at position {self.pos}")
+
+        self.pos += 1
+
+    def skip_value(self):
+        """Move to the end of the current value without parsing it"""
+        self.skip_whitespace()
+        start = self.pos
+        char = self.data[start : start + 1]
+
+        if char == b'"':
+            self.pos = self._end_of_string(start + 1)
+        elif char in (b"[", b"{"):
+            depth = 0
+            pos = start
+
+            while True:
+                match = _STRUCTURAL.search(self.data, pos)
+
+                if match is None:
+                    raise ValueError("Unterminated JSON value")
+
+                token = match.group()
+
+                if token == b'"':
+                    pos = self._end_of_string(match.end())
+                    continue
+
+                pos = match.end()
+                depth += 1 if token in (b"[", b"{") else -1
+
+                if depth == 0:
+                    break
+
+            self.pos = pos
+        else:
+            match = _SCALAR.match(self.data, start)
+
+            if match is None:
+                raise ValueError(f"Invalid JSON value at position {start}")
+
+            self.pos = match.end()
+
+        return start
+
+    def _end_of_string(self, pos):
+        """Returns the position after the closing quote of a string"""
+        data = self.data
+
+        while True:
+            # find() is much faster than a regular expression for long strings
+            quote = data.find(b'"', pos)
+
+            if quote == -1:
+                raise ValueError("Unterminated JSON string")
+
+            # the quote is escaped if preceded by an odd number of backslashes
+            backslashes = 0
+
+            while data[quote - backslashes - 1] == 0x5C:
+                backslashes += 1
+
+            if backslashes % 2 == 0:
+                return quote + 1
+
+            pos = quote + 1
+
+    def value(self):
+        start = self.skip_value()
+        return json.loads(bytes(self.data[start : self.pos]))
+
+    def items(self):
+        """Iterate over the keys of an object, the caller must consume (or
+        skip) each value
+        """
+        self.expect(b"{")
+
+        if self.peek() == b"}":
+            self.pos += 1
+            return
+
+        while True:
+            key = self.value()
+            self.expect(b":")
+            yield key
+
+            if self.peek() == b",":
+                self.pos += 1
+            else:
+                self.expect(b"}")
+                return
+
+    def elements(self):
+        """Iterate over the elements of an array, the caller must consume (or
+        skip) each element
+        """
+        self.expect(b"[")
+
+        if self.peek() == b"]":
+            self.pos += 1
+            return
+
+        while True:
+            yield
+
+            if self.peek() == b",":
+                self.pos += 1
+            else:
+                self.expect(b"]")
+                return
+
+
+def _read_cell(scanner):
+    cell = {}
+
+    for key in scanner.items():
+        if key == "outputs":
+            scanner.skip_value()
+            cell[key] = []
+        else:
+            cell[key] = scanner.value()
+
+    return cell
+
+
+def _read(data):
+    scanner = _Scanner(data)
+    nb = {}
+
+    for key in scanner.items():
+        if key == "cells":
+            nb[key] = [_read_cell(scanner) for _ in scanner.elements()]
+        else:
+            nb[key] = scanner.value()
+
+    return nb
+
+
+def read_without_outputs(path, validate=True):
+    """Read a notebook skipping the outputs of its cells. Outputs are never
+    deserialized, so memory usage and load time depend on the size of the
+    cells' source, not on the size of their outputs. Falls back to
+    ``nbformat.read`` for files it cannot parse (e.g., older formats) so
+    users get the same errors
+    """
+    with open(path, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty file
+            data = None
+
+        try:
+            nb = _read(data) if data is not None else None
+        except (ValueError, UnicodeDecodeError):
+            nb = None
+        finally:
+            if data is not None:
+                data.close()
+
+    if not isinstance(nb, dict) or nb.get("nbformat") != 4:
+        return nbformat.read(path, as_version=nbformat.NO_CONVERT)
+
+    # join multi-line strings and remove transient values, like nbformat.read
+    nb = JSONReader().to_notebook(nb)
+
+    if validate:
+        try:
+            nbformat.validate(nb)
+        except ValidationError as e:
+            get_logger().error("Notebook JSON is invalid: %s", e)
+
+    return nb
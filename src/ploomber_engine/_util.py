@@ -1,5 +1,10 @@
 from pathlib import Path
+import os
 import re
+import stat
+import ctypes
+import ctypes.util
+from functools import lru_cache
 
 import nbformat
 
@@ -138,3 +143,69 @@ def sibling_with_suffix(path, suffix):
     """
     path = Path(path)
     return path.with_name(path.stem + suffix)
+
+
+def _read_umask():
+    # the umask can only be read by setting it
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# read once, changing the umask is not thread-safe
+_NEW_FILE_MODE = 0o666 & ~_read_umask()
+
+
+def chmod_like(path, target):
+    """
+    Files created with tempfile.mkstemp are only readable by their owner, give
+    ``path`` the mode of ``target`` (or the mode of a new file, if it does not
+    exist) before it replaces it
+    """
+    try:
+        mode = stat.S_IMODE(os.stat(target).st_mode)
+    except FileNotFoundError:
+        mode = _NEW_FILE_MODE
+
+    os.chmod(path, mode)
+
+
+def cache_dir_for(path, *parts):
+    """
+    Returns a path inside the __ploomber_cache__ directory that sits next to
+    the given file
+    """
+    return Path(path).parent.joinpath("__ploomber_cache__", *parts)
+
+
+def rss():
+    """Returns the resident memory of the current process in bytes (None if
+    psutil is not installed)
+    """
+    try:
+        import psutil
+    except ModuleNotFoundError:
+        return None
+
+    return psutil.Process().memory_info().rss
+
+
+@lru_cache(maxsize=None)
+def _malloc_trim_function():
+    """Returns glibc's malloc_trim (None if not available). Finding the
+    library runs a subprocess, so it's only done once
+    """
+    try:
+        return ctypes.CDLL(ctypes.util.find_library("c")).malloc_trim
+    except (OSError, AttributeError, TypeError):
+        return None
+
+
+def malloc_trim():
+    """Return free memory held by glibc's allocator to the OS (no-op on other
+    platforms)
+    """
+    function = _malloc_trim_function()
+
+    if function is not None:
+        function(0)
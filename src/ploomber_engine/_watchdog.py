@@ -0,0 +1,230 @@
+"""
+Interrupt the code running in a thread by raising an exception in it
+"""
+
+import ctypes
+import signal
+import threading
+import contextlib
+from time import monotonic
+
+from ploomber_core.dependencies import requires
+
+try:
+    import psutil
+except ModuleNotFoundError:
+    psutil = None
+
+
+# arguments of the exceptions scheduled by raise_in_thread that the target
+# thread has not raised yet, maps (thread id, exception class) -> args
+_SCHEDULED = {}
+_SCHEDULED_LOCK = threading.Lock()
+
+
+class _Scheduled:
+    """
+    Base for exceptions raised with ``raise_in_thread``.
+    PyThreadState_SetAsyncExc only takes an exception class and instantiates
+    it without arguments in the target thread, so they are taken from the ones
+    stored when scheduling it
+    """
+
+    def __init__(self, *args):
+        if not args:
+            with _SCHEDULED_LOCK:
+                key = (threading.get_ident(), type(self))
+                args = _SCHEDULED.pop(key, ())
+
+        super().__init__(*args)
+
+
+class CellTimeoutError(_Scheduled, TimeoutError):
+    """Raised when a cell (or the whole notebook) exceeds its timeout"""
+
+
+class MemoryLimitError(_Scheduled, MemoryError):
+    """Raised when the process exceeds the memory limit"""
+
+
+def raise_in_thread(thread_id, exception):
+    """Raise an exception in another thread. The exception is raised when the
+    thread executes the next Python instruction (it does not interrupt
+    blocking calls)
+    """
+    exception_class = type(exception)
+
+    if not issubclass(exception_class, _Scheduled):
+        raise TypeError(f"Cannot raise {exception_class.__name__} in a thread")
+
+    with _SCHEDULED_LOCK:
+        _SCHEDULED[(thread_id, exception_class)] = exception.args
+
+    modified = ctypes.pythonapi.PyThreadState_SetAsyncExc(
+        ctypes.c_ulong(thread_id), ctypes.py_object(exception_class)
+    )
+
+    # the thread already finished
+    if modified == 0:
+        _clear_pending(thread_id)
+        return False
+
+    if modified > 1:
+        # more than one thread affected, revert
+        _clear_pending(thread_id)
+        raise SystemError("PyThreadState_SetAsyncExc modified more than one thread")
+
+    return True
+
+
+def _clear_pending(thread_id):
+    """Discard an exception scheduled by raise_in_thread that the thread has
+    not raised yet
+    """
+    ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(thread_id), None)
+
+    with _SCHEDULED_LOCK:
+        for key in [key for key in _SCHEDULED if key[0] == thread_id]:
+            del _SCHEDULED[key]
+
+
+def _can_use_alarm():
+    return (
+        hasattr(signal, "setitimer")
+        and threading.current_thread() is threading.main_thread()
+    )
+
+
+@contextlib.contextmanager
+def _alarm(seconds, exception):
+    def handler(signum, frame):
+        raise exception
+
+    previous_handler = signal.signal(signal.SIGALRM, handler)
+    previous_delay, _ = signal.getitimer(signal.ITIMER_REAL)
+    start = monotonic()
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+
+        # re-arm the timer that was active before (if any)
+        if previous_delay:
+            remaining = previous_delay - (monotonic() - start)
+            signal.setitimer(signal.ITIMER_REAL, max(remaining, 1e-3))
+
+
+@contextlib.contextmanager
+def _timer(seconds, exception):
+    thread_id = threading.get_ident()
+    lock = threading.Lock()
+    active = True
+
+    def interrupt():
+        with lock:
+            if active:
+                raise_in_thread(thread_id, exception)
+
+    timer = threading.Timer(seconds, interrupt)
+    timer.daemon = True
+    timer.start()
+
+    try:
+        yield
+    finally:
+        with lock:
+            active = False
+            _clear_pending(thread_id)
+
+        timer.cancel()
+
+
+def interrupt_after(seconds, exception):
+    """
+    Context manager that raises ``exception`` in the current thread if the
+    block takes longer than ``seconds``. Uses ``SIGALRM`` in the main thread
+    (which also interrupts blocking calls such as ``time.sleep``) and a timer
+    thread otherwise. If ``seconds`` is None, it does nothing
+    """
+    if seconds is None:
+        return contextlib.nullcontext()
+
+    # setitimer disables the timer if passed 0
+    seconds = max(seconds, 1e-3)
+
+    if _can_use_alarm():
+        return _alarm(seconds, exception)
+    else:
+        return _timer(seconds, exception)
+
+
+class MemoryWatchdog:
+    """
+    Samples the resident memory of the current process in a background thread
+    and raises ``MemoryLimitError`` in the threads executing a ``watch()`` block
+    if it exceeds ``max_bytes``. Allocations that happen in a single call (e.g.,
+    creating a large array) are only detected once the call returns
+    """
+
+    @requires(["psutil"], name="max_memory")
+    def __init__(self, max_bytes, interval=0.05):
+        self.max_bytes = max_bytes
+        self._interval = interval
+        self._process = psutil.Process()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        # threads executing a watch() block
+        self._thread_ids = set()
+
+    @contextlib.contextmanager
+    def watch(self):
+        # the thread is not running after fork()
+        if self._thread is None or not self._thread.is_alive():
+            self._lock = threading.Lock()
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+        thread_id = threading.get_ident()
+
+        with self._lock:
+            self._thread_ids.add(thread_id)
+
+        try:
+            yield
+        finally:
+            with self._lock:
+                if thread_id in self._thread_ids:
+                    _clear_pending(thread_id)
+                    self._thread_ids.remove(thread_id)
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            rss = self._process.memory_info().rss
+
+            if rss <= self.max_bytes:
+                continue
+
+            with self._lock:
+                for thread_id in self._thread_ids:
+                    raise_in_thread(
+                        thread_id,
+                        MemoryLimitError(
+                            "Notebook exceeded the memory limit of "
+                            f"{self.max_bytes / 1048576:g} MB "
+                            f"(using {rss / 1048576:.0f} MB)"
+                        ),
+                    )
+
+                # raise it only once per cell
+                self._thread_ids.clear()
@@ -0,0 +1,424 @@
+"""
+Execute many notebooks in parallel using a pool of worker processes, or
+concurrently in Jupyter kernels driven from a single event loop
+"""
+
+import asyncio
+import traceback
+from functools import partial
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import nbformat
+
+from ploomber_engine.execute import execute_notebook
+from ploomber_engine.pool import ShellPool
+from ploomber_engine.client import PloomberNotebookClient
+from ploomber_engine._util import parametrize_notebook
+
+# initialized in every worker process, so all the notebooks a worker executes
+# reuse the same shell
+_SHELL_POOL = None
+
+
+class JobResult:
+    """Represents the result of executing a notebook in a worker process"""
+
+    def __init__(self, input_path, output_path, parameters, elapsed, error=None):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.parameters = parameters
+        self.elapsed = elapsed
+        self.error = error
+
+    @property
+    def success(self):
+        return self.error is None
+
+    def __repr__(self):
+        status = "success" if self.success else "failed"
+        return (
+            f"{type(self).__name__}(input_path={self.input_path!r}, "
+            f"output_path={self.output_path!r}, {status})"
+        )
+
+    def to_dict(self):
+        return dict(
+            input_path=str(self.input_path),
+            output_path=str(self.output_path),
+            parameters=self.parameters,
+            elapsed=self.elapsed,
+            error=self.error,
+        )
+
+
+def _normalize_job(job):
+    if isinstance(job, dict):
+        unknown = set(job) - {"input_path", "output_path", "parameters"}
+
+        if unknown:
+            raise ValueError(f"Unexpected keys in job: {sorted(unknown)}")
+
+        return job["input_path"], job.get("output_path"), job.get("parameters")
+
+    if isinstance(job, (list, tuple)) and len(job) in {2, 3}:
+        input_path, output_path, *parameters = job
+        return input_path, output_path, parameters[0] if parameters else None
+
+    raise ValueError(
+        "Expected job to be a dictionary or a (input_path, output_path"
+        f"[, parameters]) tuple, got: {job!r}"
+    )
+
+
+def _init_worker():
+    global _SHELL_POOL
+    _SHELL_POOL = ShellPool(size=1)
+
+
+def _execute_job(input_path, output_path, parameters, kwargs):
+    start = perf_counter()
+
+    try:
+        execute_notebook(
+            input_path,
+            output_path,
+            parameters=parameters,
+            shell_pool=_SHELL_POOL,
+            **kwargs,
+        )
+    except Exception:
+        error = traceback.format_exc()
+    else:
+        error = None
+
+    return JobResult(
+        input_path=input_path,
+        output_path=output_path,
+        parameters=parameters,
+        elapsed=perf_counter() - start,
+        error=error,
+    )
+
+
+def execute_notebooks(jobs, max_workers=None, mp_context=None, **kwargs):
+    """Execute notebooks in parallel using a pool of worker processes
+
+    Parameters
+    ----------
+    jobs : iterable
+        Notebooks to execute. Each job is a ``(input_path, output_path)``
+        tuple, a ``(input_path, output_path, parameters)`` tuple, or a
+        dictionary with ``input_path``, ``output_path`` and ``parameters`` keys
+
+    max_workers : int, default=None
+        Number of worker processes. Defaults to the number of CPUs
+
+    mp_context : multiprocessing context, default=None
+        Context used to start the worker processes
+
+    **kwargs
+        Passed to ``execute_notebook`` for every job
+
+    Returns
+    -------
+    iterator
+        Yields a ``JobResult`` for every job as soon as it finishes. Failed
+        notebooks do not stop the batch, the formatted traceback is stored in
+        the ``error`` attribute. Notebooks are executed in the background but
+        the workers are shut down once the iterator is exhausted, so make sure
+        to consume it. If a worker crashes, the unfinished jobs are executed
+        again in a new pool and only the one that crashed the worker fails
+
+    Notes
+    -----
+    .. versionadded:: 0.0.34
+
+    Examples
+    --------
+    >>> from ploomber_engine import execute_notebooks
+    >>> jobs = [("nb.ipynb", "out-1.ipynb", dict(x=1)),
+    ...         ("nb.ipynb", "out-2.ipynb", dict(x=2))]
+    >>> results = list(execute_notebooks(jobs, max_workers=2, progress_bar=False))
+    >>> all(result.success for result in results)
+    True
+    """
+    jobs = [_normalize_job(job) for job in jobs]
+    kwargs = {"progress_bar": False, **kwargs}
+    # submit the jobs right away so they start executing in the background
+    pool = _submit(jobs, range(len(jobs)), kwargs, max_workers, mp_context)
+    return _iter_results(jobs, pool, kwargs, max_workers, mp_context)
+
+
+def _iter_results(jobs, pool, kwargs, max_workers, mp_context):
+    crashed = yield from _collect(jobs, *pool)
+
+    # a worker died (e.g., it was killed by the OS) and the pool failed all
+    # the unfinished jobs, try them again in a new pool
+    if crashed:
+        pool = _submit(jobs, sorted(crashed), kwargs, max_workers, mp_context)
+        crashed = yield from _collect(jobs, *pool)
+
+    # the pool broke again, execute the remaining jobs one at a time so only
+    # the one that crashes the worker is reported as failed
+    for index in sorted(crashed):
+        pool = _submit(jobs, [index], kwargs, 1, mp_context)
+        error = yield from _collect(jobs, *pool)
+
+        if error:
+            input_path, output_path, parameters = jobs[index]
+            yield JobResult(
+                input_path=input_path,
+                output_path=output_path,
+                parameters=parameters,
+                elapsed=None,
+                error=error[index],
+            )
+
+
+def _submit(jobs, indexes, kwargs, max_workers, mp_context):
+    """Submit the jobs at ``indexes`` to a new pool"""
+    executor = ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=mp_context, initializer=_init_worker
+    )
+    futures = {
+        executor.submit(_execute_job, *jobs[index], kwargs=kwargs): index
+        for index in indexes
+    }
+    return executor, futures
+
+
+def _collect(jobs, executor, futures):
+    """
+    Yields the results of the submitted jobs and returns the ones that did not
+    finish because a worker crashed ({index: formatted traceback})
+    """
+    crashed = {}
+
+    try:
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                crashed[futures[future]] = traceback.format_exc()
+                continue
+            except Exception:
+                input_path, output_path, parameters = jobs[futures[future]]
+                result = JobResult(
+                    input_path=input_path,
+                    output_path=output_path,
+                    parameters=parameters,
+                    elapsed=None,
+                    error=traceback.format_exc(),
+                )
+
+            yield result
+    finally:
+        # the caller may stop iterating early, do not start the pending jobs
+        # (shutdown's cancel_futures requires Python 3.9)
+        for future in futures:
+            future.cancel()
+
+        executor.shutdown(wait=True)
+
+    return crashed
+
+
+async def _execute_job_async(
+    input_path, output_path, parameters, semaphore, kernel_pool, cwd, kwargs
+):
+    # reading and writing notebooks blocks, run it in a thread so the other
+    # kernels keep being driven
+    loop = asyncio.get_running_loop()
+
+    async with semaphore:
+        start = perf_counter()
+        nb = await loop.run_in_executor(
+            None, partial(nbformat.read, input_path, as_version=nbformat.NO_CONVERT)
+        )
+
+        if parameters:
+            parametrize_notebook(nb, parameters)
+
+        client = PloomberNotebookClient(
+            nb,
+            kernel_pool=kernel_pool,
+            resources={"metadata": {"path": str(cwd)}},
+            **kwargs,
+        )
+
+        try:
+            await client.async_execute()
+        except Exception:
+            error = traceback.format_exc()
+        else:
+            error = None
+        finally:
+            # also store partially executed (or cancelled) notebooks
+            if output_path is not None:
+                await loop.run_in_executor(None, nbformat.write, nb, output_path)
+
+        return JobResult(
+            input_path=input_path,
+            output_path=output_path,
+            parameters=parameters,
+            elapsed=perf_counter() - start,
+            error=error,
+        )
+
+
+class AsyncBatch:
+    """Notebooks executed concurrently by ``execute_notebooks_async``.
+    Iterate over it with ``async for`` to get the results as notebooks
+    finish, or ``await`` it to get all of them (in the order they finish)
+    """
+
+    def __init__(self, jobs, max_concurrency, kernel_pool, cwd, kwargs):
+        self._jobs = jobs
+        self._max_concurrency = max_concurrency
+        self._kernel_pool = kernel_pool
+        self._cwd = cwd
+        self._kwargs = kwargs
+        self._tasks = None
+        self._cancelled = set()
+
+    def __repr__(self):
+        return f"{type(self).__name__}(n_jobs={len(self._jobs)})"
+
+    def cancel(self, index=None):
+        """Cancel the job at ``index`` (the position in the list of jobs), or
+        all the jobs if None. If the job is executing, the kernel is
+        interrupted; its result has ``error="Cancelled"``
+        """
+        indexes = range(len(self._jobs)) if index is None else [index]
+
+        for i in indexes:
+            self._cancelled.add(i)
+
+            if self._tasks is not None:
+                self._tasks[i].cancel()
+
+    def _start(self):
+        if self._tasks is not None:
+            raise RuntimeError("The batch was already executed")
+
+        semaphore = asyncio.Semaphore(self._max_concurrency or len(self._jobs) or 1)
+        self._tasks = [
+            asyncio.ensure_future(
+                _execute_job_async(
+                    *job,
+                    semaphore=semaphore,
+                    kernel_pool=self._kernel_pool,
+                    cwd=self._cwd,
+                    kwargs=self._kwargs,
+                )
+            )
+            for job in self._jobs
+        ]
+
+        for i in self._cancelled:
+            self._tasks[i].cancel()
+
+    def _result(self, index):
+        task = self._tasks[index]
+
+        if not task.cancelled():
+            return task.result()
+
+        input_path, output_path, parameters = self._jobs[index]
+        return JobResult(
+            input_path=input_path,
+            output_path=output_path,
+            parameters=parameters,
+            elapsed=None,
+            error="Cancelled",
+        )
+
+    async def __aiter__(self):
+        self._start()
+        indexes = {task: i for i, task in enumerate(self._tasks)}
+        pending = set(self._tasks)
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for task in sorted(done, key=indexes.get):
+                    yield self._result(indexes[task])
+        finally:
+            # the caller stopped iterating (or was cancelled), stop the rest
+            for task in pending:
+                task.cancel()
+
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _collect(self):
+        return [result async for result in self]
+
+    def __await__(self):
+        return self._collect().__await__()
+
+
+def execute_notebooks_async(
+    jobs, max_concurrency=None, kernel_pool=None, cwd=".", **kwargs
+):
+    """Execute notebooks concurrently, each one in its own Jupyter kernel.
+    All the kernels are driven from the running event loop, so waiting for
+    one kernel does not block the others and no threads or processes are
+    started to orchestrate them
+
+    Parameters
+    ----------
+    jobs : iterable
+        Notebooks to execute. Each job is a ``(input_path, output_path)``
+        tuple, a ``(input_path, output_path, parameters)`` tuple, or a
+        dictionary with ``input_path``, ``output_path`` and ``parameters`` keys
+
+    max_concurrency : int, default=None
+        Maximum number of notebooks executing at the same time. Defaults to
+        all of them
+
+    kernel_pool : KernelPool, default=None
+        Take the kernels from this pool instead of starting a new one for each
+        notebook
+
+    cwd : str or Path, default='.'
+        Working directory to use when executing the notebooks
+
+    **kwargs
+        Passed to ``PloomberNotebookClient`` for every job (e.g.,
+        ``kernel_name`` or ``timeout``)
+
+    Returns
+    -------
+    AsyncBatch
+        Use ``async for`` to get a ``JobResult`` for every job as soon as it
+        finishes, or ``await`` it to get all the results. Failed notebooks do
+        not stop the batch, the formatted traceback is stored in the ``error``
+        attribute. Use ``AsyncBatch.cancel`` to cancel a job
+
+    Notes
+    -----
+    .. versionadded:: 0.0.34
+
+    Examples
+    --------
+    >>> import asyncio
+    >>> from ploomber_engine import execute_notebooks_async
+    >>> jobs = [("nb.ipynb", "out-1.ipynb", dict(x=1)),
+    ...         ("nb.ipynb", "out-2.ipynb", dict(x=2))]
+    >>> async def main():
+    ...     return await execute_notebooks_async(jobs, max_concurrency=2)
+    >>> results = asyncio.run(main())
+    >>> all(result.success for result in results)
+    True
+    """
+    jobs = [_normalize_job(job) for job in jobs]
+
+    if max_concurrency is not None and max_concurrency < 1:
+        raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+
+    return AsyncBatch(jobs, max_concurrency, kernel_pool, cwd, kwargs)
@@ -0,0 +1,200 @@
+"""
+On-disk cache of transformed source and compiled code for notebook cells
+"""
+
+import os
+import sys
+import codeop
+import marshal
+import hashlib
+import tempfile
+from pathlib import Path
+
+import IPython
+from IPython.core.compilerop import CachingCompiler
+from IPython.core.inputtransformer2 import TransformerManager
+
+from ploomber_engine._util import chmod_like
+
+
+class BytecodeCache:
+    """Stores the transformed source (after applying IPython's input
+    transformers) and the compiled code of every cell, so executing the same
+    cell again skips both steps. Entries are keyed by the cell's source and the
+    Python and IPython versions
+
+    Parameters
+    ----------
+    path : str or Path
+        Directory to store the cache
+
+    Attributes
+    ----------
+    hits : int
+        Number of cells executed using cached code
+
+    misses : int
+        Number of cells that had to be transformed and compiled
+
+    Notes
+    -----
+    .. versionadded:: 0.0.34
+
+    Examples
+    --------
+    >>> from ploomber_engine.ipython import PloomberClient
+    >>> from ploomber_engine.bytecode import BytecodeCache
+    >>> cache = BytecodeCache("bytecode")
+    >>> out = PloomberClient.from_path("nb.ipynb", bytecode_cache=cache).execute()
+    >>> out = PloomberClient.from_path("nb.ipynb", bytecode_cache=cache).execute()
+    >>> cache.hits, cache.misses
+    (1, 1)
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return (
+            f"{type(self).__name__}(path={str(self.path)!r}, "
+            f"hits={self.hits}, misses={self.misses})"
+        )
+
+    def _key(self, source):
+        version = f"{sys.version}\n{IPython.__version__}\n"
+        return hashlib.sha256((version + source).encode()).hexdigest()
+
+    def _load(self, key):
+        try:
+            return marshal.loads(Path(self.path, f"{key}.bin").read_bytes())
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+    def _store(self, key, entry):
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        # write to a temporary file and rename so concurrent executions never
+        # read a partially written entry
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+
+        with os.fdopen(fd, "wb") as f:
+            f.write(marshal.dumps(entry))
+
+        path = Path(self.path, f"{key}.bin")
+        chmod_like(tmp, path)
+        os.replace(tmp, path)
+
+    def run_cell(self, shell, source):
+        """Run a cell in the shell using the cached transformed source and
+        code (if available), returns the ``ExecutionResult``
+        """
+        key = self._key(source)
+        entry = self._load(key)
+
+        transformer = shell.input_transformer_manager
+        compiler = shell.compile
+        recording = _RecordingCompiler(compiler, entry)
+        caching_transformer = _CachingTransformer(
+            transformer, source, None if entry is None else entry["transformed"]
+        )
+
+        shell.input_transformer_manager = caching_transformer
+        shell.compile = recording
+
+        try:
+            result = shell.run_cell(source)
+        finally:
+            shell.input_transformer_manager = transformer
+            shell.compile = compiler
+            # keep the __future__ flags the cell enabled
+            compiler.flags = recording.flags
+
+        if entry is not None and not recording.compiled:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+            # if the cell failed, some statements might not have been compiled
+            if result.success:
+                self._store(
+                    key,
+                    dict(
+                        transformed=caching_transformer.transformed,
+                        codes=recording.codes,
+                    ),
+                )
+
+        return result
+
+
+class _CachingTransformer(TransformerManager):
+    """
+    Returns the stored transformed source for a given cell (if available),
+    otherwise it transforms it and records the result
+    """
+
+    def __init__(self, parent, source, transformed):
+        super().__init__()
+        self._parent = parent
+        self._source = source
+        self.transformed = transformed
+
+    def transform_cell(self, cell):
+        if cell != self._source:
+            return self._parent.transform_cell(cell)
+
+        if self.transformed is None:
+            self.transformed = self._parent.transform_cell(cell)
+
+        return self.transformed
+
+
+class _RecordingCompiler(CachingCompiler):
+    """
+    A compiler that returns cached code objects (if available) and records
+    the ones it compiles
+    """
+
+    def __init__(self, parent, entry):
+        super().__init__()
+        self.flags = parent.flags
+        self._filename_map = parent._filename_map
+        self._cached = [] if entry is None else entry["codes"]
+        self.codes = []
+        self.compiled = False
+
+    def __call__(self, source, filename, symbol):
+        position = len(self.codes)
+        flags = self.flags
+
+        if position < len(self._cached) and self._cached[position][:2] == (
+            symbol,
+            flags,
+        ):
+            code = _replace_filename(self._cached[position][2], filename)
+
+            # same as codeop.Compile.__call__, the cell may enable
+            # __future__ features for the next ones
+            for feature in codeop._features:
+                if code.co_flags & feature.compiler_flag:
+                    self.flags |= feature.compiler_flag
+        else:
+            code = super().__call__(source, filename, symbol)
+            self.compiled = True
+
+        self.codes.append((symbol, flags, code))
+        return code
+
+
+def _replace_filename(code, filename):
+    """
+    Replace the filename in a code object (and the ones nested in it, e.g.,
+    function definitions), so tracebacks point to the current cell
+    """
+    consts = tuple(
+        _replace_filename(const, filename) if isinstance(const, type(code)) else const
+        for const in code.co_consts
+    )
+    return code.replace(co_filename=filename, co_consts=consts)
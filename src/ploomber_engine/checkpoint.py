@@ -0,0 +1,224 @@
+"""
+Store the notebook's namespace while executing it, to resume after a failure
+"""
+
+import json
+import shutil
+import hashlib
+import warnings
+from pathlib import Path
+
+import nbformat
+
+from ploomber_engine.ipython import PloomberClient, add_to_sys_path
+from ploomber_engine._namespace import dump_variables, load_variable
+from ploomber_engine._util import cache_dir_for
+
+_METADATA = "checkpoint.json"
+_NOTEBOOK = "notebook.ipynb"
+_VARIABLES = "variables"
+
+
+class CheckpointClient(PloomberClient):
+    """A ``PloomberClient`` that stores the notebook's variables and outputs
+    after executing some cells, so a failed execution can be resumed from the
+    last checkpoint instead of starting over
+
+    Parameters
+    ----------
+    nb
+        Notebook object
+
+    checkpoint_dir : str or Path
+        Directory to store the checkpoint
+
+    every : int, default=None
+        Store a checkpoint every ``every`` code cells. Regardless of this
+        value, a checkpoint is stored after every cell tagged ``checkpoint``
+
+    resume : bool, default=False
+        If True, restore the checkpoint stored by a previous execution (if
+        any) and continue from the next cell
+
+    **kwargs
+        Any other ``PloomberClient`` arguments
+
+    Notes
+    -----
+    Variables are serialized with ``cloudpickle`` (if installed) or
+    ``pickle``; variables that cannot be serialized are skipped and a warning
+    is shown when resuming. A checkpoint is only restored if the cells before
+    it did not change (cells after it may change, e.g., to fix the one that
+    failed). The checkpoint is deleted once the notebook finishes executing.
+
+    .. versionadded:: 0.0.34
+
+    Examples
+    --------
+    >>> from ploomber_engine.checkpoint import CheckpointClient
+    >>> import nbformat
+    >>> nb = nbformat.v4.new_notebook()
+    >>> nb.cells = [nbformat.v4.new_code_cell("x = 41"),
+    ...             nbformat.v4.new_code_cell("x + 1")]
+    >>> client = CheckpointClient(nb, checkpoint_dir="checkpoint", every=1)
+    >>> out = client.execute()
+    >>> out.cells[1]['outputs'][0]['data']
+    {'text/plain': '42'}
+    """
+
+    def __init__(self, nb, checkpoint_dir=None, every=None, resume=False, **kwargs):
+        super().__init__(nb, **kwargs)
+        self._checkpoint_dir = None if checkpoint_dir is None else Path(checkpoint_dir)
+        self._every = every
+        self._resume = resume
+
+    @classmethod
+    def from_path(cls, path, checkpoint_dir=None, every=None, resume=False, **kwargs):
+        """Initialize client from a path to a notebook. If ``checkpoint_dir`` is
+        None, it uses ``__ploomber_cache__/checkpoints/{notebook name}`` in the
+        notebook's directory
+        """
+        client = super().from_path(path, **kwargs)
+        client._checkpoint_dir = Path(
+            checkpoint_dir or cache_dir_for(path, "checkpoints", Path(path).stem)
+        )
+        client._every = every
+        client._resume = resume
+        return client
+
+    def _execute(self):
+        if self._checkpoint_dir is None:
+            raise ValueError("CheckpointClient requires a checkpoint_dir")
+
+        cells = self._nb.cells
+
+        with add_to_sys_path(self._cwd):
+            start, execution_count = self._restore() if self._resume else (0, 1)
+
+            for cell in cells[:start]:
+                if cell.cell_type == "code":
+                    self._write_cell(cell)
+                    self._cell_executed(cell, cell.execution_count)
+
+            iterator = self._make_iterator(cells[start:])
+            executed = 0
+
+            for index, cell in enumerate(iterator, start=start):
+                if cell.cell_type != "code":
+                    continue
+
+                if self._progress_bar:
+                    iterator.set_description(f"Executing cell: {execution_count}")
+
+                self.execute_cell(
+                    cell,
+                    cell_index=index,
+                    execution_count=execution_count,
+                    store_history=False,
+                )
+                execution_count += 1
+                executed += 1
+
+                tagged = "checkpoint" in cell.metadata.get("tags", [])
+                scheduled = self._every and executed % self._every == 0
+
+                if (tagged or scheduled) and index + 1 < len(cells):
+                    self._store(next_index=index + 1, execution_count=execution_count)
+
+        # the notebook finished, there's nothing to resume
+        shutil.rmtree(self._checkpoint_dir, ignore_errors=True)
+
+        return self._nb
+
+    def _store(self, next_index, execution_count):
+        tmp = self._checkpoint_dir / "tmp"
+        latest = self._checkpoint_dir / "latest"
+        previous = self._checkpoint_dir / "previous"
+
+        if tmp.exists():
+            shutil.rmtree(tmp)
+
+        names = set(self._shell._get_interactive_variables())
+        variables = dump_variables(self._shell.user_ns, names, tmp / _VARIABLES)
+        metadata = dict(
+            next_index=next_index,
+            execution_count=execution_count,
+            source_hash=_hash_cells(self._nb.cells[:next_index]),
+            variables=variables,
+            skipped=sorted(names - set(variables)),
+        )
+
+        nbformat.write(self._nb, tmp / _NOTEBOOK)
+        Path(tmp, _METADATA).write_text(json.dumps(metadata))
+
+        # keep the previous checkpoint until the new one is in place, so there
+        # is always a complete one if the process dies while storing it
+        if latest.exists():
+            if previous.exists():
+                shutil.rmtree(previous)
+
+            latest.rename(previous)
+
+        tmp.rename(latest)
+
+        if previous.exists():
+            shutil.rmtree(previous)
+
+    def _load_metadata(self):
+        """Returns the path and metadata of the latest valid checkpoint"""
+        for name in ("latest", "previous"):
+            path = self._checkpoint_dir / name
+
+            try:
+                metadata = json.loads(Path(path, _METADATA).read_text())
+            except (OSError, ValueError):
+                continue
+
+            # cells before the checkpoint must be the same
+            cells = self._nb.cells[: metadata["next_index"]]
+
+            if _hash_cells(cells) == metadata["source_hash"]:
+                return path, metadata
+
+        return None, None
+
+    def _restore(self):
+        """
+        Restore the outputs and variables from the last checkpoint, returns
+        the index of the next cell to execute and its execution count
+        """
+        path, metadata = self._load_metadata()
+
+        if path is None:
+            return 0, 1
+
+        stored = nbformat.read(path / _NOTEBOOK, as_version=nbformat.NO_CONVERT)
+        next_index = metadata["next_index"]
+
+        for cell, stored_cell in zip(self._nb.cells[:next_index], stored.cells):
+            if cell.cell_type == "code":
+                cell.outputs = stored_cell.outputs
+                cell.execution_count = stored_cell.execution_count
+                cell.metadata = stored_cell.metadata
+
+        user_ns = self._shell.user_ns
+
+        for name, filename in metadata["variables"].items():
+            user_ns[name] = load_variable(path / _VARIABLES / filename, user_ns)
+
+        if metadata["skipped"]:
+            warnings.warn(
+                "The following variables could not be stored in the checkpoint "
+                f"and were not restored: {', '.join(metadata['skipped'])}"
+            )
+
+        return next_index, metadata["execution_count"]
+
+
+def _hash_cells(cells):
+    hash_ = hashlib.sha256()
+
+    for cell in cells:
+        hash_.update(f"{cell.cell_type}\n{cell.source}\n".encode())
+
+    return hash_.hexdigest()
@@ -3,14 +3,23 @@ Command-line interface
 """
 
 import ast
-import click
+import json
+from pathlib import Path
 
-from ploomber_engine import execute_notebook
+import click
 
 
 @click.command()
-@click.argument("input_path", type=click.Path(exists=True))
-@click.argument("output_path", type=click.Path(exists=False))
+# not required when passing --batch
+@click.argument(
+    "input_path", required=False, metavar="INPUT_PATH", type=click.Path(exists=True)
+)
+@click.argument(
+    "output_path",
+    required=False,
+    metavar="OUTPUT_PATH",
+    type=click.Path(exists=False),
+)
 @click.option(
     "--log-output",
     is_flag=True,
@@ -65,7 +74,23 @@ from ploomber_engine import execute_notebook
     help="Save profiling data to a file "
     "(requires --profile-runtime and/or --profile-memory)",
 )
+@click.option(
+    "--batch",
+    "jobs_file",
+    default=None,
+    type=click.Path(exists=True),
+    help="Execute in parallel the notebooks listed in a JSON file "
+    "(a list of {input_path, output_path, parameters} jobs)",
+)
+@click.option(
+    "--max-workers",
+    default=None,
+    type=int,
+    help="Worker processes (requires --batch)",
+)
+@click.pass_context
 def cli(
+    ctx,
     input_path,
     output_path,
     log_output,
@@ -77,6 +102,8 @@ def cli(
     remove_tagged_cells,
     cwd,
     save_profiling_data,
+    jobs_file,
+    max_workers,
 ):
     """
     Execute my-notebook.ipynb, store results in output.ipynb:
@@ -103,7 +130,24 @@ def cli(
     Remove cells before execution:
 
     $ ploomber-engine my-notebook.ipynb output.ipynb --remove-tagged-cells remove
+
+    Execute the notebooks listed in a JSON file in parallel:
+
+    $ ploomber-engine --batch jobs.json --max-workers 8
     """
+    if jobs_file:
+        if input_path or output_path:
+            raise click.UsageError("Do not pass notebooks when passing --batch")
+
+        return _execute_batch(jobs_file, max_workers=max_workers, cwd=cwd)
+
+    for param in ctx.command.params[:2]:
+        if ctx.params[param.name] is None:
+            raise click.MissingParameter(ctx=ctx, param=param)
+
+    # imported here so --help does not import IPython
+    from ploomber_engine.execute import execute_notebook
+
     execute_notebook(
         input_path,
         output_path,
@@ -120,6 +164,28 @@ def cli(
     )
 
 
+def _execute_batch(jobs_file, max_workers, cwd):
+    from ploomber_engine.batch import execute_notebooks
+
+    jobs = json.loads(Path(jobs_file).read_text())
+    failed = 0
+
+    for result in execute_notebooks(jobs, max_workers=max_workers, cwd=cwd):
+        if result.success:
+            click.secho(
+                f"Executed {result.input_path} ({result.elapsed:.2f}s)", fg="green"
+            )
+        else:
+            failed += 1
+            click.secho(f"Failed to execute {result.input_path}", fg="red")
+            click.echo(result.error)
+
+    click.echo(f"Executed {len(jobs)} notebooks, {failed} failed")
+
+    if failed:
+        raise SystemExit(1)
+
+
 def _safe_literal_eval(val):
     try:
         return ast.literal_eval(val)
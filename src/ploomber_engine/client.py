@@ -1,10 +1,10 @@
 import sys
-import time
 import asyncio
 import typing as t
 from queue import Empty
+from itertools import groupby
 
-
+import zmq
 from nbclient import NotebookClient
 from nbclient.util import ensure_async, run_sync
 
@@ -14,17 +14,40 @@ try:
 except ImportError:
     run_hook = None
 
-from nbclient.exceptions import CellControlSignal, DeadKernelError
+from nbclient.exceptions import (
+    CellControlSignal,
+    CellExecutionComplete,
+    DeadKernelError,
+)
 from nbformat import NotebookNode
 from jupyter_client.client import KernelClient
 
+# maximum number of messages to take from a channel at once, so chatty cells
+# do not delay processing indefinitely
+_MAX_BATCH = 1000
+
+# seconds to wait for the kernel to reply after interrupting it
+_INTERRUPT_TIMEOUT = 10
+
 
 class PloomberNotebookClient(NotebookClient):
     """
     A subclass of nbclient.NotebookClient with stdin support
+
+    Parameters
+    ----------
+    kernel_pool : KernelPool, default=None
+        If not None, execute the notebook in a kernel from this pool instead
+        of starting a new one. The kernel is returned to the pool once the
+        execution finishes
+
+    Notes
+    -----
+    .. versionchanged:: 0.0.34
+        Added ``kernel_pool`` argument.
     """
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, kernel_pool=None, **kwargs):
         if run_hook is None:
             raise RuntimeError(
                 "you need nbclient>=0.6.1 to "
@@ -33,6 +56,30 @@ class PloomberNotebookClient(NotebookClient):
             )
 
         super().__init__(*args, **kwargs)
+        self._kernel_pool = kernel_pool
+
+    async def async_execute(self, reset_kc=False, **kwargs):
+        if self._kernel_pool is None:
+            return await super().async_execute(reset_kc=reset_kc, **kwargs)
+
+        # nbclient starts the kernel in the notebook's directory
+        resource_path = self.resources.get("metadata", {}).get("path") or None
+        self.km = await self._kernel_pool.async_acquire(
+            cwd=kwargs.get("cwd", resource_path)
+        )
+        # do not shut down the kernel when finishing
+        self.owns_km = False
+
+        try:
+            return await super().async_execute(**kwargs)
+        except asyncio.CancelledError:
+            # stop the running cell before returning the kernel to the pool
+            await ensure_async(self.km.interrupt_kernel())
+            raise
+        finally:
+            await _release_kernel(self, self._kernel_pool)
+
+    execute = run_sync(async_execute)
 
     async def async_start_new_kernel_client(self) -> KernelClient:
         """Creates a new kernel client.
@@ -47,10 +94,10 @@ class PloomberNotebookClient(NotebookClient):
             self.kc = self.km.client()
             await ensure_async(
                 self.kc.start_channels()
-            )  # type:ignore[func-returns-value]
+            )  # type: ignore[func-returns-value]
             await ensure_async(
                 self.kc.wait_for_ready(timeout=self.startup_timeout)
-            )  # type:ignore
+            )  # type: ignore
         except Exception as e:
             self.log.error(
                 "Error occurred while starting new kernel client "
@@ -67,36 +114,98 @@ class PloomberNotebookClient(NotebookClient):
 
     start_new_kernel_client = run_sync(async_start_new_kernel_client)
 
-    async def _async_poll_stdin_msg(
+    async def _async_poll_output_msg(
         self, parent_msg_id: str, cell: NotebookNode, cell_index: int
     ) -> None:
+        """Process the cell's outputs, takes every message that is ready at
+        once and merges consecutive stream messages
+        """
         assert self.kc is not None
 
-        # FIXME: quick hack
-        time.sleep(1)
+        while True:
+            msgs = await _async_get_msgs(self.kc.iopub_channel)
 
-        # looks like this sometimes returns false
-        msg_received = await self.kc.stdin_channel.msg_ready()
+            for msg in _coalesce_streams(msgs):
+                if msg["parent_header"].get("msg_id") == parent_msg_id:
+                    try:
+                        # Will raise CellExecutionComplete when completed
+                        self.process_message(msg, cell, cell_index)
+                    except CellExecutionComplete:
+                        return
 
-        if msg_received:
-            while True:
-                try:
-                    msg = await ensure_async(self.kc.stdin_channel.get_msg(timeout=0.1))
-                except Empty:
-                    break
-                else:
-                    # display all pending messages (e.g. traceback)
-                    flush_io(self.kc)
+    async def _async_poll_stdin_msg(
+        self,
+        parent_msg_id: str,
+        cell: NotebookNode,
+        cell_index: int,
+        task_poll_output_msg: asyncio.Future,
+    ) -> None:
+        """Answer the kernel's input requests as soon as they arrive, runs
+        alongside the output and reply polling and it is cancelled once the
+        cell finishes. If ``input()`` raises (e.g., ``EOFError`` when stdin is
+        closed), it returns the exception so the caller can interrupt the
+        kernel, which would otherwise wait for the input forever
+        """
+        assert self.kc is not None
 
-                    self.kc.input(input(msg["content"]["prompt"]))
+        while True:
+            msg = await ensure_async(self.kc.stdin_channel.get_msg(timeout=None))
 
-                    try:
-                        msg = await self.kc.get_iopub_msg(timeout=1)
-                    except Empty:
-                        pass
-                    else:
-                        if msg.get("content", {}).get("text"):
-                            print(msg["content"]["text"])
+            if msg["parent_header"].get("msg_id") != parent_msg_id:
+                continue
+
+            # the kernel sends the outputs before requesting input, but they
+            # arrive on a different channel, let the output polling take them
+            while not task_poll_output_msg.done() and await ensure_async(
+                self.kc.iopub_channel.msg_ready()
+            ):
+                await asyncio.sleep(0)
+
+            # display the outputs produced so far (e.g., a traceback)
+            self._echo_outputs(cell)
+
+            try:
+                value = input(msg["content"]["prompt"])
+            except BaseException as e:
+                # KeyboardInterrupt would stop the event loop if raised here
+                return e
+
+            self.kc.input(value)
+
+    async def _async_abort_input(
+        self,
+        error: BaseException,
+        task_poll_output_msg: asyncio.Future,
+        task_poll_kernel_alive: asyncio.Future,
+    ) -> None:
+        """Interrupt the kernel waiting for an input that failed and raise the
+        exception ``input()`` raised
+        """
+        assert self.task_poll_for_reply is not None
+        tasks = {self.task_poll_for_reply, task_poll_output_msg, task_poll_kernel_alive}
+
+        # wait until the kernel replies, requests sent before that are aborted
+        await ensure_async(self.km.interrupt_kernel())
+        await asyncio.wait({self.task_poll_for_reply}, timeout=_INTERRUPT_TIMEOUT)
+
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.wait(tasks)
+
+        for task in tasks:
+            if not task.cancelled():
+                # the input error is the one that matters
+                task.exception()
+
+        raise error
+
+    def _echo_outputs(self, cell: NotebookNode) -> None:
+        """Print the cell's outputs that have not been printed yet"""
+        for output in cell.outputs[self._outputs_echoed or 0 :]:
+            _print_output(output)
+
+        self._outputs_echoed = len(cell.outputs)
 
     async def async_execute_cell(
         self,
@@ -174,21 +283,26 @@ class PloomberNotebookClient(NotebookClient):
 
         await run_hook(self.on_cell_complete, cell=cell, cell_index=cell_index)
 
-        # check for input
-        await self._async_poll_stdin_msg(parent_msg_id, cell, cell_index)
-
         # We launched a code cell to execute
         self.code_cells_executed += 1
         exec_timeout = self._get_timeout(cell)
 
         cell.outputs = []
         self.clear_before_next_output = False
+        # number of outputs printed to the terminal, None until the kernel
+        # requests input
+        self._outputs_echoed = None
 
         task_poll_kernel_alive = asyncio.ensure_future(self._async_poll_kernel_alive())
 
         task_poll_output_msg = asyncio.ensure_future(
             self._async_poll_output_msg(parent_msg_id, cell, cell_index)
         )
+        task_poll_stdin_msg = asyncio.ensure_future(
+            self._async_poll_stdin_msg(
+                parent_msg_id, cell, cell_index, task_poll_output_msg
+            )
+        )
         self.task_poll_for_reply = asyncio.ensure_future(
             self._async_poll_for_reply(
                 parent_msg_id,
@@ -200,11 +314,29 @@ class PloomberNotebookClient(NotebookClient):
         )
 
         try:
+            await asyncio.wait(
+                {self.task_poll_for_reply, task_poll_stdin_msg},
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+
+            if not self.task_poll_for_reply.done():
+                # the stdin polling only finishes if input() raised
+                await self._async_abort_input(
+                    task_poll_stdin_msg.exception() or task_poll_stdin_msg.result(),
+                    task_poll_output_msg,
+                    task_poll_kernel_alive,
+                )
+
             exec_reply = await self.task_poll_for_reply
         except asyncio.CancelledError:
-            # can only be cancelled by task_poll_kernel_alive when the kernel
-            # is dead
             task_poll_output_msg.cancel()
+
+            # cancelled by task_poll_kernel_alive when the kernel is dead, or
+            # because the caller cancelled the execution
+            if await ensure_async(self.km.is_alive()):
+                task_poll_kernel_alive.cancel()
+                raise
+
             raise DeadKernelError("Kernel died")
         except Exception as e:
             # Best effort to cancel request if it hasn't been resolved
@@ -214,6 +346,13 @@ class PloomberNotebookClient(NotebookClient):
                     task_poll_output_msg.cancel()
             finally:
                 raise
+        finally:
+            task_poll_stdin_msg.cancel()
+            await asyncio.wait({task_poll_stdin_msg})
+
+        # display what the cell printed after the last input request
+        if self._outputs_echoed is not None:
+            self._echo_outputs(cell)
 
         if execution_count:
             cell["execution_count"] = execution_count
@@ -233,84 +372,175 @@ class PloomberNotebookClient(NotebookClient):
     execute_cell = run_sync(async_execute_cell)
 
 
+async def _release_kernel(client, kernel_pool):
+    """Stop the client's channels and return its kernel to the pool"""
+    if client.kc is not None:
+        await ensure_async(client.kc.stop_channels())
+        client.kc = None
+
+    km, client.km = client.km, None
+    await kernel_pool.async_release(km)
+
+
+async def _async_get_msgs(channel, timeout=None):
+    """Wait for a message (up to ``timeout`` seconds, forever if None), then
+    take the ones that are ready, in a single pass. Returns an empty list if
+    no message arrives
+    """
+    msgs = []
+
+    try:
+        msgs.append(await ensure_async(channel.get_msg(timeout=timeout)))
+
+        while len(msgs) < _MAX_BATCH:
+            msgs.append(await _async_recv_ready(channel))
+    except Empty:
+        pass
+
+    return msgs
+
+
+async def _async_recv_ready(channel):
+    """Receive a message without waiting, raises Empty if there is none. Unlike
+    get_msg, it does not poll the socket first
+    """
+    try:
+        raw = await ensure_async(channel.socket.recv_multipart(zmq.DONTWAIT))
+    except zmq.Again:
+        raise Empty from None
+
+    _, raw = channel.session.feed_identities(raw)
+    return channel.session.deserialize(raw)
+
+
+def _stream_key(msg):
+    if msg["header"]["msg_type"] != "stream":
+        return None
+
+    return msg["parent_header"].get("msg_id"), msg["content"]["name"]
+
+
+def _coalesce_streams(msgs):
+    """Merge consecutive stream messages with the same parent and name"""
+    coalesced = []
+
+    for key, group in groupby(msgs, key=_stream_key):
+        group = list(group)
+
+        if key is None or len(group) == 1:
+            coalesced.extend(group)
+        else:
+            first = group[0]
+            text = "".join(msg["content"]["text"] for msg in group)
+            coalesced.append({**first, "content": {**first["content"], "text": text}})
+
+    return coalesced
+
+
+def _print_output(output):
+    """Print a cell output to the terminal"""
+    output_type = output["output_type"]
+
+    if output_type == "stream":
+        stream = sys.stderr if output["name"] == "stderr" else sys.stdout
+        print(output["text"], file=stream, end="")
+        stream.flush()
+    elif output_type == "execute_result":
+        text = output["data"].get("text/plain")
+
+        if text is not None:
+            print(text)
+    elif output_type == "error":
+        for frame in output["traceback"]:
+            print(frame, file=sys.stderr)
+
+
 # NOTE: this still needs some work, I adapted it from jupyter-console, but
 # there are cases that I'm unsure if they are handled properly (e.g. rich
 # data display)
 def flush_io(client):
-    """Flush messages from the iopub channel
+    """Flush messages from the iopub channel. Messages that are ready are
+    taken at once, and consecutive stream messages are printed together
 
     Notes
     -----
     Adapted from:
     https://github.com/jupyter/jupyter_console/blob/bcf17a3953844d75262e3ce23b784832d9044877/jupyter_console/ptshell.py#L846 # noqa
     """
-    while run_sync(client.iopub_channel.msg_ready)():
-        sub_msg = run_sync(client.iopub_channel.get_msg)()
-        msg_type = sub_msg["header"]["msg_type"]
-
-        _pending_clearoutput = True
-
-        # do we need to handle this?
-        if msg_type == "status":
-            pass
-        elif msg_type == "stream":
-            if sub_msg["content"]["name"] == "stdout":
+    get_msgs = run_sync(_async_get_msgs)
+
+    while True:
+        msgs = get_msgs(client.iopub_channel, timeout=0)
+
+        if not msgs:
+            break
+
+        for sub_msg in _coalesce_streams(msgs):
+            msg_type = sub_msg["header"]["msg_type"]
+
+            _pending_clearoutput = True
+
+            # do we need to handle this?
+            if msg_type == "status":
+                pass
+            elif msg_type == "stream":
+                if sub_msg["content"]["name"] == "stdout":
+                    if _pending_clearoutput:
+                        print("\r", end="")
+                        _pending_clearoutput = False
+                    print(sub_msg["content"]["text"], end="")
+                    sys.stdout.flush()
+                elif sub_msg["content"]["name"] == "stderr":
+                    if _pending_clearoutput:
+                        print("\r", file=sys.stderr, end="")
+                        _pending_clearoutput = False
+                    print(sub_msg["content"]["text"], file=sys.stderr, end="")
+                    sys.stderr.flush()
+
+            elif msg_type == "execute_result":
                 if _pending_clearoutput:
                     print("\r", end="")
                     _pending_clearoutput = False
-                print(sub_msg["content"]["text"], end="")
-                sys.stdout.flush()
-            elif sub_msg["content"]["name"] == "stderr":
-                if _pending_clearoutput:
-                    print("\r", file=sys.stderr, end="")
-                    _pending_clearoutput = False
-                print(sub_msg["content"]["text"], file=sys.stderr, end="")
-                sys.stderr.flush()
-
-        elif msg_type == "execute_result":
-            if _pending_clearoutput:
-                print("\r", end="")
-                _pending_clearoutput = False
 
-            format_dict = sub_msg["content"]["data"]
+                format_dict = sub_msg["content"]["data"]
 
-            if "text/plain" not in format_dict:
-                continue
+                if "text/plain" not in format_dict:
+                    continue
 
-            # prompt_toolkit writes the prompt at a slightly lower level,
-            # so flush streams first to ensure correct ordering.
-            sys.stdout.flush()
-            sys.stderr.flush()
+                # prompt_toolkit writes the prompt at a slightly lower level,
+                # so flush streams first to ensure correct ordering.
+                sys.stdout.flush()
+                sys.stderr.flush()
 
-            text_repr = format_dict["text/plain"]
-            if "\n" in text_repr:
-                # For multi-line results, start a new line after prompt
-                print()
-            print(text_repr)
+                text_repr = format_dict["text/plain"]
+                if "\n" in text_repr:
+                    # For multi-line results, start a new line after prompt
+                    print()
+                print(text_repr)
 
-        elif msg_type == "display_data":
-            pass
+            elif msg_type == "display_data":
+                pass
 
-        # If execute input: print it
-        elif msg_type == "execute_input":
-            content = sub_msg["content"]
+            # If execute input: print it
+            elif msg_type == "execute_input":
+                content = sub_msg["content"]
 
-            # New line
-            sys.stdout.write("\n")
-            sys.stdout.flush()
+                # New line
+                sys.stdout.write("\n")
+                sys.stdout.flush()
 
-            # With `Remote In [3]: `
-            # self.print_remote_prompt(ec=ec)
+                # With `Remote In [3]: `
+                # self.print_remote_prompt(ec=ec)
 
-            # And the code
-            sys.stdout.write(content["code"] + "\n")
+                # And the code
+                sys.stdout.write(content["code"] + "\n")
 
-        elif msg_type == "clear_output":
-            if sub_msg["content"]["wait"]:
-                _pending_clearoutput = True
-            else:
-                print("\r", end="")
+            elif msg_type == "clear_output":
+                if sub_msg["content"]["wait"]:
+                    _pending_clearoutput = True
+                else:
+                    print("\r", end="")
 
-        elif msg_type == "error":
-            for frame in sub_msg["content"]["traceback"]:
-                print(frame, file=sys.stderr)
+            elif msg_type == "error":
+                for frame in sub_msg["content"]["traceback"]:
+                    print(frame, file=sys.stderr)
@@ -4,6 +4,10 @@ from pathlib import Path
 import nbformat
 import pytest
 
+# papermill imports this module through its entry points, so importing it
+# before papermill causes a circular import (see ploomber_engine.engine)
+collect_ignore = ["_engines.py"]
+
 
 @pytest.fixture
 def tmp_empty(tmp_path):
@@ -10,6 +10,11 @@ import click
 import nbformat
 
 from ploomber_engine.ipython import PloomberClient
+from ploomber_engine.incremental import IncrementalClient
+from ploomber_engine.parallel import ParallelClient
+from ploomber_engine.checkpoint import CheckpointClient
+from ploomber_engine.writer import NotebookWriter
+from ploomber_engine.spill import spill_outputs
 from ploomber_engine import profiling
 from ploomber_engine import _util
 
@@ -28,6 +33,19 @@ def execute_notebook(
     remove_tagged_cells=None,
     cwd=".",
     save_profiling_data=False,
+    shell_pool=None,
+    incremental=False,
+    parallel=False,
+    bytecode_cache=False,
+    checkpoint=False,
+    resume=False,
+    timeout=None,
+    cell_timeout=None,
+    max_memory=None,
+    write_interval=None,
+    drop_outputs=False,
+    max_output_size=None,
+    lean=False,
 ):
     """Executes a notebook. Drop-in replacement for
     ``papermill.execute_notebook`` with enhanced capabilities.
@@ -78,6 +96,71 @@ def execute_notebook(
         (stores a ``.csv`` file in the same folder as ``output_path``).
         If Path, saves profiling data to the given Path
 
+    shell_pool : ShellPool, default=None
+        Take the shell from this pool instead of initializing a new one. Useful
+        when executing many notebooks in the same process
+
+    incremental : bool or Path, default=False
+        If True, store cell outputs and variables in a ``__ploomber_cache__``
+        directory next to the input notebook and, in subsequent executions,
+        only execute the cells affected by changes (see ``IncrementalClient``).
+        If Path, use it as the cache directory
+
+    parallel : bool, default=False
+        If True, execute cells that do not depend on each other at the same
+        time using a thread pool (see ``ParallelClient``)
+
+    bytecode_cache : bool or Path, default=False
+        If True, store the transformed source and compiled code of every cell
+        in a ``__ploomber_cache__`` directory next to the input notebook, so
+        subsequent executions skip both steps (see ``BytecodeCache``). If
+        Path, use it as the cache directory
+
+    checkpoint : bool or int, default=False
+        If True, store the notebook's variables and outputs in a
+        ``__ploomber_cache__`` directory next to the input notebook after
+        executing cells tagged ``checkpoint``. If an int, also store them every
+        ``checkpoint`` cells (see ``CheckpointClient``)
+
+    resume : bool, default=False
+        If True, restore the last checkpoint stored by a previous (failed)
+        execution and continue from the next cell. Implies ``checkpoint=True``
+
+    timeout : int or float, default=None
+        Maximum number of seconds to execute the notebook. If exceeded, the
+        running cell fails with ``CellTimeoutError`` and the partially executed
+        notebook is stored in ``output_path``
+
+    cell_timeout : int or float, default=None
+        Maximum number of seconds to execute each cell. Cells tagged
+        ``timeout=<seconds>`` override it
+
+    max_memory : int or float, default=None
+        Maximum memory (resident set size of the process) in megabytes. If
+        exceeded, the running cell fails with ``MemoryLimitError`` (a
+        ``MemoryError``) and the partially executed notebook is stored in
+        ``output_path``. Requires ``psutil``
+
+    write_interval : int or float, default=None
+        If not None, write ``output_path`` while the notebook executes, at most
+        every ``write_interval`` seconds (see ``NotebookWriter``)
+
+    drop_outputs : bool, default=False
+        If True, remove the outputs of executed cells from memory once they
+        are written, the returned notebook does not contain them. Requires
+        ``write_interval``
+
+    max_output_size : int or dict, default=None
+        If not None, outputs larger than this (in characters, or a dict
+        mapping MIME types to their limit) are stored in files in a
+        ``{output name}-outputs`` directory next to ``output_path`` and replaced
+        by a reference (see ``spill_outputs``). Use ``inline_outputs`` to
+        restore them
+
+    lean : bool, default=False
+        If True, execute the notebook in a lean shell: no history file, no
+        output cache, and no interactive-only features (see ``PloomberShell``)
+
     Returns
     -------
     nb : NotebookNode
@@ -85,6 +168,12 @@ def execute_notebook(
 
     Notes
     -----
+    .. versionchanged:: 0.0.34
+        Added ``shell_pool``, ``incremental``, ``parallel``, ``bytecode_cache``,
+        ``checkpoint``, ``resume``, ``timeout``, ``cell_timeout``,
+        ``max_memory``, ``write_interval``, ``drop_outputs``,
+        ``max_output_size``, and ``lean`` arguments.
+
     .. versionchanged:: 0.0.31
         Allow paths to be passed to ``profile_runtime``, ``profile_memory``
         arguments.
@@ -140,6 +229,49 @@ def execute_notebook(
     >>> from ploomber_engine import execute_notebook
     >>> out = execute_notebook("nb.ipynb", "out.ipynb",
     ...                        remove_tagged_cells=["remove", "also-remove"])
+
+    Reuse initialized shells when executing many notebooks:
+
+    >>> from ploomber_engine import execute_notebook
+    >>> from ploomber_engine.pool import ShellPool
+    >>> with ShellPool(size=1) as pool:
+    ...     out = execute_notebook("nb.ipynb", "out.ipynb", shell_pool=pool)
+
+    Only execute cells affected by changes since the last execution:
+
+    >>> from ploomber_engine import execute_notebook
+    >>> out = execute_notebook("nb.ipynb", "out.ipynb", incremental=True)
+
+    Execute independent cells at the same time:
+
+    >>> from ploomber_engine import execute_notebook
+    >>> out = execute_notebook("nb.ipynb", "out.ipynb", parallel=True)
+
+    Cache the compiled code of every cell for subsequent executions:
+
+    >>> from ploomber_engine import execute_notebook
+    >>> out = execute_notebook("nb.ipynb", "out.ipynb", bytecode_cache=True)
+
+    Store a checkpoint every 10 cells and resume from it if the notebook
+    fails:
+
+    >>> from ploomber_engine import execute_notebook
+    >>> out = execute_notebook("nb.ipynb", "out.ipynb", checkpoint=10, resume=True)
+
+    Fail if any cell takes longer than a minute:
+
+    >>> from ploomber_engine import execute_notebook
+    >>> out = execute_notebook("nb.ipynb", "out.ipynb", cell_timeout=60)
+
+    Write the output notebook every 30 seconds while it executes:
+
+    >>> from ploomber_engine import execute_notebook
+    >>> out = execute_notebook("nb.ipynb", "out.ipynb", write_interval=30)
+
+    Store outputs larger than 1 MB in files next to the output notebook:
+
+    >>> from ploomber_engine import execute_notebook
+    >>> out = execute_notebook("nb.ipynb", "out.ipynb", max_output_size=1_000_000)
     """
     path_like_input = isinstance(input_path, (str, Path))
     if save_profiling_data and not (profile_runtime or profile_memory):
@@ -149,7 +281,69 @@ def execute_notebook(
             UserWarning,
         )
 
-    if profile_memory:
+    init_kwargs = {}
+
+    if drop_outputs and write_interval is None:
+        raise ValueError("drop_outputs=True requires write_interval")
+
+    if write_interval is not None and not output_path:
+        raise ValueError("write_interval requires output_path")
+
+    if max_output_size is not None and not output_path:
+        raise ValueError("max_output_size requires output_path")
+
+    writer = (
+        None
+        if write_interval is None
+        else NotebookWriter(
+            output_path,
+            interval=write_interval,
+            drop_outputs=drop_outputs,
+            max_output_size=max_output_size,
+        )
+    )
+
+    if bytecode_cache is True and not path_like_input:
+        raise ValueError(
+            "bytecode_cache=True requires input_path to be a path, "
+            "pass a path to the cache directory instead"
+        )
+
+    if parallel and (incremental or profile_memory):
+        raise ValueError(
+            "parallel cannot be used together with incremental or profile_memory"
+        )
+
+    if (checkpoint or resume) and (parallel or incremental or profile_memory):
+        raise ValueError(
+            "checkpoint and resume cannot be used together with parallel, "
+            "incremental, or profile_memory"
+        )
+
+    if checkpoint or resume:
+        if not path_like_input:
+            raise ValueError("checkpoint and resume require input_path to be a path")
+
+        INIT_FUNCTION = CheckpointClient.from_path
+        init_kwargs["every"] = None if checkpoint is True else (checkpoint or None)
+        init_kwargs["resume"] = resume
+    elif parallel:
+        INIT_FUNCTION = ParallelClient.from_path if path_like_input else ParallelClient
+    elif incremental:
+        if profile_memory:
+            raise ValueError("incremental and profile_memory cannot be used together")
+
+        if incremental is True and not path_like_input:
+            raise ValueError(
+                "incremental=True requires input_path to be a path, "
+                "pass a path to the cache directory instead"
+            )
+
+        INIT_FUNCTION = (
+            IncrementalClient.from_path if path_like_input else IncrementalClient
+        )
+        init_kwargs["cache_dir"] = None if incremental is True else incremental
+    elif profile_memory:
         INIT_FUNCTION = (
             profiling.PloomberMemoryProfilerClient.from_path
             if path_like_input
@@ -170,13 +364,22 @@ def execute_notebook(
         debug_later=debug_later_,
         remove_tagged_cells=remove_tagged_cells,
         cwd=cwd,
+        shell_pool=shell_pool,
+        bytecode_cache=bytecode_cache or None,
+        timeout=timeout,
+        cell_timeout=cell_timeout,
+        max_memory=max_memory,
+        writer=writer,
+        lean=lean,
+        **init_kwargs,
     )
 
     try:
         out = client.execute(parameters=parameters)
     except Exception:
-        if output_path:
-            nbformat.write(client._nb, output_path)
+        # the writer already stored the partially executed notebook
+        if output_path and writer is None:
+            _write(client._nb, output_path, max_output_size)
 
         if verbose and output_path:
             click.secho(
@@ -230,15 +433,27 @@ def execute_notebook(
         )
         data = profiling.get_profiling_data(out)
         with open(output_path_profiling_data, "w") as f:
-            writer = csv.writer(f)
-            writer.writerow(data.keys())
-            writer.writerows(zip(*data.values()))
+            csv_writer = csv.writer(f)
+            csv_writer.writerow(data.keys())
+            csv_writer.writerows(zip(*data.values()))
 
-    if output_path:
-        nbformat.write(out, output_path)
+    if output_path and writer is None:
+        _write(out, output_path, max_output_size)
     return out
 
 
+def _write(nb, output_path, max_output_size):
+    if max_output_size is not None:
+        spill_outputs(
+            nb,
+            _util.sibling_with_suffix(output_path, "-outputs"),
+            max_output_size,
+            root=Path(output_path).parent,
+        )
+
+    nbformat.write(nb, output_path)
+
+
 def _parse_bool_or_path(arg_key, arg_value, default_path):
     """Parse a boolean or a path argument (arg_val).
     If a boolean is passed, return the bool and the default path.
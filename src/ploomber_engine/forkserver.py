@@ -0,0 +1,177 @@
+"""
+Execute notebooks in processes forked from a server with preloaded modules
+"""
+
+import gc
+import threading
+import importlib
+import multiprocessing
+
+import nbformat
+
+from ploomber_engine.execute import execute_notebook
+from ploomber_engine.pool import ShellPool
+from ploomber_engine._fork import run_in_fork, _RemoteTraceback
+
+
+def _execute_in_child(shell_pool, kwargs):
+    nb = execute_notebook(shell_pool=shell_pool, **kwargs)
+    return nbformat.writes(nb)
+
+
+def _serve(conn, preload, setup):
+    try:
+        for name in preload:
+            importlib.import_module(name)
+
+        shell_pool = ShellPool(size=1, setup=setup)
+    except Exception as e:
+        error = RuntimeError(f"Failed to start fork server: {e!r}")
+        conn.send(("error", (error, None)))
+        return
+
+    # move everything allocated so far to the permanent generation so the
+    # garbage collector in the children does not touch (and copy) those pages
+    gc.freeze()
+    conn.send(("ready", None))
+
+    while True:
+        try:
+            kwargs = conn.recv()
+        except EOFError:
+            break
+
+        if kwargs is None:
+            break
+
+        try:
+            message = ("ok", run_in_fork(_execute_in_child, shell_pool, kwargs))
+        except Exception as e:
+            # keep the child's traceback, it's lost when pickling the exception
+            cause = e.__cause__
+            tb = cause.tb if isinstance(cause, _RemoteTraceback) else None
+            message = ("error", (e, tb))
+
+        conn.send(message)
+
+
+class ForkServer:
+    """
+    Starts a long-lived process that imports modules and runs a setup cell
+    once, then forks a child for every notebook, so each execution starts
+    with the preloaded modules and namespace (via copy-on-write)
+
+    Parameters
+    ----------
+    preload : list, default=None
+        Modules to import in the server process (e.g., ``["pandas", "numpy"]``)
+
+    setup : str, default=None
+        Code to execute in the server's shell, variables defined here are
+        available to every notebook
+
+    Notes
+    -----
+    Only available on platforms that support ``os.fork``. Notebooks are
+    executed one at a time; start more servers to execute notebooks in
+    parallel.
+
+    .. versionadded:: 0.0.34
+
+    Examples
+    --------
+    >>> from ploomber_engine.forkserver import ForkServer
+    >>> with ForkServer(preload=["json"], setup="import json") as server:
+    ...     out = server.execute_notebook("nb.ipynb", "out.ipynb")
+    """
+
+    def __init__(self, preload=None, setup=None):
+        self._preload = list(preload or [])
+        self._setup = setup
+        self._process = None
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"{type(self).__name__}(preload={self._preload!r})"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        """Start the server process and wait until it is ready"""
+        if self._process is not None:
+            raise RuntimeError("The fork server is already running")
+
+        ctx = multiprocessing.get_context("fork")
+        self._conn, child_conn = ctx.Pipe()
+        self._process = ctx.Process(
+            target=_serve,
+            args=(child_conn, self._preload, self._setup),
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+
+        status, value = self._recv()
+
+        if status == "error":
+            self.stop()
+            raise value[0]
+
+    def stop(self):
+        """Stop the server process"""
+        if self._process is None:
+            return
+
+        try:
+            self._conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+
+        self._process.join(timeout=5)
+
+        if self._process.is_alive():
+            self._process.kill()
+
+        self._conn.close()
+        self._process = None
+        self._conn = None
+
+    def _recv(self):
+        try:
+            return self._conn.recv()
+        except EOFError:
+            raise RuntimeError("The fork server process died") from None
+
+    def execute_notebook(self, input_path, output_path, **kwargs):
+        """Execute a notebook in a process forked from the server. Takes the
+        same arguments as ``ploomber_engine.execute_notebook``
+
+        Returns
+        -------
+        nb : NotebookNode
+            Executed notebook object
+        """
+        if self._process is None:
+            raise RuntimeError("The fork server is not running, call .start()")
+
+        kwargs = dict(input_path=input_path, output_path=output_path, **kwargs)
+
+        with self._lock:
+            self._conn.send(kwargs)
+            status, value = self._recv()
+
+        if status == "error":
+            exc, tb = value
+
+            if tb is None:
+                raise exc
+
+            raise exc from _RemoteTraceback(tb)
+
+        return nbformat.reads(value, as_version=nbformat.NO_CONVERT)
@@ -0,0 +1,312 @@
+"""
+Incremental notebook execution: only re-execute cells affected by a change
+"""
+
+import sys
+import json
+import shutil
+import hashlib
+from pathlib import Path
+
+import nbformat
+
+from ploomber_engine.ipython import PloomberClient, add_to_sys_path
+from ploomber_engine._analysis import analyze_cells, add_definition_reads
+from ploomber_engine._namespace import dump_variables, load_variable
+from ploomber_engine._util import cache_dir_for, recursive_update
+
+_ENTRY = "entry.json"
+
+
+class IncrementalClient(PloomberClient):
+    """A ``PloomberClient`` that stores the outputs and the variables each cell
+    defines, so subsequent executions only run cells whose source, parameters,
+    or upstream variables changed; the rest reuse the stored outputs
+
+    Parameters
+    ----------
+    nb
+        Notebook object
+
+    cache_dir : str or Path
+        Directory to store cell outputs and variables
+
+    **kwargs
+        Any other ``PloomberClient`` arguments
+
+    Notes
+    -----
+    Dependencies between cells are found by analyzing which variables each
+    cell reads and writes. Calling a method on a variable (``df.drop(...)``),
+    assigning to an item or attribute (``df["x"] = 1``), or passing it to a
+    function (``shuffle(values)``) is considered a modification. Calling a
+    function defined in the notebook modifies the global variables the
+    function modifies. Cells that cannot be analyzed (e.g., they use magics)
+    depend on all previous cells, and cells that call functions those cells
+    may define (e.g., with ``%run``) are always executed.
+
+    Cells are assumed to be deterministic. Variables are serialized with
+    ``cloudpickle`` (if installed) or ``pickle``; when a variable cannot be
+    serialized, the cell that defines it is re-executed whenever a later cell
+    needs it. Only the latest execution is kept in ``cache_dir``.
+
+    .. versionadded:: 0.0.34
+
+    Examples
+    --------
+    >>> from ploomber_engine.incremental import IncrementalClient
+    >>> import nbformat
+    >>> nb = nbformat.v4.new_notebook()
+    >>> nb.cells = [nbformat.v4.new_code_cell("x = 41"),
+    ...             nbformat.v4.new_code_cell("x + 1")]
+    >>> out = IncrementalClient(nb, cache_dir="cache").execute()
+    >>> out.cells[1]['outputs'][0]['data']
+    {'text/plain': '42'}
+    >>> out = IncrementalClient(nb, cache_dir="cache").execute()
+    >>> out.cells[1]['metadata']['ploomber']['cached']
+    True
+    """
+
+    def __init__(self, nb, cache_dir=None, **kwargs):
+        super().__init__(nb, **kwargs)
+        self._cache_dir = None if cache_dir is None else Path(cache_dir)
+
+    @classmethod
+    def from_path(cls, path, cache_dir=None, **kwargs):
+        """Initialize client from a path to a notebook. If ``cache_dir`` is
+        None, it uses ``__ploomber_cache__/incremental/{notebook name}`` in the
+        notebook's directory
+        """
+        client = super().from_path(path, **kwargs)
+        client._cache_dir = Path(
+            cache_dir or cache_dir_for(path, "incremental", Path(path).stem)
+        )
+        return client
+
+    def _execute(self):
+        if self._cache_dir is None:
+            raise ValueError("IncrementalClient requires a cache_dir")
+
+        cells = self._nb.cells
+        indexes = [i for i, c in enumerate(cells) if c.cell_type == "code"]
+        plan = _Plan(
+            [cells[i].source for i in indexes],
+            cache_dir=self._cache_dir,
+        )
+        executed = set()
+        # variables loaded from the cache: name -> position of its writer
+        loaded = {}
+        execution_count = 1
+
+        with add_to_sys_path(self._cwd):
+            for pos, index in enumerate(self._make_iterator(indexes)):
+                cell = cells[index]
+
+                if pos in plan.to_execute:
+                    self._restore_variables(plan, pos, executed, loaded)
+                    before = self._namespace_ids()
+                    self.execute_cell(
+                        cell,
+                        cell_index=index,
+                        execution_count=execution_count,
+                        store_history=False,
+                    )
+                    self._store(plan, pos, cell, before)
+                    super()._write_cell(cell)
+                    executed.add(pos)
+
+                    for name in plan.infos[pos].modifies:
+                        loaded.pop(name, None)
+                else:
+                    _restore_cell(cell, plan.entries[pos], execution_count)
+                    super()._write_cell(cell)
+                    self._cell_executed(cell, execution_count)
+
+                execution_count += 1
+
+        plan.prune()
+        return self._nb
+
+    def _write_cell(self, cell):
+        # executed cells are passed to the writer once their outputs are
+        # cached (the writer may drop them)
+        pass
+
+    def _namespace_ids(self):
+        user_ns = self._shell.user_ns
+        return {
+            name: id(user_ns[name]) for name in self._shell._get_interactive_variables()
+        }
+
+    def _restore_variables(self, plan, pos, executed, loaded):
+        user_ns = self._shell.user_ns
+
+        for name in plan.needed(pos):
+            writer = plan.latest_writer(name, pos)
+
+            if writer is None or writer in executed or loaded.get(name) == writer:
+                continue
+
+            filename = plan.entries[writer]["variables"][name]
+            user_ns[name] = load_variable(
+                plan.entry_dir(writer) / filename, namespace=user_ns
+            )
+            loaded[name] = writer
+
+    def _store(self, plan, pos, cell, before):
+        after = self._namespace_ids()
+        user_ns = self._shell.user_ns
+
+        # names that were created, re-assigned or deleted, plus the ones the
+        # cell may have modified in place
+        writes = {name for name, id_ in after.items() if before.get(name) != id_}
+        writes |= set(before) - set(after)
+        writes |= plan.infos[pos].modifies
+
+        entry_dir = plan.entry_dir(pos)
+
+        if entry_dir.exists():
+            shutil.rmtree(entry_dir)
+
+        variables = dump_variables(user_ns, writes, entry_dir)
+        entry = dict(
+            outputs=cell.outputs,
+            metadata=cell.metadata.get("ploomber", {}),
+            writes=sorted(writes),
+            variables=variables,
+        )
+        # write the entry file last, a directory without it is ignored
+        Path(entry_dir, _ENTRY).write_text(json.dumps(entry))
+        plan.entries[pos] = entry
+
+
+def _restore_cell(cell, entry, execution_count):
+    outputs = [nbformat.from_dict(output) for output in entry["outputs"]]
+
+    for output in outputs:
+        if output["output_type"] == "execute_result":
+            output["execution_count"] = execution_count
+
+    cell.outputs = outputs
+    cell.execution_count = execution_count
+    recursive_update(cell.metadata, {"ploomber": {**entry["metadata"], "cached": True}})
+
+
+class _Plan:
+    """Determines which cells need to be executed"""
+
+    def __init__(self, sources, cache_dir):
+        self.infos = analyze_cells(sources)
+        self.cache_dir = cache_dir
+        self.keys = self._compute_keys(sources)
+        self.entries = [self._load_entry(key) for key in self.keys]
+        self.to_execute = self._find_cells_to_execute()
+
+    def _static_writer(self, name, before):
+        for pos in range(before - 1, -1, -1):
+            info = self.infos[pos]
+
+            if not info.safe or name in info.modifies:
+                return pos
+
+        return None
+
+    def _compute_keys(self, sources):
+        keys = []
+        version = ".".join(str(v) for v in sys.version_info[:2])
+
+        for pos, (source, info) in enumerate(zip(sources, self.infos)):
+            if info.safe:
+                names = add_definition_reads(
+                    self.infos, info.reads | info.mutates, pos, self._static_writer
+                )
+                upstream = {self._static_writer(name, pos) for name in names} - {None}
+            else:
+                upstream = set(range(pos))
+
+            hash_ = hashlib.sha256(f"{version}\n{source}".encode())
+
+            for upstream_pos in sorted(upstream):
+                hash_.update(keys[upstream_pos].encode())
+
+            keys.append(hash_.hexdigest())
+
+        return keys
+
+    def entry_dir(self, pos):
+        return self.cache_dir / self.keys[pos]
+
+    def _load_entry(self, key):
+        path = self.cache_dir / key / _ENTRY
+
+        if not path.exists():
+            return None
+
+        try:
+            return json.loads(path.read_text())
+        except ValueError:
+            return None
+
+    def _writes(self, pos):
+        if pos in self.to_execute:
+            return self.infos[pos].modifies
+        else:
+            return set(self.entries[pos]["writes"])
+
+    def latest_writer(self, name, before):
+        """Position of the last cell before ``before`` that modifies ``name``"""
+        for pos in range(before - 1, -1, -1):
+            if pos in self.to_execute and not self.infos[pos].safe:
+                return pos
+
+            if name in self._writes(pos):
+                return pos
+
+        return None
+
+    def needed(self, pos):
+        """Variables a cell needs"""
+        info = self.infos[pos]
+
+        if info.safe:
+            return add_definition_reads(
+                self.infos, info.reads | info.mutates, pos, self.latest_writer
+            )
+
+        return set().union(*(self._writes(p) for p in range(pos)))
+
+    def _find_cells_to_execute(self):
+        self.to_execute = {
+            pos
+            for pos, (entry, info) in enumerate(zip(self.entries, self.infos))
+            if entry is None or not info.restorable
+        }
+
+        # cells whose variables are needed but could not be stored must be
+        # executed as well
+        changed = True
+
+        while changed:
+            changed = False
+
+            for pos in sorted(self.to_execute):
+                for name in self.needed(pos):
+                    writer = self.latest_writer(name, pos)
+
+                    if (
+                        writer is not None
+                        and writer not in self.to_execute
+                        and name not in self.entries[writer]["variables"]
+                    ):
+                        self.to_execute.add(writer)
+                        changed = True
+
+        return self.to_execute
+
+    def prune(self):
+        """Delete entries that do not belong to the current notebook"""
+        keys = set(self.keys)
+
+        for path in self.cache_dir.glob("*"):
+            if path.is_dir() and path.name not in keys:
+                shutil.rmtree(path)
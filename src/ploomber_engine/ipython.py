@@ -1,16 +1,32 @@
 import os
+import re
+import gc
 import sys
+import ast
+import copy
+import atexit
+import asyncio
+import threading
 import contextlib
+import importlib.abc
+import importlib.util
 from io import StringIO
 import itertools
 from datetime import datetime
+from time import monotonic
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 import parso
 import nbformat
-from IPython.core.interactiveshell import InteractiveShell
+from IPython.core.interactiveshell import (
+    InteractiveShell,
+    ExecutionInfo,
+    ExecutionResult,
+)
 from IPython.core.displaypub import DisplayPublisher
 from IPython.core.displayhook import DisplayHook
+from traitlets.config import Config
 from IPython import get_ipython
 
 # NOTE: we're not using tqdm.auto (which renders better-looking bars in Jupyter)
@@ -23,7 +39,30 @@ from ploomber_engine._util import (
     recursive_update,
     parametrize_notebook,
     add_debuglater_cells,
+    find_cell_with_tag,
+    cache_dir_for,
+    rss,
+    malloc_trim,
+)
+from ploomber_engine._fork import run_in_fork
+from ploomber_engine._context import (
+    SharedBuiltinTrap,
+    SharedDisplayTrap,
+    SharedPatch,
+    active_shell,
+    current_shell,
+    redirect_std,
+    std_streams,
+    working_directory,
+)
+from ploomber_engine._reader import read_without_outputs
+from ploomber_engine._watchdog import (
+    interrupt_after,
+    MemoryWatchdog,
+    CellTimeoutError,
+    MemoryLimitError,
 )
+from ploomber_engine.bytecode import BytecodeCache
 
 
 def is_notebook():
@@ -33,6 +72,100 @@ def is_notebook():
 _IS_NOTEBOOK = is_notebook()
 
 
+# lines that IPython transforms: magics, shell escapes, help (?) and autocall
+_IPYTHON_SYNTAX = re.compile(r"^\s*[%!?/,;]|=\s*[%!]|\?\s*$", re.MULTILINE)
+
+
+class _CompiledCell:
+    """A cell that can be executed without ``InteractiveShell.run_cell``"""
+
+    def __init__(self, body, last_expression):
+        self.body = body
+        self.last_expression = last_expression
+
+
+def _compile_cell(shell, source, execution_count):
+    """
+    Compile a cell with the shell's compiler, the last expression is compiled
+    separately so its value can be displayed. Returns None if the cell must be
+    executed with ``run_cell`` (it uses IPython syntax, top-level await, or it
+    has a syntax error)
+    """
+    if _IPYTHON_SYNTAX.search(source):
+        return None
+
+    compiler = shell.compile
+
+    try:
+        filename = compiler.cache(source, execution_count)
+        module = compiler.ast_parse(source, filename=filename)
+
+        last_expression = None
+
+        if module.body and isinstance(module.body[-1], ast.Expr):
+            expression = ast.Expression(module.body.pop().value)
+            last_expression = compiler(expression, filename, "eval")
+
+        body = compiler(module, filename, "exec")
+    except SyntaxError:
+        return None
+
+    return _CompiledCell(body, last_expression)
+
+
+def _run_compiled(shell, compiled, raw_cell):
+    """
+    Execute a compiled cell in the shell's namespace. Equivalent to
+    ``run_cell`` but skips input transformation, history, and running each
+    statement separately. Returns an ``ExecutionResult``
+    """
+    info = ExecutionInfo(
+        raw_cell, store_history=False, silent=False, shell_futures=True, cell_id=None
+    )
+    result = ExecutionResult(info)
+
+    shell.events.trigger("pre_execute")
+    shell.events.trigger("pre_run_cell", info)
+
+    with shell.builtin_trap:
+        try:
+            exec(compiled.body, shell.user_global_ns, shell.user_ns)
+
+            if compiled.last_expression is not None:
+                result.result = eval(
+                    compiled.last_expression, shell.user_global_ns, shell.user_ns
+                )
+                shell.displayhook(result.result)
+        except SystemExit as e:
+            result.error_in_exec = e
+            shell.showtraceback(exception_only=True)
+        except BaseException as e:
+            result.error_in_exec = e
+            shell.showtraceback(running_compiled_code=True)
+
+    shell.last_execution_succeeded = result.success
+    shell.last_execution_result = result
+    shell.events.trigger("post_execute")
+    shell.events.trigger("post_run_cell", result)
+
+    return result
+
+
+def _failed_result(shell, raw_cell, error):
+    """Returns the ``ExecutionResult`` of a cell that raised ``error`` and shows
+    its traceback
+    """
+    info = ExecutionInfo(
+        raw_cell, store_history=False, silent=False, shell_futures=True, cell_id=None
+    )
+    result = ExecutionResult(info)
+    result.error_in_exec = error
+    shell.showtraceback()
+    shell.last_execution_succeeded = False
+    shell.last_execution_result = result
+    return result
+
+
 def _make_stream_output(out, name):
     return nbformat.v4.new_output(output_type="stream", text=str(out), name=name)
 
@@ -96,40 +229,153 @@ class CustomDisplayPublisher(DisplayPublisher):
         self.shell._current_output.append(out)
 
 
+def _lean_config():
+    config = Config()
+    # keep the history in memory instead of an SQLite file
+    config.HistoryManager.enabled = False
+    # do not keep displayed results alive in Out/_
+    config.InteractiveShell.cache_size = 0
+    # interactive-only features
+    config.InteractiveShell.autocall = 0
+    config.InteractiveShell.autoindent = False
+    config.InteractiveShell.show_rewritten_input = False
+    config.InteractiveShell.separate_in = ""
+    config.InteractiveShell.separate_out = ""
+    config.InteractiveShell.separate_out2 = ""
+    return config
+
+
+class _MatplotlibLoader(importlib.abc.Loader):
+    """Wraps matplotlib's loader to enable inline plotting once it's imported"""
+
+    def __init__(self, loader):
+        self._loader = loader
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        # only the import machinery should see this wrapper
+        module.__loader__ = self._loader
+        module.__spec__.loader = self._loader
+        self._loader.exec_module(module)
+
+        shell = current_shell()
+
+        if isinstance(shell, PloomberShell):
+            shell._enable_matplotlib_if_imported()
+
+
+class _MatplotlibImportHook(importlib.abc.MetaPathFinder):
+    """Detects when matplotlib is imported for the first time"""
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname != "matplotlib":
+            return None
+
+        # matplotlib is imported once, remove the hook before finding it so
+        # this method isn't called recursively
+        _uninstall_matplotlib_hook()
+        spec = importlib.util.find_spec(fullname)
+
+        if spec is not None and spec.loader is not None:
+            spec.loader = _MatplotlibLoader(spec.loader)
+
+        return spec
+
+
+_MATPLOTLIB_HOOK = _MatplotlibImportHook()
+
+
+def _install_matplotlib_hook():
+    if _MATPLOTLIB_HOOK not in sys.meta_path:
+        sys.meta_path.insert(0, _MATPLOTLIB_HOOK)
+
+
+def _uninstall_matplotlib_hook():
+    if _MATPLOTLIB_HOOK in sys.meta_path:
+        sys.meta_path.remove(_MATPLOTLIB_HOOK)
+
+
+def _freeze():
+    # objects frozen by others (e.g., ForkServer) stay frozen
+    if gc.get_freeze_count():
+        return False
+
+    gc.freeze()
+    return True
+
+
+def _unfreeze(frozen):
+    if frozen:
+        gc.unfreeze()
+
+
+_FROZEN_BASELINE = SharedPatch(_freeze, _unfreeze)
+
+
 class PloomberShell(InteractiveShell):
     """
     A subclass of IPython's InteractiveShell to gather all the output
     produced by a code cell
 
+    Parameters
+    ----------
+    lean : bool, default=False
+        If True, do not store the history in an SQLite file, do not cache
+        outputs, and disable interactive-only features (e.g., autocall). Shells
+        start faster and many of them can be created at the same time without
+        contending on the history file
+
     Notes
     -----
-    This is intended to be used as a singleton, so either call
-    `.clear_instance()` when you're done or use it as a context manager
+    The shell is not installed as the ``InteractiveShell`` singleton: while it
+    executes code, ``get_ipython()`` and ``display()`` use it in the thread
+    (or context) executing it, so several shells can execute code at the same
+    time in different threads (as long as they use the same working
+    directory, see ``add_to_sys_path``)
+
+    Inline plotting is enabled once matplotlib is imported (by the notebook or
+    anything else), so notebooks that don't plot don't pay for importing it.
+
+    .. versionchanged:: 0.0.34
+        Added ``lean`` argument. Inline plotting is enabled when matplotlib is
+        imported instead of when initializing the shell. The shell is no longer
+        installed as the ``InteractiveShell`` singleton.
     """
 
-    def __init__(self):
+    def __init__(self, lean=False):
         super().__init__(
             display_pub_class=CustomDisplayPublisher,
             displayhook_class=CustomDisplayHook,
+            config=_lean_config() if lean else None,
         )
-        # no assigning this produces some weird behavior when calling
-        # .clear_instance()
-        InteractiveShell._instance = self
-        PloomberShell._instance = self
-
-        try:
-            self.enable_matplotlib("inline")
-        except ModuleNotFoundError:
-            pass
+        self.lean = lean
 
         # all channels send the output here
         self._current_output = []
+        self._frozen = False
+        self._matplotlib_enabled = False
+        self._enable_matplotlib_if_imported()
 
     # this is an abstract method in InteractiveShell
     def enable_gui(self, gui=None):
         pass
 
-    # to execute cells, call run_cell
+    def init_builtins(self):
+        super().init_builtins()
+        self.builtin_trap = SharedBuiltinTrap(shell=self)
+
+    def init_displayhook(self):
+        super().init_displayhook()
+        self.display_trap = SharedDisplayTrap(hook=self.displayhook)
+
+    def run_cell(self, *args, **kwargs):
+        with active_shell(self):
+            return super().run_cell(*args, **kwargs)
 
     # custom methods
 
@@ -144,7 +390,28 @@ class PloomberShell(InteractiveShell):
         from matplotlib_inline.backend_inline import configure_inline_support
 
         configure_inline_support.current_backend = "unset"
-        return super().enable_matplotlib(gui)
+        result = super().enable_matplotlib(gui)
+        self._matplotlib_enabled = True
+        return result
+
+    def _enable_matplotlib_if_imported(self):
+        """
+        Enable inline plotting if matplotlib has been imported, otherwise wait
+        until it is
+        """
+        if self._matplotlib_enabled:
+            return
+
+        if "matplotlib" not in sys.modules:
+            _install_matplotlib_hook()
+            return
+
+        try:
+            with active_shell(self):
+                self.enable_matplotlib("inline")
+        except ModuleNotFoundError:
+            # matplotlib-inline is not installed
+            self._matplotlib_enabled = True
 
     def __enter__(self):
         return self
@@ -184,6 +451,82 @@ class PloomberShell(InteractiveShell):
         for key in keys:
             del self.user_ns[key]
 
+    def freeze_baseline(self):
+        """Exclude the objects that exist before executing a notebook from the
+        garbage collection that ``release_memory`` runs, so it only has to
+        scan the objects the notebook created. Does nothing if objects are
+        already frozen (e.g., by ``gc.freeze()``)
+
+        Notes
+        -----
+        Freezing is process-wide, so shells executing at the same time share
+        it: objects are unfrozen once all of them call ``release_memory``.
+
+        .. versionadded:: 0.0.34
+        """
+        if not self._frozen:
+            _FROZEN_BASELINE.acquire()
+            self._frozen = True
+
+    def release_memory(self, delete_variables=True):
+        """Release the memory held by the executed code: the user's variables,
+        the output cache, the last result, references held by the last
+        traceback, and matplotlib figures. Then run the garbage collector and
+        return free memory to the OS (where supported)
+
+        Parameters
+        ----------
+        delete_variables : bool, default=True
+            If True, delete the variables defined by the user
+
+        Returns
+        -------
+        int or None
+            Reduction of the process' resident memory in bytes (None if
+            ``psutil`` is not installed)
+
+        Notes
+        -----
+        A full garbage collection scans every object in the process, which
+        can take a significant amount of time compared to executing a small
+        notebook. If ``freeze_baseline()`` was called before executing, only
+        the objects created afterwards are scanned.
+
+        .. versionadded:: 0.0.34
+        """
+        before = rss()
+
+        if delete_variables:
+            self.delete_interactive_variables()
+
+        self.user_ns.pop("_exit_code", None)
+        self.last_execution_result = None
+        self._current_output.clear()
+
+        # the last traceback keeps the frames (and their variables) alive
+        self.InteractiveTB.tb = None
+
+        for name in ("last_type", "last_value", "last_traceback", "last_exc"):
+            if hasattr(sys, name):
+                setattr(sys, name, None)
+
+        if "matplotlib.pyplot" in sys.modules:
+            sys.modules["matplotlib.pyplot"].close("all")
+
+        if self.displayhook.do_full_cache:
+            # clears Out, _oh, _, __, and ___, then runs gc.collect()
+            self.displayhook.flush()
+        else:
+            gc.collect()
+
+        if self._frozen:
+            _FROZEN_BASELINE.release()
+            self._frozen = False
+
+        malloc_trim()
+
+        return None if before is None else before - rss()
+
 
 def _remove_cells_with_tags(nb, tags):
     if not tags:
@@ -217,6 +560,52 @@ def _remove_cells_execution_count(nb):
     return nb
 
 
+class CellExecuted:
+    """Emitted by ``PloomberClient.execute_async`` after executing a code cell
+
+    Attributes
+    ----------
+    index : int
+        Index of the cell in the notebook
+
+    cell : NotebookNode
+        The executed cell (with its outputs)
+
+    execution_count : int
+        Execution count of the cell
+
+    elapsed : float
+        Seconds it took to execute the cell
+
+    nb : NotebookNode
+        The notebook being executed
+    """
+
+    def __init__(self, index, cell, execution_count, elapsed, nb):
+        self.index = index
+        self.cell = cell
+        self.execution_count = execution_count
+        self.elapsed = elapsed
+        self.nb = nb
+
+    def __repr__(self):
+        return (
+            f"{type(self).__name__}(index={self.index!r}, "
+            f"execution_count={self.execution_count!r}, elapsed={self.elapsed:.3f})"
+        )
+
+
+class _StopExecution(BaseException):
+    """Raised in the thread executing the notebook when the caller of
+    ``PloomberClient.execute_async`` stops iterating
+    """
+
+
+def _elapsed(cell):
+    metadata = cell.metadata.get("ploomber", {})
+    return metadata["timestamp_end"] - metadata["timestamp_start"]
+
+
 class PloomberClient:
     """PloomberClient executes Jupyter notebooks
 
@@ -243,8 +632,73 @@ class PloomberClient:
     cwd : str or Path, default='.'
         Working directory to use when executing the notebook
 
+    shell_pool : ShellPool, default=None
+        If passed, the shell is taken from this pool (and returned to it after
+        execution) instead of initializing a new one
+
+    bytecode_cache : bool, BytecodeCache, str or Path, default=None
+        Cache the transformed source and compiled code of every cell so later
+        executions skip both steps. If a str or Path, it's used as the cache
+        directory. True stores the cache next to the notebook, so it's only
+        supported by ``from_path``; False disables it
+
+    fast_path : bool, default=False
+        If True, cells that do not use IPython syntax (magics, shell escapes,
+        etc.) are compiled and executed directly in the notebook's namespace,
+        skipping most of ``InteractiveShell.run_cell``'s overhead. Useful for
+        notebooks with many small cells
+
+    timeout : int or float, default=None
+        Maximum number of seconds to execute the notebook
+
+    cell_timeout : int or float, default=None
+        Maximum number of seconds to execute each cell. Cells tagged
+        ``timeout=<seconds>`` (e.g., ``timeout=600``) override it
+
+    max_memory : int or float, default=None
+        Maximum memory (resident set size of the process) in megabytes. If
+        exceeded, the running cell fails with ``MemoryLimitError``. Requires
+        ``psutil``
+
+    writer : NotebookWriter, default=None
+        Writes the notebook while it executes (see ``NotebookWriter``)
+
+    lean : bool, default=False
+        If True, use a lean shell: no history file, no output cache, and no
+        interactive-only features (see ``PloomberShell``). Ignored if
+        ``shell_pool`` is passed
+
+    Attributes
+    ----------
+    released_memory : int or None
+        Reduction of the process' resident memory (in bytes) after clearing
+        the shell at the end of the last execution (see
+        ``PloomberShell.release_memory``). None if ``psutil`` is not installed,
+        a ``shell_pool`` is used, or the client has not executed yet
+
     Notes
     -----
+    Timeouts interrupt the cell by raising ``CellTimeoutError`` in it, which
+    is stored as the cell's error output. In the main thread, this is done
+    with ``SIGALRM`` (if available), which also interrupts blocking calls such
+    as ``time.sleep``; otherwise, the exception is raised once the cell
+    executes the next Python instruction. Code running in C extensions that
+    does not release the GIL is not interrupted until it returns.
+
+    ``max_memory`` is enforced by sampling the process' memory in a
+    background thread, so it can be exceeded briefly (e.g., by a single large
+    allocation) before the cell is interrupted; it does not replace an OS-level
+    limit but prevents most runaway cells from getting the process killed.
+
+    Several clients can execute notebooks at the same time in threads of the
+    same process only if they use the same ``cwd``: the working directory is
+    process-wide, so executions that need a different one wait until the
+    others finish.
+
+    .. versionchanged:: 0.0.34
+        Added ``shell_pool``, ``bytecode_cache``, ``fast_path``, ``timeout``,
+        ``cell_timeout``, ``max_memory``, ``writer``, and ``lean`` arguments.
+
     .. versionchanged:: 0.0.25dev
         Removed cell outputs and execution count
         Added error messages to output notebook during an exception
@@ -314,6 +768,14 @@ class PloomberClient:
         debug_later=False,
         remove_tagged_cells=None,
         cwd=".",
+        shell_pool=None,
+        bytecode_cache=None,
+        fast_path=False,
+        timeout=None,
+        cell_timeout=None,
+        max_memory=None,
+        writer=None,
+        lean=False,
     ):
         self._nb = _remove_cells_with_tags(nb, remove_tagged_cells)
         self._nb = _remove_cells_outputs(self._nb)
@@ -322,6 +784,33 @@ class PloomberClient:
         self._display_stdout = display_stdout
         self._debug_later = debug_later
         self._cwd = cwd
+        self._shell_pool = shell_pool
+        self._fast_path = fast_path
+        self._timeout = timeout
+        self._cell_timeout = cell_timeout
+        self._deadline = None
+        self._max_memory = max_memory
+        self._writer = writer
+        self._lean = lean
+        # called after each code cell executes, used by execute_async
+        self._on_cell_executed = None
+        self.released_memory = None
+        self._memory_watchdog = (
+            None if max_memory is None else MemoryWatchdog(max_memory * 1048576)
+        )
+
+        if bytecode_cache is True:
+            raise ValueError(
+                "bytecode_cache=True requires the notebook's path, use "
+                "PloomberClient.from_path or pass a path to the cache directory"
+            )
+
+        if bytecode_cache is None or bytecode_cache is False:
+            self._bytecode_cache = None
+        elif isinstance(bytecode_cache, BytecodeCache):
+            self._bytecode_cache = bytecode_cache
+        else:
+            self._bytecode_cache = BytecodeCache(bytecode_cache)
 
         # NOTE: this env var is only used internally so the doctests don't show
         # the progress bar
@@ -341,6 +830,14 @@ class PloomberClient:
         debug_later=False,
         remove_tagged_cells=None,
         cwd=".",
+        shell_pool=None,
+        bytecode_cache=None,
+        fast_path=False,
+        timeout=None,
+        cell_timeout=None,
+        max_memory=None,
+        writer=None,
+        lean=False,
     ):
         """Initialize client from a path to a notebook
 
@@ -367,8 +864,45 @@ class PloomberClient:
         cwd : str or Path, default='.'
             Working directory to use when executing the notebook
 
+        shell_pool : ShellPool, default=None
+            If passed, the shell is taken from this pool (and returned to it after
+            execution) instead of initializing a new one
+
+        bytecode_cache : bool, BytecodeCache, str or Path, default=None
+            Cache the transformed source and compiled code of every cell so
+            later executions skip both steps. If a str or Path, it's used as
+            the cache directory. If True, the cache is stored in
+            ``__ploomber_cache__/bytecode`` in the notebook's directory; False
+            disables it
+
+        fast_path : bool, default=False
+            If True, cells that do not use IPython syntax are executed
+            directly, skipping most of ``InteractiveShell.run_cell``'s overhead
+
+        timeout : int or float, default=None
+            Maximum number of seconds to execute the notebook
+
+        cell_timeout : int or float, default=None
+            Maximum number of seconds to execute each cell. Cells tagged
+            ``timeout=<seconds>`` override it
+
+        max_memory : int or float, default=None
+            Maximum memory (resident set size of the process) in megabytes.
+            If exceeded, the running cell fails with ``MemoryLimitError``
+
+        writer : NotebookWriter, default=None
+            Writes the notebook while it executes
+
+        lean : bool, default=False
+            If True, use a lean shell (see ``PloomberShell``)
+
         Notes
         -----
+        .. versionchanged:: 0.0.34
+            Added ``shell_pool``, ``bytecode_cache``, ``fast_path``, ``timeout``,
+            ``cell_timeout``, ``max_memory``, ``writer``, and ``lean`` arguments.
+            The outputs of the notebook are no longer loaded.
+
         .. versionchanged:: 0.0.23
             Added ``cwd`` argument.
 
@@ -388,7 +922,12 @@ class PloomberClient:
         >>> out = client.execute()
 
         """
-        nb = nbformat.read(path, as_version=nbformat.NO_CONVERT)
+        # outputs are removed before executing, so do not load them
+        nb = read_without_outputs(path)
+
+        if bytecode_cache is True:
+            bytecode_cache = cache_dir_for(path, "bytecode")
+
         return cls(
             nb,
             display_stdout=display_stdout,
@@ -396,21 +935,60 @@ class PloomberClient:
             debug_later=debug_later,
             remove_tagged_cells=remove_tagged_cells,
             cwd=cwd,
+            shell_pool=shell_pool,
+            bytecode_cache=bytecode_cache,
+            fast_path=fast_path,
+            timeout=timeout,
+            cell_timeout=cell_timeout,
+            max_memory=max_memory,
+            writer=writer,
+            lean=lean,
         )
 
+    @property
+    def bytecode_cache(self):
+        """The ``BytecodeCache`` used by this client (None if disabled), its
+        ``hits`` and ``misses`` attributes count the cells that used cached code
+        """
+        return self._bytecode_cache
+
     def execute_cell(self, cell, cell_index, execution_count, store_history):
         if self._shell is None:
             raise RuntimeError("A shell has not been initialized")
 
         # results are published in different places. Here we grab all of them
         # and return them
-        with patch_sys_std_out_err(self._display_stdout) as (
-            stdout_stream,
-            stderr_stream,
-        ):
+        capture = self._capture_std()
+
+        with active_shell(self._shell), capture as (stdout_stream, stderr_stream):
 
             self.hook_cell_pre(cell)
-            result = self._shell.run_cell(cell["source"])
+
+            compiled = (
+                _compile_cell(self._shell, cell["source"], execution_count)
+                if self._fast_path
+                else None
+            )
+
+            result = None
+
+            try:
+                with interrupt_after(*self._timeout_for(cell)), self._watch_memory():
+                    if compiled is not None:
+                        result = _run_compiled(self._shell, compiled, cell["source"])
+                    elif self._bytecode_cache is None:
+                        result = self._shell.run_cell(cell["source"])
+                    else:
+                        result = self._bytecode_cache.run_cell(
+                            self._shell, cell["source"]
+                        )
+            except (CellTimeoutError, MemoryLimitError) as e:
+                # the interrupt fired after the cell's code finished but
+                # before it was cancelled. If the shell did not return the
+                # result, the cell fails with it
+                if result is None:
+                    result = _failed_result(self._shell, cell["source"], e)
+
             self.hook_cell_post(cell)
             stdout = stdout_stream.get_separated_values()
             stderr = stderr_stream.getvalue()
@@ -443,29 +1021,103 @@ class PloomberClient:
         cell.execution_count = execution_count
 
         if not result.success:
-            # Append to the position above cell
-            self._nb.cells.insert(
-                cell_index,
-                nbformat.v4.new_markdown_cell(
-                    source='## <span style="color:red">Ploomber Engine raised an'
-                    + " exception due to the cell below </span>",
-                    metadata={"tags": ["ploomber-engine-error-cell"]},
-                ),
-            )
+            self._add_error_cells(cell, cell_index)
 
-            # Append to the start
-            self._nb.cells.insert(
-                0,
-                nbformat.v4.new_markdown_cell(
-                    source='## <span style="color:red">An Exception has'
-                    + f" occured at cell {cell.execution_count}</span>",
-                    metadata={"tags": ["ploomber-engine-error-cell"]},
-                ),
-            )
+        self._write_cell(cell)
+
+        if not result.success:
             result.raise_error()
 
+        self._cell_executed(cell, execution_count)
+
         return output
 
+    def _capture_std(self):
+        """Returns a context manager that captures the text printed by a cell
+        (yields the stdout and stderr streams)
+        """
+        return patch_sys_std_out_err(self._display_stdout)
+
+    def _write_cell(self, cell):
+        """
+        Pass an executed cell to the writer. Must be called (from the thread
+        that called ``_execute``) for every cell that does not go through
+        ``execute_cell``
+        """
+        if self._writer is not None:
+            self._writer.cell_executed(self._nb, cell)
+
+    def _cell_executed(self, cell, execution_count):
+        """
+        Must be called after a code cell executes successfully (or its outputs
+        are restored) by clients that do not use ``execute_cell``
+        """
+        if self._on_cell_executed is not None:
+            self._on_cell_executed(cell, execution_count)
+
+    def _add_error_cells(self, cell, cell_index):
+        """Add markdown cells highlighting the cell that raised an exception"""
+        # Append to the position above cell
+        self._nb.cells.insert(
+            cell_index,
+            nbformat.v4.new_markdown_cell(
+                source='## <span style="color:red">Ploomber Engine raised an'
+                + " exception due to the cell below </span>",
+                metadata={"tags": ["ploomber-engine-error-cell"]},
+            ),
+        )
+
+        # Append to the start
+        self._nb.cells.insert(
+            0,
+            nbformat.v4.new_markdown_cell(
+                source='## <span style="color:red">An Exception has'
+                + f" occured at cell {cell.execution_count}</span>",
+                metadata={"tags": ["ploomber-engine-error-cell"]},
+            ),
+        )
+
+    def _timeout_for(self, cell):
+        """
+        Returns the number of seconds the cell can take (None if there is no
+        limit) and the exception to raise if it takes longer
+        """
+        timeout = self._cell_timeout
+
+        for tag in cell.metadata.get("tags", []):
+            if tag.startswith("timeout="):
+                try:
+                    timeout = float(tag[len("timeout=") :])
+                except ValueError:
+                    raise ValueError(
+                        f"Invalid tag {tag!r}, expected timeout=<seconds>"
+                    ) from None
+
+        if self._deadline is not None:
+            remaining = self._deadline - monotonic()
+
+            if timeout is None or remaining < timeout:
+                return remaining, CellTimeoutError(
+                    f"Notebook execution exceeded the timeout of {self._timeout:g} "
+                    "seconds"
+                )
+
+        if timeout is None:
+            return None, None
+
+        return timeout, CellTimeoutError(
+            f"Cell execution exceeded the timeout of {timeout:g} seconds"
+        )
+
+    def _watch_memory(self):
+        if self._memory_watchdog is None:
+            return contextlib.nullcontext()
+
+        return self._memory_watchdog.watch()
+
+    def _start_deadline(self, timeout):
+        self._deadline = None if timeout is None else monotonic() + timeout
+
     def execute(self, parameters=None):
         """Execute the notebook
 
@@ -487,6 +1139,258 @@ class PloomberClient:
         if parameters is not None:
             parametrize_notebook(self._nb, parameters=parameters)
 
+        self._add_debuglater_cells()
+        self._start_deadline(self._timeout)
+
+        if self._writer is not None:
+            self._writer.start(self._nb)
+
+        try:
+            with self:
+                self._execute()
+        finally:
+            if self._writer is not None:
+                self._writer.close(self._nb)
+
+        _restore_original_instance(original)
+
+        return self._nb
+
+    async def execute_async(self, parameters=None):
+        """Execute the notebook without blocking the event loop. Cells run in
+        a dedicated thread, and a ``CellExecuted`` event is yielded after each
+        code cell
+
+        Parameters
+        ----------
+        parameters : dict, default=None
+            Parameters to inject in the notebook
+
+        Yields
+        ------
+        CellExecuted
+            One event per executed code cell, ``event.nb`` is the notebook
+            object (the same one ``execute`` returns)
+
+        Notes
+        -----
+        If a cell fails, the exception is raised once the error outputs are
+        added to the notebook. To stop executing, cancel the task iterating
+        over the events, or stop iterating; the running cell is not
+        interrupted, execution stops once it finishes.
+
+        Only the text printed in the thread executing the cell is stored in
+        its outputs, anything the event loop prints at the same time is not.
+
+        Subclasses execute the notebook the same way ``execute`` does (e.g.,
+        ``ParallelClient`` runs independent cells concurrently and
+        ``IncrementalClient`` restores cached cells); cells whose outputs are
+        restored also emit an event.
+
+        .. versionadded:: 0.0.34
+
+        Examples
+        --------
+        >>> import asyncio
+        >>> from ploomber_engine.ipython import PloomberClient
+        >>> import nbformat
+        >>> nb = nbformat.v4.new_notebook()
+        >>> nb.cells = [nbformat.v4.new_code_cell("1 + 1"),
+        ...             nbformat.v4.new_code_cell("2 + 2")]
+        >>> async def main():
+        ...     client = PloomberClient(nb)
+        ...     return [event.index async for event in client.execute_async()]
+        >>> asyncio.run(main())
+        [0, 1]
+        """
+        original = InteractiveShell._instance
+
+        if parameters is not None:
+            parametrize_notebook(self._nb, parameters=parameters)
+
+        self._add_debuglater_cells()
+        self._start_deadline(self._timeout)
+
+        if self._writer is not None:
+            self._writer.start(self._nb)
+
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue()
+        # the executing thread waits until the next event is requested, so
+        # cells do not run ahead of the caller
+        requested = threading.Semaphore(0)
+        stopped = threading.Event()
+
+        def on_cell_executed(cell, execution_count):
+            index = next(i for i, c in enumerate(self._nb.cells) if c is cell)
+            event = CellExecuted(
+                index=index,
+                cell=cell,
+                execution_count=execution_count,
+                elapsed=_elapsed(cell),
+                nb=self._nb,
+            )
+            loop.call_soon_threadsafe(events.put_nowait, event)
+            requested.acquire()
+
+            if stopped.is_set():
+                raise _StopExecution
+
+        def execute():
+            try:
+                with self:
+                    self._execute()
+            finally:
+                loop.call_soon_threadsafe(events.put_nowait, None)
+
+        # the shell is initialized, used and cleared in the same thread
+        executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="ploomber-engine"
+        )
+        self._on_cell_executed = on_cell_executed
+        future = loop.run_in_executor(executor, execute)
+
+        try:
+            event = await events.get()
+
+            while event is not None:
+                yield event
+                requested.release()
+                event = await events.get()
+
+            await future
+        finally:
+            stopped.set()
+            requested.release()
+
+            # if cancelled, this waits for the running cell to finish
+            await asyncio.wait({future})
+
+            if not future.cancelled():
+                future.exception()
+
+            executor.shutdown(wait=False)
+            self._on_cell_executed = None
+
+            if self._writer is not None:
+                self._writer.close(self._nb)
+
+            _restore_original_instance(original)
+
+    def execute_sweep(self, parameters):
+        """Execute the notebook once per parameter set. Cells before the
+        injected parameters are executed only once, then each parameter set
+        runs the remaining cells in a forked process that starts from the
+        resulting namespace
+
+        Parameters
+        ----------
+        parameters : list of dict
+            Parameter sets to execute the notebook with
+
+        Returns
+        -------
+        list of nb
+            Executed notebooks (one per parameter set, same order). Each one is
+            identical to the output of executing the notebook with ``execute``
+
+        Notes
+        -----
+        In platforms without ``os.fork``, the notebook is executed from
+        scratch for each parameter set. If any execution fails, the exception
+        is raised.
+
+        .. versionadded:: 0.0.34
+
+        Examples
+        --------
+        >>> from ploomber_engine.ipython import PloomberClient
+        >>> import nbformat
+        >>> nb = nbformat.v4.new_notebook()
+        >>> nb.cells = [nbformat.v4.new_code_cell("data = list(range(10))"),
+        ...             nbformat.v4.new_code_cell("n = 1",
+        ...                                       metadata=dict(tags=["parameters"])),
+        ...             nbformat.v4.new_code_cell("data[:n]")]
+        >>> client = PloomberClient(nb)
+        >>> nbs = client.execute_sweep([dict(n=1), dict(n=3)])
+        >>> [nb.cells[-1]['outputs'][0]['data'] for nb in nbs]
+        [{'text/plain': '[0]'}, {'text/plain': '[0, 1, 2]'}]
+        """
+        parameters = list(parameters)
+
+        if not hasattr(os, "fork"):
+            return [
+                type(self)(
+                    copy.deepcopy(self._nb),
+                    display_stdout=self._display_stdout,
+                    progress_bar=self._progress_bar,
+                    debug_later=self._debug_later,
+                    cwd=self._cwd,
+                    shell_pool=self._shell_pool,
+                    bytecode_cache=self._bytecode_cache,
+                    fast_path=self._fast_path,
+                    timeout=self._timeout,
+                    cell_timeout=self._cell_timeout,
+                    max_memory=self._max_memory,
+                    lean=self._lean,
+                ).execute(parameters=params)
+                for params in parameters
+            ]
+
+        original = InteractiveShell._instance
+
+        self._add_debuglater_cells()
+
+        # find out where the parameters are injected, everything before it is
+        # the shared prefix
+        probe = parametrize_notebook(copy.deepcopy(self._nb), parameters={})
+        _, idx_injected = find_cell_with_tag(probe, "injected-parameters")
+        template = self._nb
+        self._start_deadline(self._timeout)
+
+        try:
+            with self, add_to_sys_path(self._cwd):
+                execution_count = self._execute_cells(
+                    start=0, stop=idx_injected, execution_count=1
+                )
+                # every parameter set can take what's left of the timeout
+                remaining = (
+                    None if self._deadline is None else self._deadline - monotonic()
+                )
+
+                nbs = [
+                    nbformat.reads(
+                        run_in_fork(
+                            self._execute_suffix,
+                            template,
+                            params,
+                            idx_injected,
+                            execution_count,
+                            remaining,
+                        ),
+                        as_version=nbformat.NO_CONVERT,
+                    )
+                    for params in parameters
+                ]
+        finally:
+            self._nb = template
+            _restore_original_instance(original)
+
+        return nbs
+
+    def _execute_suffix(self, template, parameters, start, execution_count, timeout):
+        """Runs in a forked process: inject parameters and execute the cells
+        from ``start``
+        """
+        self._start_deadline(timeout)
+        self._nb = copy.deepcopy(template)
+        parametrize_notebook(self._nb, parameters=parameters)
+        self._execute_cells(
+            start=start, stop=len(self._nb.cells), execution_count=execution_count
+        )
+        return nbformat.writes(self._nb)
+
+    def _add_debuglater_cells(self):
         if self._debug_later:
             add_debuglater_cells(
                 self._nb,
@@ -497,24 +1401,6 @@ class PloomberClient:
                 ),
             )
 
-        with self:
-            self._execute()
-
-        if original is not None:
-            # restore original instance
-            InteractiveShell._instance = original
-
-            # restore inline matplotlib
-            try:
-                from matplotlib_inline.backend_inline import configure_inline_support
-            except ModuleNotFoundError:
-                pass
-            else:
-                configure_inline_support(original, "inline")
-                original.run_line_magic("matplotlib", "inline")
-
-        return self._nb
-
     def get_namespace(self, namespace=None):
         """Run the notebook and return all the output variables
 
@@ -605,45 +1491,69 @@ class PloomberClient:
         Internal method to execute a notebook, assumes the shell has been
         initialized
         """
-        execution_count = 1
-
-        # the progress bar will not resize if running on a notebook, so we fix its size
-        kwargs = dict(ncols=80) if _IS_NOTEBOOK else dict()
-        iterator = (
-            self._nb.cells if not self._progress_bar else tqdm(self._nb.cells, **kwargs)
-        )
-
         # make sure that the current working directory is in the sys.path
         # in case the user has local modules
         with add_to_sys_path(self._cwd):
-            for index, cell in enumerate(iterator):
-                if cell.cell_type == "code":
-                    if self._progress_bar:
-                        iterator.set_description(f"Executing cell: {execution_count}")
-
-                    self.execute_cell(
-                        cell,
-                        cell_index=index,
-                        execution_count=execution_count,
-                        store_history=False,
-                    )
-                    execution_count += 1
+            self._execute_cells(start=0, stop=len(self._nb.cells), execution_count=1)
 
         return self._nb
 
+    def _execute_cells(self, start, stop, execution_count):
+        """
+        Execute cells in the [start, stop) range, returns the execution count
+        for the next code cell
+        """
+        iterator = self._make_iterator(self._nb.cells[start:stop])
+
+        for index, cell in enumerate(iterator, start=start):
+            if cell.cell_type == "code":
+                if self._progress_bar:
+                    iterator.set_description(f"Executing cell: {execution_count}")
+
+                self.execute_cell(
+                    cell,
+                    cell_index=index,
+                    execution_count=execution_count,
+                    store_history=False,
+                )
+                execution_count += 1
+
+        return execution_count
+
+    def _make_iterator(self, cells):
+        """Wrap cells in a progress bar (if enabled)"""
+        if not self._progress_bar:
+            return cells
+
+        # the progress bar will not resize if running on a notebook, so we fix its size
+        kwargs = dict(ncols=80) if _IS_NOTEBOOK else dict()
+        return tqdm(cells, **kwargs)
+
     def __enter__(self):
         """Initialize shell"""
         if self._shell is None:
-            self._shell = PloomberShell()
+            if self._shell_pool is None:
+                self._shell = PloomberShell(lean=self._lean)
+            else:
+                self._shell = self._shell_pool.acquire()
+
+            self._shell.freeze_baseline()
+
             return self
         else:
             raise RuntimeError("A shell is already active")
 
     def __exit__(self, exc_type, exc_value, traceback):
         """Clear shell"""
-        # delete interactive variables
-        self._shell.clear_instance()
-        self._shell.delete_interactive_variables()
+        if self._memory_watchdog is not None:
+            self._memory_watchdog.stop()
+
+        if self._shell_pool is None:
+            _end_history_session(self._shell)
+            self.released_memory = self._shell.release_memory()
+        else:
+            self._shell_pool.release(self._shell)
+
         self._shell = None
 
     def hook_cell_pre(self, cell):
@@ -655,11 +1565,49 @@ class PloomberClient:
         recursive_update(cell.metadata, metadata)
 
 
+def _end_history_session(shell):
+    """Close the shell's history session now instead of at exit. Needed for
+    shells created in other threads, since SQLite connections can only be used
+    in the thread that created them
+    """
+    atexit.unregister(shell.atexit_operations)
+    shell.history_manager.end_session()
+
+
+def _restore_original_instance(original):
+    """Restore inline plotting in the InteractiveShell that was active before
+    executing (e.g., when running in Jupyter)
+    """
+    if original is not None:
+        # restore inline matplotlib
+        try:
+            from matplotlib_inline.backend_inline import configure_inline_support
+        except ModuleNotFoundError:
+            pass
+        else:
+            configure_inline_support(original, "inline")
+            original.run_line_magic("matplotlib", "inline")
+
+
 class PloomberManagedClient(PloomberClient):
-    def __init__(self, nb_man):
-        super().__init__(nb_man.nb)
+    def __init__(self, nb_man, cell_timeout=None):
+        super().__init__(nb_man.nb, cell_timeout=cell_timeout)
         self._nb_man = nb_man
 
+    def _add_error_cells(self, cell, cell_index):
+        super()._add_error_cells(cell, cell_index)
+
+        # papermill expects all cells to have its metadata
+        for current in self._nb.cells:
+            if "papermill" not in current.metadata:
+                current.metadata["papermill"] = dict(
+                    exception=None,
+                    start_time=None,
+                    end_time=None,
+                    duration=None,
+                    status=self._nb_man.PENDING,
+                )
+
     def _execute(self):
         execution_count = 1
 
@@ -677,14 +1625,14 @@ class PloomberManagedClient(PloomberClient):
                             store_history=False,
                         )
                     except Exception as ex:
+                        # error cells may have been inserted, so the index
+                        # no longer points to this cell
                         self._nb_man.cell_exception(
-                            self._nb.cells[index], cell_index=index, exception=ex
+                            cell, cell_index=index, exception=ex
                         )
                         break
                     finally:
-                        self._nb_man.cell_complete(
-                            self._nb.cells[index], cell_index=index
-                        )
+                        self._nb_man.cell_complete(cell, cell_index=index)
                         execution_count += 1
 
         return self._nb
@@ -716,40 +1664,34 @@ class IO(StringIO):
 
 @contextlib.contextmanager
 def patch_sys_std_out_err(display_output):
-    """Path sys.{stout, sterr} to capture output"""
-    # keep a reference to the system ones
-    stdout, stderr = sys.stdout, sys.stderr
+    """
+    Capture the text printed in the current thread. Other threads keep writing
+    to their own streams, so several cells can execute at the same time
 
-    # patch them
+    Notes
+    -----
+    .. versionchanged:: 0.0.34
+        Only captures the text printed in the current thread (or context)
+    """
+    stdout, stderr = std_streams()
     stdout_stream = IO(default=stdout, std_type="out", display=display_output)
     stderr_stream = IO(default=stderr, std_type="err")
-    sys.stdout, sys.stderr = stdout_stream, stderr_stream
 
-    try:
+    with redirect_std(stdout_stream, stderr_stream):
         yield stdout_stream, stderr_stream
-    finally:
-        # revert
-        sys.stdout, sys.stderr = stdout, stderr
 
 
-@contextlib.contextmanager
 def add_to_sys_path(path, chdir=True):
     """
     Add directory to sys.path, optionally making it the working directory
     temporarily
-    """
-    cwd_old = os.getcwd()
-
-    if path is not None:
-        path = os.path.abspath(path)
-        sys.path.insert(0, path)
 
-        if chdir:
-            os.chdir(path)
-
-    try:
-        yield
-    finally:
-        if path is not None:
-            sys.path.remove(path)
-            os.chdir(cwd_old)
+    Notes
+    -----
+    .. versionchanged:: 0.0.34
+        The working directory is process-wide, so executions in other threads
+        that need a different one wait until this one finishes. A nested call
+        that needs a different one raises ``RuntimeError`` if executions in
+        other threads are using the current one
+    """
+    return working_directory(path, chdir=chdir)
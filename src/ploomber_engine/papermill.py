@@ -34,9 +34,7 @@ class PapermillPloomberNotebookClient(PapermillNotebookClient, PloomberNotebookC
                 )
                 break
             except CellTimeoutError as e:
-                # this will exit execution gracefully upon debugging, but
-                # it will also cause the notebook to abort execution after
-                # an "input" cell
+                # abort execution, the cell may be waiting for input
                 print(e)
                 sys.exit(1)
             finally:
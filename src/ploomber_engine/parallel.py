@@ -0,0 +1,331 @@
+"""
+Execute independent cells concurrently
+"""
+
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import nbformat
+
+from ploomber_engine.ipython import (
+    PloomberClient,
+    add_to_sys_path,
+    _make_stream_output,
+    _compile_cell,
+)
+from ploomber_engine._watchdog import (
+    interrupt_after,
+    CellTimeoutError,
+    MemoryLimitError,
+)
+from ploomber_engine._analysis import analyze_cells, find_dependencies
+from ploomber_engine._context import active_shell, redirect_std, std_streams
+
+
+class _ThreadLocalOutput(list):
+    """
+    Replaces the shell's ``_current_output`` so outputs published by cells
+    running in worker threads are routed to the cell that produced them
+    """
+
+    def __init__(self, local):
+        super().__init__()
+        self._local = local
+
+    def append(self, item):
+        outputs = getattr(self._local, "outputs", None)
+
+        if outputs is None:
+            super().append(item)
+        else:
+            outputs.append(item)
+
+
+class ParallelClient(PloomberClient):
+    """A ``PloomberClient`` that executes independent cells at the same time
+    using a thread pool. Outputs are stored in the notebook in the same order
+    as a sequential execution
+
+    Parameters
+    ----------
+    nb
+        Notebook object
+
+    max_workers : int, default=None
+        Maximum number of cells to execute at the same time. If None, it uses
+        the ``ThreadPoolExecutor`` default
+
+    **kwargs
+        Any other ``PloomberClient`` arguments
+
+    Notes
+    -----
+    Dependencies between cells are found by analyzing which variables each
+    cell reads and writes (see ``IncrementalClient`` for details). Cells that
+    cannot be analyzed (e.g., they use magics) are executed after all previous
+    cells finish and before any of the next ones start.
+
+    Executing cells concurrently only speeds up execution if they release the
+    GIL (e.g., I/O or numpy/pandas operations). Cells that depend on each
+    other through something other than variables (e.g., one writes a file the
+    other reads) or that use libraries that are not thread-safe (e.g.,
+    ``matplotlib.pyplot``) may produce different results; use the sequential
+    ``PloomberClient`` for those notebooks.
+
+    Timeouts and ``max_memory`` also apply to cells executed in worker
+    threads, but they are interrupted once they execute the next Python
+    instruction: blocking calls (e.g., ``time.sleep``) are not interrupted.
+
+    .. versionadded:: 0.0.34
+
+    Examples
+    --------
+    >>> from ploomber_engine.parallel import ParallelClient
+    >>> import nbformat
+    >>> nb = nbformat.v4.new_notebook()
+    >>> nb.cells = [nbformat.v4.new_code_cell("a = 1"),
+    ...             nbformat.v4.new_code_cell("b = 2"),
+    ...             nbformat.v4.new_code_cell("a + b")]
+    >>> out = ParallelClient(nb, max_workers=2).execute()
+    >>> out.cells[2]['outputs'][0]['data']
+    {'text/plain': '3'}
+    """
+
+    def __init__(self, nb, max_workers=None, **kwargs):
+        super().__init__(nb, **kwargs)
+        self._max_workers = max_workers
+
+    @classmethod
+    def from_path(cls, path, max_workers=None, **kwargs):
+        """Initialize client from a path to a notebook"""
+        client = super().from_path(path, **kwargs)
+        client._max_workers = max_workers
+        return client
+
+    def _execute(self):
+        cells = self._nb.cells
+        indexes = [i for i, c in enumerate(cells) if c.cell_type == "code"]
+        infos = analyze_cells([cells[i].source for i in indexes])
+        dependencies = find_dependencies(infos)
+
+        compiled = [
+            (
+                _compile_cell(self._shell, cells[index].source, pos + 1)
+                if info.safe
+                else None
+            )
+            for pos, (index, info) in enumerate(zip(indexes, infos))
+        ]
+
+        router = _RouteOutputs(self._shell)
+        pending = set(range(len(indexes)))
+        done = set()
+        running = {}
+        failed = {}
+        progress = self._make_iterator(indexes)
+
+        with add_to_sys_path(self._cwd), router, ThreadPoolExecutor(
+            max_workers=self._max_workers
+        ) as executor:
+            while (pending and not failed) or running:
+                ready = (
+                    []
+                    if failed
+                    else sorted(pos for pos in pending if dependencies[pos] <= done)
+                )
+
+                # cells that would run alone (or can only be executed by the
+                # shell) run in this thread
+                if (
+                    not running
+                    and ready
+                    and (len(ready) == 1 or compiled[ready[0]] is None)
+                ):
+                    pos = ready[0]
+                    pending.remove(pos)
+                    self.execute_cell(
+                        cells[indexes[pos]],
+                        cell_index=indexes[pos],
+                        execution_count=pos + 1,
+                        store_history=False,
+                    )
+                    done.add(pos)
+                    _update(progress)
+                    continue
+
+                for pos in ready:
+                    if compiled[pos] is not None:
+                        pending.remove(pos)
+                        future = executor.submit(
+                            self._execute_compiled,
+                            router,
+                            cells[indexes[pos]],
+                            compiled[pos],
+                            pos + 1,
+                        )
+                        running[future] = pos
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+
+                for future in finished:
+                    pos = running.pop(future)
+                    error = future.result()
+                    # the writer is not thread-safe, cells executed in worker
+                    # threads are passed to it here
+                    self._write_cell(cells[indexes[pos]])
+
+                    if error is None:
+                        done.add(pos)
+                        self._cell_executed(cells[indexes[pos]], pos + 1)
+                    else:
+                        failed[pos] = error
+
+                    _update(progress)
+
+        _close(progress)
+
+        if failed:
+            pos = min(failed)
+            self._fail(cells[indexes[pos]], indexes[pos], failed[pos])
+
+        return self._nb
+
+    def _execute_compiled(self, router, cell, compiled, execution_count):
+        """Execute a compiled cell in a worker thread, returns the exception
+        info if it fails
+        """
+        stdout, stderr = _Stream(), _Stream()
+        outputs = []
+        local = router.local
+        local.outputs = outputs
+        user_ns = self._shell.user_ns
+        error = None
+        finished = False
+
+        self.hook_cell_pre(cell)
+        timeout = self._timeout_for(cell)
+
+        try:
+            with active_shell(self._shell), redirect_std(stdout, stderr):
+                # this is not the main thread, the exception is raised once
+                # the cell executes the next Python instruction
+                with interrupt_after(*timeout), self._watch_memory():
+                    exec(compiled.body, user_ns)
+
+                    if compiled.last_expression is not None:
+                        result = eval(compiled.last_expression, user_ns)
+
+                        # the display hook updates the output cache (_, Out)
+                        # and the prompt count
+                        with router.display_lock:
+                            self._shell.displayhook(result)
+
+                    finished = True
+        except BaseException:
+            etype, value, tb = sys.exc_info()
+
+            # ignore interrupts that fire after the cell finished
+            if not (
+                finished and isinstance(value, (CellTimeoutError, MemoryLimitError))
+            ):
+                # skip this frame
+                error = (etype, value, tb.tb_next)
+        finally:
+            local.outputs = None
+
+        self.hook_cell_post(cell)
+
+        cell.outputs = []
+
+        if stdout.getvalue():
+            cell.outputs.append(_make_stream_output(stdout.getvalue(), "stdout"))
+
+        if error is not None:
+            cell.outputs.append(self._make_error_output(*error))
+
+        if stderr.getvalue():
+            cell.outputs.append(_make_stream_output(stderr.getvalue(), "stderr"))
+
+        for output in outputs:
+            if output["output_type"] == "execute_result":
+                output["execution_count"] = execution_count
+
+        cell.outputs.extend(outputs)
+        cell.execution_count = execution_count
+
+        if self._display_stdout and stdout.getvalue():
+            router.stdout.write(stdout.getvalue())
+
+        return error
+
+    def _make_error_output(self, etype, value, tb):
+        traceback = self._shell.InteractiveTB.structured_traceback(etype, value, tb)
+        return nbformat.v4.new_output(
+            "error",
+            ename=etype.__name__,
+            evalue=str(value),
+            traceback="\n".join(traceback).splitlines(),
+        )
+
+    def _fail(self, cell, cell_index, error):
+        """Add the error cells and raise the exception raised by a cell
+        executed in a worker thread
+        """
+        self._add_error_cells(cell, cell_index)
+        raise error[1]
+
+
+class _Stream:
+    """Collects the text a cell prints"""
+
+    def __init__(self):
+        self._values = []
+
+    def write(self, s):
+        self._values.append(s)
+        return len(s)
+
+    def flush(self):
+        pass
+
+    def getvalue(self):
+        return "".join(self._values)
+
+
+class _RouteOutputs:
+    """
+    Route outputs produced in worker threads to the cell being executed in
+    each of them (printed text is routed by ``redirect_std``)
+    """
+
+    def __init__(self, shell):
+        self._shell = shell
+        self.local = threading.local()
+        self.display_lock = threading.Lock()
+        self.stdout = None
+        self.stderr = None
+
+    def __enter__(self):
+        self._current_output = self._shell._current_output
+        self.stdout, self.stderr = std_streams()
+
+        self._shell._current_output = _ThreadLocalOutput(self.local)
+        # make the names the shell adds to the builtins during run_cell (e.g.,
+        # display) available to cells executed in worker threads
+        self._shell.builtin_trap.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._shell.builtin_trap.__exit__(exc_type, exc_value, traceback)
+        self._shell._current_output = self._current_output
+
+
+def _update(progress):
+    if hasattr(progress, "update"):
+        progress.update()
+
+
+def _close(progress):
+    if hasattr(progress, "close"):
+        progress.close()
@@ -0,0 +1,445 @@
+"""
+Pools of pre-initialized execution environments
+"""
+
+import os
+import asyncio
+import threading
+import contextlib
+from queue import Empty
+
+from ploomber_core.dependencies import requires
+
+from ploomber_engine.ipython import PloomberShell
+from ploomber_engine._context import process_state, restore_process_state
+
+
+class ShellPool:
+    """Keeps pre-initialized ``PloomberShell`` instances so consecutive
+    executions do not pay the shell initialization cost
+
+    Parameters
+    ----------
+    size : int, default=1
+        Number of idle shells to keep around. If all the shells are in use,
+        ``acquire`` creates a new one; shells released once the pool is full
+        are discarded.
+
+    setup : str, default=None
+        Code to execute in every shell after creating it. Variables defined here
+        are kept across executions (they are restored when the shell is released)
+
+    lean : bool, default=False
+        If True, create lean shells (see ``PloomberShell``)
+
+    Notes
+    -----
+    Released shells are reset: user variables, outputs, event callbacks, the
+    current working directory and ``sys.path`` are restored to the state they
+    had when the shell was acquired (the last two are shared by the whole
+    process, so they are only restored if no other notebook is executing).
+    Modules imported by a notebook remain in ``sys.modules``, so editing a
+    local module won't take effect until the pool is closed.
+
+    .. versionadded:: 0.0.34
+
+    Examples
+    --------
+    >>> from ploomber_engine import execute_notebook
+    >>> from ploomber_engine.pool import ShellPool
+    >>> pool = ShellPool(size=1)
+    >>> out = execute_notebook("nb.ipynb", "out.ipynb", shell_pool=pool)
+    >>> out = execute_notebook("nb.ipynb", "out.ipynb", shell_pool=pool)
+    >>> pool.close()
+    """
+
+    def __init__(self, size=1, setup=None, lean=False):
+        if size < 1:
+            raise ValueError(f"size must be at least 1, got: {size}")
+
+        self._size = size
+        self._setup = setup
+        self._lean = lean
+        self._lock = threading.Lock()
+        self._idle = []
+        # user namespace and event callbacks right after initializing each shell
+        self._baselines = {}
+        # working directory and sys.path at the time each shell was acquired
+        self._acquired = {}
+
+        for _ in range(size):
+            self._idle.append(self._new_shell())
+
+    def __repr__(self):
+        return f"{type(self).__name__}(size={self._size})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def n_idle(self):
+        """Number of shells ready to be acquired"""
+        return len(self._idle)
+
+    def _new_shell(self):
+        shell = PloomberShell(lean=self._lean)
+
+        if self._setup:
+            result = shell.run_cell(self._setup)
+            # discard anything the setup code displayed
+            shell._get_output()
+            result.raise_error()
+
+        self._baselines[shell] = (
+            dict(shell.user_ns),
+            {event: list(cbs) for event, cbs in shell.events.callbacks.items()},
+            shell._matplotlib_enabled,
+        )
+        return shell
+
+    def acquire(self):
+        """Get a shell from the pool"""
+        with self._lock:
+            shell = self._idle.pop() if self._idle else None
+
+        if shell is None:
+            shell = self._new_shell()
+
+        self._acquired[shell] = process_state()
+        # matplotlib may have been imported since the shell was created
+        shell._enable_matplotlib_if_imported()
+        return shell
+
+    def release(self, shell):
+        """Reset a shell and return it to the pool"""
+        state = self._acquired.pop(shell)
+        self._reset(shell)
+        restore_process_state(state)
+
+        with self._lock:
+            if len(self._idle) < self._size:
+                self._idle.append(shell)
+                return
+
+        # the pool is full, discard the shell
+        del self._baselines[shell]
+
+    def close(self):
+        """Discard all idle shells"""
+        with self._lock:
+            for shell in self._idle:
+                del self._baselines[shell]
+
+            self._idle.clear()
+
+    def _reset(self, shell):
+        user_ns, callbacks, matplotlib_enabled = self._baselines[shell]
+
+        for key in list(shell.user_ns):
+            if key not in user_ns:
+                del shell.user_ns[key]
+
+        shell.user_ns.update(user_ns)
+
+        # the output cache (Out, _oh, _, __ and ___) keeps the results of the
+        # previous notebook, Out and _oh are the same dictionary
+        shell.history_manager.output_hist.clear()
+
+        for name in ("_", "__", "___"):
+            setattr(shell.displayhook, name, "")
+            shell.user_ns[name] = ""
+
+        for event, cbs in callbacks.items():
+            shell.events.callbacks[event] = list(cbs)
+
+        # restoring the callbacks removes inline plotting if the notebook
+        # enabled it, it's enabled again when acquiring the shell
+        shell._matplotlib_enabled = matplotlib_enabled
+
+        shell.execution_count = 1
+        shell.last_execution_succeeded = True
+        # variables were already restored to the baseline
+        shell.release_memory(delete_variables=False)
+
+
+# restores the kernel to a clean state after executing a notebook (modules
+# remain imported)
+_KERNEL_RESET = """
+get_ipython().run_line_magic("reset", "-f")
+import os as _os
+_os.chdir({cwd!r})
+del _os
+"""
+
+
+class KernelPool:
+    """Keeps Jupyter kernels running so executions with
+    ``PloomberNotebookClient`` or the ``debug`` and ``debuglater`` papermill
+    engines do not wait for a new kernel to start
+
+    Parameters
+    ----------
+    size : int, default=1
+        Number of kernels to keep running. If all of them are in use,
+        ``acquire`` starts a new one; kernels released once the pool is full
+        are shut down.
+
+    kernel_name : str, default=None
+        Kernel to start, defaults to Jupyter's default kernel (``python3``).
+        Executions use this kernel regardless of the notebook's kernelspec
+
+    max_uses : int, default=None
+        Restart kernels after executing this many notebooks
+
+    max_rss : int or float, default=None
+        Restart kernels whose resident memory exceeds this many megabytes
+        after executing a notebook. Requires ``psutil``
+
+    startup_timeout : int, default=60
+        Seconds to wait for a kernel to start
+
+    Notes
+    -----
+    Released kernels are reset: user variables are deleted and the working
+    directory is restored, but modules imported by a notebook remain
+    imported. Kernels that die or fail to reset are replaced. Kernels are
+    started with the working directory the pool was created in;
+    ``acquire`` changes it to the notebook's directory.
+
+    .. versionadded:: 0.0.34
+
+    Examples
+    --------
+    >>> from ploomber_engine.pool import KernelPool
+    >>> from ploomber_engine.client import PloomberNotebookClient
+    >>> import nbformat
+    >>> nb = nbformat.v4.new_notebook()
+    >>> nb.cells = [nbformat.v4.new_code_cell("1 + 1")]
+    >>> with KernelPool(size=1) as pool:
+    ...     out = PloomberNotebookClient(nb, kernel_pool=pool).execute()
+    >>> out.cells[0]['outputs'][0]['data']
+    {'text/plain': '2'}
+    """
+
+    def __init__(
+        self, size=1, kernel_name=None, max_uses=None, max_rss=None, startup_timeout=60
+    ):
+        if size < 1:
+            raise ValueError(f"size must be at least 1, got: {size}")
+
+        if max_rss is not None:
+            _check_psutil()
+
+        self._size = size
+        self._kernel_name = kernel_name
+        self._max_uses = max_uses
+        self._max_rss = max_rss
+        self._startup_timeout = startup_timeout
+        self._cwd = os.getcwd()
+        self._lock = threading.Lock()
+        self._idle = []
+        # replacement kernels being started, they take a place in the pool
+        self._starting = 0
+        # number of notebooks executed by each kernel
+        self._uses = {}
+
+        self._run_sync(self._async_start_idle)()
+
+    def __repr__(self):
+        return f"{type(self).__name__}(size={self._size})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def n_idle(self):
+        """Number of kernels ready to be acquired"""
+        return len(self._idle)
+
+    @staticmethod
+    def _run_sync(coro):
+        from nbclient.util import run_sync
+
+        return run_sync(coro)
+
+    async def _async_start_idle(self):
+        kernels = await asyncio.gather(
+            *(self._async_start_kernel() for _ in range(self._size))
+        )
+        self._idle.extend(kernels)
+
+    async def _async_start_kernel(self):
+        from jupyter_client.manager import AsyncKernelManager
+
+        kwargs = (
+            {} if self._kernel_name is None else dict(kernel_name=self._kernel_name)
+        )
+        km = AsyncKernelManager(**kwargs)
+        await km.start_kernel(cwd=self._cwd)
+
+        try:
+            await self._async_run(km, "None")
+        except BaseException:
+            await self._async_shutdown(km)
+            raise
+
+        with self._lock:
+            self._uses[km] = 0
+
+        return km
+
+    async def _async_run(self, km, code):
+        """Execute code in the kernel, raises RuntimeError if it fails"""
+        # only the shell channel is needed to get the reply, starting the
+        # others (and waiting for them to connect) is much slower
+        kc = km.client()
+        kc.start_channels(iopub=False, stdin=False, hb=False, control=False)
+
+        try:
+            msg_id = kc.execute(code, silent=True, store_history=False)
+
+            while True:
+                try:
+                    reply = await kc.get_shell_msg(timeout=self._startup_timeout)
+                except Empty:
+                    raise TimeoutError("Timed out waiting for the kernel") from None
+
+                if reply["parent_header"].get("msg_id") == msg_id:
+                    break
+        finally:
+            kc.stop_channels()
+
+        if reply["content"]["status"] != "ok":
+            raise RuntimeError(
+                f"Failed to execute code in kernel: {reply['content'].get('evalue')}"
+            )
+
+    async def _async_shutdown(self, km):
+        with self._lock:
+            self._uses.pop(km, None)
+
+        try:
+            await km.shutdown_kernel(now=True)
+        except RuntimeError:
+            # the kernel is already dead
+            await km.cleanup_resources()
+
+    async def async_acquire(self, cwd=None):
+        """Get a kernel manager from the pool (async version of ``acquire``)"""
+        with self._lock:
+            km = self._idle.pop() if self._idle else None
+
+        if km is not None and not await km.is_alive():
+            await self._async_shutdown(km)
+            km = None
+
+        if km is None:
+            km = await self._async_start_kernel()
+
+        if cwd is not None:
+            await self._async_run(km, f"import os; os.chdir({str(cwd)!r})")
+
+        with self._lock:
+            self._uses[km] += 1
+
+        return km
+
+    def acquire(self, cwd=None):
+        """Get a kernel manager (``jupyter_client.AsyncKernelManager``) from
+        the pool. If ``cwd`` is not None, change the kernel's working directory
+        """
+        return self._run_sync(self.async_acquire)(cwd=cwd)
+
+    async def async_release(self, km):
+        """Reset a kernel and return it to the pool (async version of
+        ``release``)
+        """
+        if await km.is_alive() and not self._should_recycle(km):
+            try:
+                await self._async_run(km, _KERNEL_RESET.format(cwd=self._cwd))
+            except (RuntimeError, TimeoutError):
+                pass
+            else:
+                with self._lock:
+                    if len(self._idle) + self._starting < self._size:
+                        self._idle.append(km)
+                        return
+
+                # the pool is full, discard the kernel
+                await self._async_shutdown(km)
+                return
+
+        await self._async_shutdown(km)
+
+        # only start a replacement if the pool has room for it
+        with self._lock:
+            if len(self._idle) + self._starting >= self._size:
+                return
+
+            self._starting += 1
+
+        try:
+            km = await self._async_start_kernel()
+        finally:
+            with self._lock:
+                self._starting -= 1
+
+        with self._lock:
+            self._idle.append(km)
+
+    def release(self, km):
+        """Reset a kernel and return it to the pool"""
+        self._run_sync(self.async_release)(km)
+
+    @contextlib.contextmanager
+    def kernel(self, cwd=None):
+        """Context manager that acquires a kernel and releases it on exit"""
+        km = self.acquire(cwd=cwd)
+
+        try:
+            yield km
+        finally:
+            self.release(km)
+
+    def _should_recycle(self, km):
+        with self._lock:
+            uses = self._uses[km]
+
+        if self._max_uses is not None and uses >= self._max_uses:
+            return True
+
+        if self._max_rss is not None:
+            return _kernel_rss(km) > self._max_rss * 1048576
+
+        return False
+
+    async def _async_close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+
+        await asyncio.gather(*(self._async_shutdown(km) for km in idle))
+
+    def close(self):
+        """Shut down all idle kernels"""
+        self._run_sync(self._async_close)()
+
+
+@requires(["psutil"], name="KernelPool(max_rss=...)")
+def _check_psutil():
+    pass
+
+
+def _kernel_rss(km):
+    import psutil
+
+    try:
+        return psutil.Process(km.provisioner.pid).memory_info().rss
+    except (psutil.Error, AttributeError, TypeError):
+        # the kernel is dead or it's not a local process
+        return 0
@@ -8,19 +8,12 @@ from ploomber_core.dependencies import requires
 from ploomber_engine.ipython import PloomberClient
 from ploomber_engine._util import recursive_update
 
-
 try:
     import psutil
 except ModuleNotFoundError:
     psutil = None
 
 
-try:
-    import matplotlib.pyplot as plt
-except ModuleNotFoundError:
-    plt = None
-
-
 class PloomberMemoryProfilerClient(PloomberClient):
     @requires(["psutil"], name="PloomberMemoryProfilerClient")
     def __init__(self, *args, **kwargs):
@@ -72,6 +65,10 @@ def plot_memory_usage(nb):
     """
     code_cells = [cell for cell in nb.cells if cell.cell_type == "code"]
     mem = [cell.metadata["ploomber"]["memory_usage"] for cell in code_cells]
+
+    # imported here since importing matplotlib is slow
+    import matplotlib.pyplot as plt
+
     _, ax = plt.subplots()
 
     ax.plot(range(1, len(mem) + 1), mem, marker="o")
@@ -104,6 +101,8 @@ def plot_cell_runtime(nb):
     cell_runtime = [_compute_runtime(c) for c in code_cells]
     cell_indexes = list(range(1, len(cell_runtime) + 1))
 
+    import matplotlib.pyplot as plt
+
     _, ax = plt.subplots()
     ax.plot(cell_indexes, cell_runtime, marker="o")
     ax.set_xticks(cell_indexes)
@@ -0,0 +1,278 @@
+"""
+Store large outputs in files next to the output notebook
+"""
+
+import re
+import os
+import json
+import base64
+import hashlib
+import tempfile
+import mimetypes
+from pathlib import Path
+
+import nbformat
+
+from ploomber_engine._util import sibling_with_suffix, chmod_like
+
+# stream outputs have no metadata, so the reference is stored in the text
+_STREAM_STUB = "[output stored in {path}]\n"
+_STREAM_STUB_PATTERN = re.compile(r"\[output stored in (.+)\]\n")
+
+# extensions for common types that mimetypes does not know about
+_EXTENSIONS = {
+    "text/plain": ".txt",
+    "text/markdown": ".md",
+    "image/svg+xml": ".svg",
+    "application/json": ".json",
+}
+
+
+def spill_outputs(nb, directory, max_size, root=None):
+    """Store outputs larger than ``max_size`` in ``directory`` and replace
+    them with a reference. Files are named after their content's hash, so
+    identical outputs are stored once
+
+    Parameters
+    ----------
+    nb : NotebookNode
+        Notebook object, modified in place
+
+    directory : str or Path
+        Directory to store the outputs
+
+    max_size : int or dict
+        Maximum size (in characters, as stored in the notebook) of each
+        output. If a dict, it maps MIME types to their maximum size; MIME types
+        not in it are never stored in files. Stream outputs (e.g., printed
+        text) use the ``text/plain`` limit
+
+    root : str or Path, default=None
+        Directory where the notebook is stored. References are relative to it
+        so the notebook and ``directory`` can be moved together. Defaults to
+        the current working directory
+
+    Returns
+    -------
+    nb : NotebookNode
+        The notebook
+
+    Notes
+    -----
+    Spilled outputs from ``display_data`` and ``execute_result`` outputs are
+    removed from the output's data and listed in its
+    ``metadata["ploomber"]["spilled"]``; stream outputs are replaced by
+    ``[output stored in {path}]``. Images are stored decoded, so they can be
+    opened directly. Use ``inline_outputs`` to restore them.
+
+    .. versionadded:: 0.0.34
+
+    Examples
+    --------
+    >>> from ploomber_engine.spill import spill_outputs, inline_outputs
+    >>> import nbformat
+    >>> nb = nbformat.v4.new_notebook()
+    >>> cell = nbformat.v4.new_code_cell("print('x' * 1000)")
+    >>> cell.outputs = [nbformat.v4.new_output("stream", name="stdout",
+    ...                                        text="x" * 1000 + "\\n")]
+    >>> nb.cells = [cell]
+    >>> nb = spill_outputs(nb, "outputs", max_size=100)
+    >>> nb.cells[0].outputs[0]["text"] # doctest: +ELLIPSIS
+    '[output stored in outputs/....txt]\\n'
+    >>> nb = inline_outputs(nb)
+    >>> len(nb.cells[0].outputs[0]["text"])
+    1001
+    """
+    directory = Path(directory)
+    root = Path(root or ".")
+
+    for cell in nb.cells:
+        _spill_cell(cell, directory, max_size, root)
+
+    return nb
+
+
+def inline_outputs(nb, root=None, directory=None):
+    """Restore the outputs stored in files by ``spill_outputs``
+
+    Parameters
+    ----------
+    nb : NotebookNode, str or Path
+        Notebook object (modified in place) or path to a notebook
+
+    root : str or Path, default=None
+        Directory references are relative to. Defaults to the notebook's
+        directory if ``nb`` is a path, otherwise the current working directory
+
+    directory : str or Path, default=None
+        Directory where the outputs are stored, references to files outside
+        of it raise an error. Defaults to ``{notebook name}-outputs`` next to
+        the notebook (where ``execute_notebook`` stores them) if ``nb`` is a
+        path, otherwise ``root``
+
+    Returns
+    -------
+    nb : NotebookNode
+        The notebook with the outputs restored
+
+    Raises
+    ------
+    ValueError
+        If a reference points to a file outside ``directory`` or the file's
+        content does not match the hash in its name
+
+    Notes
+    -----
+    .. versionadded:: 0.0.34
+    """
+    if isinstance(nb, (str, Path)):
+        root = root or Path(nb).parent
+        directory = directory or sibling_with_suffix(nb, "-outputs")
+        nb = nbformat.read(nb, as_version=nbformat.NO_CONVERT)
+
+    root = Path(root or ".")
+    directory = Path(directory or root).resolve()
+
+    for cell in nb.cells:
+        if cell.cell_type == "code":
+            for output in cell.get("outputs", []):
+                _inline_output(output, root, directory)
+
+    return nb
+
+
+def _spill_cell(cell, directory, max_size, root):
+    if cell.cell_type == "code":
+        for output in cell.get("outputs", []):
+            _spill_output(output, directory, max_size, root)
+
+
+def _limit_for(max_size, mime_type):
+    if isinstance(max_size, dict):
+        return max_size.get(mime_type)
+
+    return max_size
+
+
+def _is_base64(mime_type):
+    return (
+        mime_type.startswith("image/") and mime_type != "image/svg+xml"
+    ) or mime_type == "application/pdf"
+
+
+def _is_json(mime_type):
+    return mime_type == "application/json" or mime_type.endswith("+json")
+
+
+def _serialize(value, mime_type):
+    """Returns the contents stored in the notebook and the bytes to write"""
+    if _is_json(mime_type):
+        text = json.dumps(value)
+        return text, text.encode()
+
+    text = "".join(value) if isinstance(value, list) else value
+
+    if _is_base64(mime_type):
+        return text, base64.b64decode(text)
+
+    return text, text.encode()
+
+
+def _deserialize(content, mime_type):
+    if _is_json(mime_type):
+        return json.loads(content)
+
+    if _is_base64(mime_type):
+        return base64.b64encode(content).decode()
+
+    return content.decode()
+
+
+def _store(content, mime_type, directory, root):
+    """Store the content in a file named after its hash, returns the path
+    relative to root
+    """
+    extension = _EXTENSIONS.get(mime_type) or mimetypes.guess_extension(mime_type)
+    name = hashlib.sha256(content).hexdigest() + (extension or "")
+    path = directory / name
+
+    if not path.exists():
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+
+        chmod_like(tmp, path)
+        os.replace(tmp, path)
+
+    return Path(os.path.relpath(path, root)).as_posix()
+
+
+def _spill_output(output, directory, max_size, root):
+    if output["output_type"] == "stream":
+        limit = _limit_for(max_size, "text/plain")
+        text, content = _serialize(output["text"], "text/plain")
+
+        if limit is not None and len(text) > limit:
+            path = _store(content, "text/plain", directory, root)
+            output["text"] = _STREAM_STUB.format(path=path)
+
+    elif output["output_type"] in {"display_data", "execute_result"}:
+        spilled = {}
+
+        for mime_type, value in list(output["data"].items()):
+            limit = _limit_for(max_size, mime_type)
+            text, content = _serialize(value, mime_type)
+
+            if limit is not None and len(text) > limit:
+                spilled[mime_type] = _store(content, mime_type, directory, root)
+                del output["data"][mime_type]
+
+        if spilled:
+            ploomber = output.setdefault("metadata", {}).setdefault("ploomber", {})
+            ploomber.setdefault("spilled", {}).update(spilled)
+
+
+def _read_stored(path, root, directory):
+    """Read a file stored by ``_store``, the reference comes from the notebook
+    so it must point to a file in ``directory`` whose content matches its hash
+    """
+    resolved = Path(root, path).resolve()
+
+    if directory not in resolved.parents:
+        raise ValueError(
+            f"Cannot inline output from {path!r}: "
+            f"the file is not in the outputs directory ({str(directory)!r})"
+        )
+
+    content = resolved.read_bytes()
+    digest = resolved.name.split(".")[0]
+
+    if hashlib.sha256(content).hexdigest() != digest:
+        raise ValueError(
+            f"Cannot inline output from {path!r}: "
+            "the file content does not match its hash"
+        )
+
+    return content
+
+
+def _inline_output(output, root, directory):
+    if output["output_type"] == "stream":
+        match = _STREAM_STUB_PATTERN.fullmatch(output["text"])
+
+        if match:
+            content = _read_stored(match.group(1), root, directory)
+            output["text"] = _deserialize(content, "text/plain")
+
+    elif output["output_type"] in {"display_data", "execute_result"}:
+        ploomber = output.get("metadata", {}).get("ploomber", {})
+        spilled = ploomber.pop("spilled", {})
+
+        for mime_type, path in spilled.items():
+            content = _read_stored(path, root, directory)
+            output["data"][mime_type] = _deserialize(content, mime_type)
+
+        if not ploomber and "ploomber" in output.get("metadata", {}):
+            del output["metadata"]["ploomber"]
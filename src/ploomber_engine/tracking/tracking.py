@@ -114,9 +114,6 @@ class PloomberLogger(PloomberClient):
             self._execute(tracker, uuid_, parameters)
 
         if original is not None:
-            # restore original instance
-            InteractiveShell._instance = original
-
             # restore inline matplotlib
             try:
                 from matplotlib_inline.backend_inline import configure_inline_support
@@ -0,0 +1,453 @@
+"""
+Execute notebooks in a persistent child process, so crashes (e.g., a segfault
+in a C extension) do not take down the caller
+"""
+
+import os
+import sys
+import threading
+import importlib
+import contextlib
+import multiprocessing
+
+import nbformat
+from tqdm import tqdm
+
+from ploomber_engine.ipython import PloomberClient
+from ploomber_engine.pool import ShellPool
+from ploomber_engine._fork import _picklable_exception, _RemoteTraceback
+from ploomber_engine._context import redirect_std
+
+
+class WorkerCrashedError(ChildProcessError):
+    """Raised when the worker process dies while executing a notebook
+
+    Attributes
+    ----------
+    nb : NotebookNode
+        The partially executed notebook: it contains the outputs of the cells
+        that finished before the crash, and the last cell that started
+        executing has an error output
+
+    exitcode : int
+        Exit code of the worker process (negative if killed by a signal)
+
+    cell_index : int or None
+        Index of the last cell that started executing (None if the worker died
+        before executing any cell)
+    """
+
+    def __init__(self, message, nb=None, exitcode=None, cell_index=None):
+        super().__init__(message)
+        self.nb = nb
+        self.exitcode = exitcode
+        self.cell_index = cell_index
+
+
+class _ForwardStream:
+    """Writes to a stream and sends the text to the parent process"""
+
+    def __init__(self, stream, name, send):
+        self._stream = stream
+        self._name = name
+        self._send = send
+
+    def write(self, s):
+        if s:
+            self._send(nbformat.v4.new_output("stream", name=self._name, text=s))
+
+        return self._stream.write(s)
+
+    def flush(self):
+        self._stream.flush()
+
+    def __getattr__(self, key):
+        return getattr(self._stream, key)
+
+
+class _ForwardOutputs(list):
+    """Replaces the shell's ``_current_output`` to send the outputs displayed
+    by a cell to the parent process
+    """
+
+    def __init__(self, send):
+        super().__init__()
+        self._send = send
+
+    def append(self, item):
+        super().append(item)
+        self._send(item)
+
+
+class _StreamingClient(PloomberClient):
+    """A client that sends outputs to the parent process as they are produced,
+    and each cell once it executes
+    """
+
+    def __init__(self, nb, conn, **kwargs):
+        super().__init__(nb, **kwargs)
+        self._conn = conn
+        self._indexes = None
+        self._index = None
+        # threads started by a cell may display outputs
+        self._send_lock = threading.Lock()
+
+    def _send(self, message):
+        with self._send_lock:
+            self._conn.send(message)
+
+    def _send_output(self, output):
+        self._send(("output", self._index, output))
+
+    @contextlib.contextmanager
+    def _capture_std(self):
+        with super()._capture_std() as (stdout, stderr):
+            forward = (
+                _ForwardStream(stdout, "stdout", self._send_output),
+                _ForwardStream(stderr, "stderr", self._send_output),
+            )
+
+            with redirect_std(*forward):
+                yield stdout, stderr
+
+    def _execute(self):
+        # send the notebook after injecting parameters and debugging cells,
+        # so indexes match in both processes
+        self._indexes = {id(cell): i for i, cell in enumerate(self._nb.cells)}
+        self._send(("notebook", self._nb))
+        return super()._execute()
+
+    def execute_cell(self, cell, cell_index, execution_count, store_history):
+        self._index = self._indexes[id(cell)]
+        self._send(("cell_started", self._index))
+        current_output = self._shell._current_output
+        self._shell._current_output = _ForwardOutputs(self._send_output)
+
+        try:
+            return super().execute_cell(
+                cell,
+                cell_index=cell_index,
+                execution_count=execution_count,
+                store_history=store_history,
+            )
+        finally:
+            self._shell._current_output = current_output
+            # the outputs sent while executing are replaced by the cell's
+            # final outputs (e.g., with the error and execution count)
+            self._send(("cell_executed", self._index, cell))
+
+
+def _execute(conn, shell_pool, nb, kwargs):
+    client = _StreamingClient(
+        nb, conn=conn, shell_pool=shell_pool, progress_bar=False, **kwargs
+    )
+
+    try:
+        out = client.execute()
+    except Exception as e:
+        conn.send(("error", _picklable_exception(e), client._nb))
+    except BaseException as e:
+        # the notebook called sys.exit() (or similar), exit like a regular
+        # process would
+        sys.stdout.flush()
+        sys.stderr.flush()
+        code = e.code if isinstance(e, SystemExit) else 1
+        os._exit(code if isinstance(code, int) else 1)
+    else:
+        conn.send(("done", out))
+
+
+def _serve(conn, preload, setup):
+    try:
+        for name in preload:
+            importlib.import_module(name)
+
+        shell_pool = ShellPool(size=1, setup=setup)
+    except Exception as e:
+        error = RuntimeError(f"Failed to start worker: {e!r}")
+        conn.send(("error", (error, None), None))
+        return
+
+    conn.send(("ready",))
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+
+        if message is None:
+            break
+
+        nb, kwargs = message
+        _execute(conn, shell_pool, nb, kwargs)
+
+
+def _append_output(outputs, output):
+    """Append an output, merging consecutive text printed to the same stream"""
+    if (
+        outputs
+        and output["output_type"] == "stream"
+        and outputs[-1]["output_type"] == "stream"
+        and outputs[-1]["name"] == output["name"]
+    ):
+        outputs[-1]["text"] += output["text"]
+    else:
+        outputs.append(output)
+
+
+def _replace(nb, new):
+    """Replace the contents of a notebook with the ones received"""
+    nb.clear()
+    nb.update(nbformat.from_dict(new))
+
+
+class Worker:
+    """
+    Executes notebooks with ``PloomberClient`` in a persistent child process.
+    Outputs (printed text and displayed objects) are sent back as they are
+    produced, and if the process dies (e.g., a segfault or ``sys.exit()`` in a
+    cell), ``WorkerCrashedError`` is raised with the partially executed
+    notebook and a new process is started for the next execution
+
+    Parameters
+    ----------
+    preload : list, default=None
+        Modules to import in the worker process (e.g., ``["pandas"]``)
+
+    setup : str, default=None
+        Code to execute in the worker's shell, variables defined here are
+        available to every notebook
+
+    Notes
+    -----
+    The worker is started with the ``spawn`` method, so it does not inherit
+    the caller's state (e.g., threads or open connections). Starting it takes
+    about as long as importing IPython, which is paid once per worker (and
+    after each crash). Notebooks are executed one at a time; start more
+    workers to execute notebooks in parallel.
+
+    .. versionadded:: 0.0.34
+
+    Examples
+    --------
+    >>> from ploomber_engine.worker import Worker
+    >>> import nbformat
+    >>> nb = nbformat.v4.new_notebook()
+    >>> nb.cells = [nbformat.v4.new_code_cell("1 + 1")]
+    >>> with Worker() as worker:
+    ...     out = worker.execute(nb, progress_bar=False)
+    >>> out.cells[0]['outputs'][0]['data']
+    {'text/plain': '2'}
+    """
+
+    def __init__(self, preload=None, setup=None):
+        self._preload = list(preload or [])
+        self._setup = setup
+        self._process = None
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"{type(self).__name__}(preload={self._preload!r})"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @property
+    def pid(self):
+        """Process ID of the worker (None if it is not running)"""
+        return None if self._process is None else self._process.pid
+
+    def start(self):
+        """Start the worker process and wait until it is ready"""
+        if self._process is not None:
+            raise RuntimeError("The worker is already running")
+
+        ctx = multiprocessing.get_context("spawn")
+        self._conn, child_conn = ctx.Pipe()
+        self._process = ctx.Process(
+            target=_serve,
+            args=(child_conn, self._preload, self._setup),
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+
+        try:
+            message = self._conn.recv()
+        except EOFError:
+            exitcode = self._kill()
+            raise WorkerCrashedError(
+                f"Worker process exited while starting (exit code: {exitcode})",
+                exitcode=exitcode,
+            ) from None
+
+        if message[0] == "error":
+            self.stop()
+            raise message[1][0]
+
+    def stop(self):
+        """Stop the worker process"""
+        if self._process is None:
+            return
+
+        try:
+            self._conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+
+        self._process.join(timeout=5)
+
+        if self._process.is_alive():
+            self._process.kill()
+            self._process.join()
+
+        self._close()
+
+    def _kill(self):
+        """Kill the worker process (if alive), returns its exit code"""
+        self._process.kill()
+        self._process.join()
+        exitcode = self._process.exitcode
+        self._close()
+        return exitcode
+
+    def _close(self):
+        self._conn.close()
+        self._process = None
+        self._conn = None
+
+    def execute(
+        self, nb, on_cell_executed=None, on_output=None, progress_bar=True, **kwargs
+    ):
+        """Execute a notebook in the worker process
+
+        Parameters
+        ----------
+        nb : NotebookNode
+            Notebook object
+
+        on_cell_executed : callable, default=None
+            Called with the index of the cell and the cell (with its outputs)
+            as soon as each cell finishes executing
+
+        on_output : callable, default=None
+            Called with the index of the cell and the output (e.g., text
+            printed by the cell) as soon as the cell produces it. Outputs are
+            also added to the cell while it executes, and replaced with its
+            final outputs once it finishes
+
+        progress_bar : bool, default=True
+            Display a progress bar
+
+        **kwargs
+            Any other ``PloomberClient`` arguments (except ``shell_pool``)
+
+        Returns
+        -------
+        nb : NotebookNode
+            Executed notebook object. Like ``PloomberClient``, the passed
+            notebook is modified in place, so it contains the outputs of the
+            executed cells even if the execution fails
+
+        Raises
+        ------
+        WorkerCrashedError
+            If the worker process dies while executing the notebook
+        """
+        with self._lock:
+            if self._process is None:
+                self.start()
+
+            self._conn.send((nb, kwargs))
+
+            try:
+                return self._receive(nb, on_cell_executed, on_output, progress_bar)
+            except WorkerCrashedError:
+                raise
+            except BaseException:
+                # the worker keeps executing the notebook, discard it
+                self._kill()
+                raise
+
+    def _receive(self, nb, on_cell_executed, on_output, progress_bar):
+        started, cell_index, bar = False, None, None
+
+        try:
+            while True:
+                try:
+                    message = self._conn.recv()
+                except EOFError:
+                    raise self._crashed(nb if started else None, cell_index) from None
+
+                kind = message[0]
+
+                if kind == "notebook":
+                    _replace(nb, message[1])
+                    started = True
+
+                    if progress_bar:
+                        code_cells = [c for c in nb.cells if c.cell_type == "code"]
+                        bar = tqdm(total=len(code_cells))
+
+                elif kind == "cell_started":
+                    cell_index = message[1]
+
+                    if bar is not None:
+                        bar.set_description(f"Executing cell: {bar.n + 1}")
+
+                elif kind == "output":
+                    _, index, output = message
+                    # a copy, since stream outputs are merged in the cell
+                    _append_output(nb.cells[index].outputs, nbformat.from_dict(output))
+
+                    if on_output is not None:
+                        on_output(index, nbformat.from_dict(output))
+
+                elif kind == "cell_executed":
+                    _, index, cell = message
+                    nb.cells[index] = nbformat.from_dict(cell)
+
+                    if bar is not None:
+                        bar.update()
+
+                    if on_cell_executed is not None:
+                        on_cell_executed(index, nb.cells[index])
+
+                elif kind == "done":
+                    _replace(nb, message[1])
+                    return nb
+
+                elif kind == "error":
+                    _, (exc, tb), executed = message
+                    _replace(nb, executed)
+                    raise exc from _RemoteTraceback(tb)
+        finally:
+            if bar is not None:
+                bar.close()
+
+    def _crashed(self, nb, cell_index):
+        exitcode = self._kill()
+        message = f"Worker process exited unexpectedly (exit code: {exitcode})"
+
+        if nb is not None and cell_index is not None:
+            cell = nb.cells[cell_index]
+            message += f" while executing cell {cell_index}"
+            # keep the outputs the cell sent before the crash
+            cell.outputs.append(
+                nbformat.v4.new_output(
+                    "error",
+                    ename=WorkerCrashedError.__name__,
+                    evalue=message,
+                    traceback=[message],
+                )
+            )
+
+        return WorkerCrashedError(
+            message, nb=nb, exitcode=exitcode, cell_index=cell_index
+        )
@@ -0,0 +1,150 @@
+"""
+Write the output notebook while it executes
+"""
+
+import os
+import copy
+import json
+import tempfile
+from time import monotonic
+from pathlib import Path
+
+import nbformat
+
+from ploomber_engine._util import sibling_with_suffix, chmod_like
+from ploomber_engine.spill import _spill_cell
+
+
+class NotebookWriter:
+    """Writes the notebook to ``path`` while it executes. Every executed cell
+    is appended to a spool file next to the output, and the output notebook
+    is atomically rewritten (so it is always a valid ``.ipynb`` file) at most
+    every ``interval`` seconds and once the execution finishes
+
+    Parameters
+    ----------
+    path : str or Path
+        Output notebook
+
+    interval : int or float, default=5
+        Minimum number of seconds between rewrites of the output notebook. If
+        0, it is rewritten after every cell
+
+    drop_outputs : bool, default=False
+        If True, remove the outputs of executed cells from the notebook object
+        once they are stored in the spool file, so they do not stay in memory.
+        The output notebook contains all outputs but the notebook returned by
+        the client does not
+
+    max_output_size : int or dict, default=None
+        If not None, outputs larger than this are stored in files in a
+        ``{notebook name}-outputs`` directory next to the output notebook as
+        soon as the cell finishes (see ``spill_outputs``)
+
+    Notes
+    -----
+    The spool file (``{notebook name}-outputs.jsonl``) contains one line per
+    executed cell and is deleted once the execution finishes.
+
+    .. versionadded:: 0.0.34
+
+    Examples
+    --------
+    >>> from ploomber_engine.ipython import PloomberClient
+    >>> from ploomber_engine.writer import NotebookWriter
+    >>> writer = NotebookWriter("out.ipynb", interval=10, drop_outputs=True)
+    >>> client = PloomberClient.from_path("nb.ipynb", writer=writer)
+    >>> out = client.execute()
+    """
+
+    def __init__(self, path, interval=5, drop_outputs=False, max_output_size=None):
+        self.path = Path(path)
+        self._max_output_size = max_output_size
+        self._interval = interval
+        self._drop_outputs = drop_outputs
+        self._spool_path = sibling_with_suffix(self.path, "-outputs.jsonl")
+        self._spool = None
+        # cells whose outputs were dropped, maps id(cell) -> (cell, offset)
+        self._dropped = {}
+        self._last_write = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}(path={str(self.path)!r})"
+
+    def start(self, nb):
+        """Write the (unexecuted) notebook and create the spool file"""
+        self._dropped = {}
+        self._spool = open(self._spool_path, "w+", encoding="utf-8")
+        self._write(nb)
+
+    def cell_executed(self, nb, cell):
+        """Store the outputs of a cell that just finished executing"""
+        if self._spool is None:
+            self.start(nb)
+
+        if self._max_output_size is not None:
+            _spill_cell(
+                cell,
+                sibling_with_suffix(self.path, "-outputs"),
+                self._max_output_size,
+                root=self.path.parent,
+            )
+
+        self._spool.seek(0, os.SEEK_END)
+        offset = self._spool.tell()
+        self._spool.write(
+            json.dumps(dict(execution_count=cell.execution_count, outputs=cell.outputs))
+            + "\n"
+        )
+        self._spool.flush()
+
+        if self._drop_outputs:
+            self._dropped[id(cell)] = (cell, offset)
+            cell.outputs = []
+
+        if monotonic() - self._last_write >= self._interval:
+            self._write(nb)
+
+    def close(self, nb):
+        """Write the final notebook and delete the spool file"""
+        if self._spool is None:
+            return
+
+        self._write(nb)
+        self._spool.close()
+        self._spool = None
+        self._dropped = {}
+        self._spool_path.unlink()
+
+    def _with_outputs(self, nb):
+        """Returns a copy of the notebook with the dropped outputs"""
+        if not self._dropped:
+            return nb
+
+        nb = copy.copy(nb)
+        nb.cells = [self._load_cell(cell) for cell in nb.cells]
+        return nb
+
+    def _load_cell(self, cell):
+        dropped = self._dropped.get(id(cell))
+
+        if dropped is None:
+            return cell
+
+        self._spool.seek(dropped[1])
+        stored = json.loads(self._spool.readline())
+        cell = copy.copy(cell)
+        cell.outputs = [nbformat.from_dict(output) for output in stored["outputs"]]
+        return cell
+
+    def _write(self, nb):
+        # write to a temporary file and rename, so the output is always a
+        # valid notebook even if the process dies while writing
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".ipynb.tmp")
+
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            nbformat.write(self._with_outputs(nb), f)
+
+        chmod_like(tmp, self.path)
+        os.replace(tmp, self.path)
+        self._last_write = monotonic()
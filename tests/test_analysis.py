@@ -0,0 +1,155 @@
+import pytest
+
+from ploomber_engine._analysis import analyze_cell, analyze_cells, find_dependencies
+
+
+@pytest.mark.parametrize(
+    "source, reads, writes, mutates",
+    [
+        ["x = 1", set(), {"x"}, set()],
+        ["y = x + 1", {"x"}, {"y"}, set()],
+        ["x += 1", {"x"}, {"x"}, set()],
+        ["del x", set(), {"x"}, set()],
+        ["import numpy as np", set(), {"np"}, set()],
+        ["import os.path", set(), {"os"}, set()],
+        ["data.append(1)", {"data"}, set(), {"data"}],
+        ["data['a'] = b", {"data", "b"}, set(), {"data"}],
+        ["obj.attr = 1", {"obj"}, set(), {"obj"}],
+        ["shuffle(data)", {"shuffle", "data"}, set(), {"data"}],
+        ["print(data)", {"print", "data"}, set(), set()],
+        ["def f(a):\n    b = a + c\n    return b", {"c"}, {"f"}, set()],
+        # functions modify globals when called, not when defined
+        ["def f():\n    global g\n    g = 1", set(), {"f"}, set()],
+        ["def f():\n    data.append(1)", {"data"}, {"f"}, set()],
+        ["f = lambda a: a + b", {"b"}, {"f"}, set()],
+        ["[i * k for i in data]", {"data", "k"}, set(), set()],
+        ["[n := i for i in data]", {"data"}, {"n"}, set()],
+        ["class A(Base):\n    z = 1\n    w = z", {"Base"}, {"A"}, set()],
+        ["for i in data:\n    total = i", {"data", "i"}, {"i", "total"}, set()],
+        [
+            "try:\n    pass\nexcept Exception as e:\n    pass",
+            {"Exception"},
+            {"e"},
+            set(),
+        ],
+    ],
+)
+def test_analyze_cell(source, reads, writes, mutates):
+    info = analyze_cell(source)
+
+    assert info.safe
+    assert info.reads == reads
+    assert info.writes == writes
+    assert info.mutates == mutates
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "%matplotlib inline",
+        "!ls",
+        "from os import *",
+        "exec('x = 1')",
+        "globals()['x'] = 1",
+        "x = (",
+    ],
+)
+def test_analyze_cell_unsafe(source):
+    assert not analyze_cell(source).safe
+
+
+def test_analyze_cells_ignores_calls_on_imported_modules():
+    first, second = analyze_cells(["import pandas as pd", "df = pd.read_csv(path)"])
+
+    assert second.reads == {"pd", "path"}
+    assert "pd" not in second.mutates
+
+
+def test_analyze_cell_definitions():
+    info = analyze_cell(
+        "import math\ndef f(x):\n    return x * factor\nclass A:\n    y = math.pi"
+    )
+
+    assert info.definitions == {"f": {"factor"}, "A": {"math"}}
+    assert info.reads == {"factor", "math"}
+
+
+def test_analyze_cell_effects():
+    info = analyze_cell(
+        "def f():\n    global g\n    g = 1\n"
+        "class A:\n    def add(self):\n        data.append(self)\n"
+        "h = lambda: items.clear()"
+    )
+
+    assert info.effects == {"f": {"g"}, "A": {"data"}}
+    assert info.deferred == {"items"}
+    assert info.writes == {"f", "A", "h"}
+    assert info.mutates == set()
+
+
+@pytest.mark.parametrize(
+    "sources, mutates",
+    [
+        [["data = []", "def add():\n    data.append(1)", "add()"], {"data"}],
+        # through other functions
+        [
+            ["def add():\n    data.append(1)", "def run():\n    add()", "run()"],
+            {"data"},
+        ],
+        # through aliases and containers
+        [["def add():\n    data.append(1)", "f = add", "f()"], {"data"}],
+        [["def add():\n    data.append(1)", "fs = [add]", "fs[0]()"], {"data"}],
+        # through instances of classes defined in the notebook
+        [
+            [
+                "class A:\n    def add(self):\n        data.append(1)",
+                "a = A()",
+                "a.add()",
+            ],
+            {"a", "data"},
+        ],
+        [["def f(x):\n    return x", "f(1)"], set()],
+    ],
+)
+def test_analyze_cells_call_effects(sources, mutates):
+    assert analyze_cells(sources)[-1].mutates == mutates
+
+
+def test_analyze_cells_unknown_call_effects():
+    infos = analyze_cells(["from m import f", "%run script.py", "f()", "g()", "g"])
+
+    assert [(info.safe, info.restorable) for info in infos] == [
+        (True, True),
+        (False, True),
+        # f is imported
+        (True, True),
+        # g may be defined by the script
+        (False, False),
+        (True, True),
+    ]
+
+
+@pytest.mark.parametrize(
+    "sources, dependencies",
+    [
+        [["a = 1", "b = 2", "c = a + b"], [set(), set(), {0, 1}]],
+        [["x = []", "x.append(1)", "y = x"], [set(), {0}, {0, 1}]],
+        # writing a variable must wait for previous cells that use it
+        [["a = 1", "b = a", "a = 2"], [set(), {0}, {0, 1}]],
+        # magics depend on (and are a dependency of) every cell
+        [["a = 1", "%time b = 2", "c = 3"], [set(), {0}, {1}]],
+        # calling a function depends on the variables it uses
+        [
+            ["k = 2", "def f():\n    return k", "k = 3", "f()"],
+            [set(), {0}, {0, 1}, {0, 1, 2}],
+        ],
+        # calling a function depends on (and is a dependency of) the variables
+        # it modifies
+        [
+            ["data = []", "def add():\n    data.append(1)", "add()", "print(data)"],
+            [set(), {0}, {0, 1}, {0, 2}],
+        ],
+    ],
+)
+def test_find_dependencies(sources, dependencies):
+    assert find_dependencies(analyze_cells(sources)) == dependencies
@@ -0,0 +1,244 @@
+import asyncio
+import threading
+from time import perf_counter
+from pathlib import Path
+
+import nbformat
+import pytest
+
+from conftest import _make_nb
+from ploomber_engine import execute_notebooks, execute_notebooks_async
+from ploomber_engine.batch import _normalize_job
+from ploomber_engine.pool import KernelPool
+
+
+def _read_outputs(path):
+    nb = nbformat.read(path, as_version=nbformat.NO_CONVERT)
+    return [c.outputs for c in nb.cells if c.cell_type == "code"]
+
+
+def test_execute_notebooks(tmp_empty):
+    _make_nb([("code", "x = 1", dict(tags=["parameters"])), "print(x)"])
+    jobs = [("nb.ipynb", f"out-{x}.ipynb", dict(x=x)) for x in range(4)]
+
+    results = list(execute_notebooks(jobs, max_workers=2))
+
+    assert len(results) == 4
+    assert all(r.success for r in results)
+
+    for x in range(4):
+        outputs = _read_outputs(f"out-{x}.ipynb")
+        assert outputs[-1][0]["text"] == f"{x}\n"
+
+
+def test_failures_do_not_stop_the_batch(tmp_empty):
+    _make_nb(["1 / 0"], path="crash.ipynb")
+    _make_nb(["1 + 1"], path="ok.ipynb")
+
+    results = {
+        r.input_path: r
+        for r in execute_notebooks(
+            [
+                dict(input_path="crash.ipynb", output_path="crash-out.ipynb"),
+                dict(input_path="ok.ipynb", output_path="ok-out.ipynb"),
+            ],
+            max_workers=1,
+        )
+    }
+
+    assert not results["crash.ipynb"].success
+    assert "ZeroDivisionError" in results["crash.ipynb"].error
+    assert results["ok.ipynb"].success
+    # partially executed notebook is stored
+    assert _read_outputs("crash-out.ipynb")[0][0]["ename"] == "ZeroDivisionError"
+
+
+def test_worker_crash_only_fails_its_job(tmp_empty):
+    _make_nb(["import os", "os._exit(1)"], path="crash.ipynb")
+    _make_nb(["1 + 1"], path="ok.ipynb")
+    jobs = [("ok.ipynb", f"ok-{i}.ipynb") for i in range(4)]
+    jobs.insert(1, ("crash.ipynb", "crash-out.ipynb"))
+
+    results = list(execute_notebooks(jobs, max_workers=2))
+
+    assert len(results) == 5
+    failed = [r for r in results if not r.success]
+    assert [r.input_path for r in failed] == ["crash.ipynb"]
+    assert "BrokenProcessPool" in failed[0].error
+
+
+def test_stop_iterating_early(tmp_empty):
+    _make_nb(["import time", "time.sleep(0.5)"])
+    jobs = [("nb.ipynb", f"out-{i}.ipynb") for i in range(8)]
+
+    results = execute_notebooks(jobs, max_workers=1)
+    next(results)
+    results.close()
+
+    # the pending jobs are cancelled
+    assert len(list(Path(".").glob("out-*.ipynb"))) < 8
+
+
+@pytest.mark.parametrize(
+    "job, expected",
+    [
+        [("in.ipynb", "out.ipynb"), ("in.ipynb", "out.ipynb", None)],
+        [("in.ipynb", "out.ipynb", dict(a=1)), ("in.ipynb", "out.ipynb", dict(a=1))],
+        [dict(input_path="in.ipynb"), ("in.ipynb", None, None)],
+    ],
+)
+def test_normalize_job(job, expected):
+    assert _normalize_job(job) == expected
+
+
+@pytest.mark.parametrize("job", [("in.ipynb",), dict(input_path="a", other=1)])
+def test_normalize_job_error(job):
+    with pytest.raises(ValueError):
+        _normalize_job(job)
+
+
+def _interval(path):
+    data = _read_outputs(path)[-1][0]["data"]["text/plain"]
+    return eval(data)
+
+
+async def _collect(batch):
+    return [result async for result in batch]
+
+
+@pytest.mark.parametrize("max_concurrency, expected", [[None, 3], [2, 2]])
+def test_execute_notebooks_async(tmp_empty, max_concurrency, expected):
+    _make_nb(
+        [
+            ("code", "x = 1", dict(tags=["parameters"])),
+            "import time\nstart = time.time()\ntime.sleep(1)\nx, start, time.time()",
+        ]
+    )
+    jobs = [("nb.ipynb", f"out-{x}.ipynb", dict(x=x)) for x in range(3)]
+
+    async def main():
+        return await execute_notebooks_async(jobs, max_concurrency=max_concurrency)
+
+    results = asyncio.run(main())
+
+    assert sorted(r.output_path for r in results) == [j[1] for j in jobs]
+    assert all(r.success for r in results)
+
+    intervals = [_interval(f"out-{x}.ipynb") for x in range(3)]
+    assert [x for x, _, _ in intervals] == [0, 1, 2]
+
+    # maximum number of notebooks running at the same time
+    running = max(
+        sum(start <= t < end for _, start, end in intervals) for _, t, _ in intervals
+    )
+    assert running == expected
+
+
+def test_execute_notebooks_async_streams_results(tmp_empty):
+    _make_nb(["import time; time.sleep(2)"], path="slow.ipynb")
+    _make_nb(["1 + 1"], path="fast.ipynb")
+    _make_nb(["1 / 0"], path="crash.ipynb")
+    jobs = [
+        ("slow.ipynb", "slow-out.ipynb"),
+        ("fast.ipynb", "fast-out.ipynb"),
+        ("crash.ipynb", "crash-out.ipynb"),
+    ]
+
+    results = asyncio.run(_collect(execute_notebooks_async(jobs)))
+
+    assert results[-1].input_path == "slow.ipynb"
+    assert results[-1].success
+
+    by_path = {r.input_path: r for r in results}
+    assert by_path["fast.ipynb"].success
+    assert not by_path["crash.ipynb"].success
+    assert "ZeroDivisionError" in by_path["crash.ipynb"].error
+    # partially executed notebook is stored
+    assert _read_outputs("crash-out.ipynb")[0][0]["ename"] == "ZeroDivisionError"
+
+
+def test_execute_notebooks_async_cancel(tmp_empty):
+    _make_nb(["print('started', flush=True)", "import time; time.sleep(60)"])
+    _make_nb(["1 + 1"], path="fast.ipynb")
+    jobs = [
+        ("nb.ipynb", "out.ipynb"),
+        ("fast.ipynb", "fast-out.ipynb"),
+        ("nb.ipynb", "never-started.ipynb"),
+    ]
+
+    async def main():
+        batch = execute_notebooks_async(jobs)
+        batch.cancel(2)
+        results = []
+
+        async for result in batch:
+            results.append(result)
+
+            # the first notebook is waiting in its second cell
+            if result.input_path == "fast.ipynb":
+                batch.cancel(0)
+
+        return results
+
+    start = perf_counter()
+    results = asyncio.run(main())
+
+    assert perf_counter() - start < 30
+    assert [(r.input_path, r.error) for r in results] == [
+        ("nb.ipynb", "Cancelled"),
+        ("fast.ipynb", None),
+        ("nb.ipynb", "Cancelled"),
+    ]
+    assert _read_outputs("out.ipynb")[0][0]["text"] == "started\n"
+
+
+def test_execute_notebooks_async_kernel_pool(tmp_empty):
+    _make_nb(
+        [
+            ("code", "x = 1", dict(tags=["parameters"])),
+            "import os\nos.getpid(), x",
+        ]
+    )
+    jobs = [("nb.ipynb", f"out-{x}.ipynb", dict(x=x)) for x in range(4)]
+
+    async def main():
+        with KernelPool(size=2) as pool:
+            return await execute_notebooks_async(
+                jobs, max_concurrency=2, kernel_pool=pool
+            )
+
+    results = asyncio.run(main())
+
+    assert all(r.success for r in results)
+    values = [_interval(f"out-{x}.ipynb") for x in range(4)]
+    assert [x for _, x in values] == [0, 1, 2, 3]
+    assert len({pid for pid, _ in values}) == 2
+
+
+def test_execute_notebooks_async_reads_and_writes_in_threads(tmp_empty, monkeypatch):
+    _make_nb(["1 + 1"])
+    threads = []
+
+    def record(function):
+        def wrapper(*args, **kwargs):
+            threads.append(threading.get_ident())
+            return function(*args, **kwargs)
+
+        return wrapper
+
+    monkeypatch.setattr(nbformat, "read", record(nbformat.read))
+    monkeypatch.setattr(nbformat, "write", record(nbformat.write))
+
+    async def main():
+        await execute_notebooks_async([("nb.ipynb", "out.ipynb")])
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(main())
+
+    assert len(threads) == 2
+    assert loop_thread not in threads
+
+
+def test_execute_notebooks_async_invalid_concurrency():
+    with pytest.raises(ValueError, match="max_concurrency must be at least 1"):
+        execute_notebooks_async([("nb.ipynb", "out.ipynb")], max_concurrency=0)
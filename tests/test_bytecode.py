@@ -0,0 +1,138 @@
+from pathlib import Path
+
+import pytest
+
+from conftest import _make_nb
+from ploomber_engine import execute_notebook
+from ploomber_engine.bytecode import BytecodeCache
+from ploomber_engine.ipython import PloomberClient
+
+
+def _execute(cells, cache, **kwargs):
+    nb = _make_nb(cells, path=None)
+    return PloomberClient(nb, progress_bar=False, bytecode_cache=cache).execute(
+        **kwargs
+    )
+
+
+def _outputs(nb):
+    return [(cell.execution_count, cell.outputs) for cell in nb.cells]
+
+
+@pytest.mark.parametrize(
+    "cells",
+    [
+        ["x = 1", "y = x + 1", "print(y)", "y"],
+        ["%%capture\nprint('hidden')", "!echo hi", "%time z = 1", "z"],
+        ["def add(a, b):\n    return a + b", "add(1, 2)"],
+        ["from __future__ import annotations", "def f(x: Undefined): pass", "1"],
+    ],
+)
+def test_cached_execution_matches(tmp_empty, cells):
+    cache = BytecodeCache("cache")
+
+    first = _execute(cells, cache)
+    second = _execute(cells, cache)
+
+    assert cache.misses == len(cells)
+    assert cache.hits == len(cells)
+
+    if any(cell.startswith("%time") for cell in cells):
+        for nb in (first, second):
+            nb.cells[2].outputs = []
+
+    assert _outputs(first) == _outputs(second)
+
+
+def test_traceback_points_to_current_cell(tmp_empty):
+    cells = ["x = 1", "def f():\n    raise ValueError('boom')", "f()"]
+    cache = BytecodeCache("cache")
+    nbs = []
+
+    for _ in range(2):
+        nb = _make_nb(cells, path=None)
+        client = PloomberClient(nb, progress_bar=False, bytecode_cache=cache)
+
+        with pytest.raises(ValueError):
+            client.execute()
+
+        nbs.append(client._nb)
+
+    tracebacks = ["\n".join(nb.cells[4].outputs[-1]["traceback"]) for nb in nbs]
+    assert tracebacks[0] == tracebacks[1]
+    # the source of the function is displayed
+    assert "ValueError" in tracebacks[1] and "raise" in tracebacks[1]
+    assert cache.hits == 2
+
+    # failed cells are not cached
+    assert cache.misses == 4
+
+
+def test_changing_the_source_is_a_miss(tmp_empty):
+    cache = BytecodeCache("cache")
+    _execute(["x = 1", "x"], cache)
+
+    nb = _execute(["x = 1", "x + 1"], cache)
+
+    assert (cache.hits, cache.misses) == (1, 3)
+    assert nb.cells[1].outputs[0]["data"] == {"text/plain": "2"}
+
+
+def test_ignores_corrupted_entries(tmp_empty):
+    cache = BytecodeCache("cache")
+    _execute(["x = 1"], cache)
+
+    for path in Path("cache").iterdir():
+        path.write_bytes(b"not marshal data")
+
+    _execute(["x = 1"], cache)
+
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_from_path_stores_cache_next_to_notebook(tmp_empty):
+    Path("sub").mkdir()
+    _make_nb(["x = 1"], path="sub/nb.ipynb")
+
+    client = PloomberClient.from_path(
+        "sub/nb.ipynb", bytecode_cache=True, progress_bar=False
+    )
+    client.execute()
+
+    assert client.bytecode_cache.misses == 1
+    assert len(list(Path("sub", "__ploomber_cache__", "bytecode").iterdir())) == 1
+
+
+def test_client_bytecode_cache_true_requires_path():
+    nb = _make_nb(["x = 1"], path=None)
+
+    with pytest.raises(ValueError, match="use PloomberClient.from_path"):
+        PloomberClient(nb, bytecode_cache=True)
+
+
+@pytest.mark.parametrize("bytecode_cache", [None, False])
+def test_client_without_bytecode_cache(tmp_empty, bytecode_cache):
+    _make_nb(["x = 1"])
+
+    client = PloomberClient.from_path("nb.ipynb", bytecode_cache=bytecode_cache)
+
+    assert client.bytecode_cache is None
+    assert (
+        PloomberClient(client._nb, bytecode_cache=bytecode_cache).bytecode_cache is None
+    )
+
+
+def test_execute_notebook_bytecode_cache(tmp_empty):
+    _make_nb(["x = 1", "x"])
+
+    execute_notebook("nb.ipynb", "out.ipynb", bytecode_cache=True)
+    out = execute_notebook("nb.ipynb", "out.ipynb", bytecode_cache=True)
+
+    assert out.cells[1].outputs[0]["data"] == {"text/plain": "1"}
+
+
+def test_execute_notebook_bytecode_cache_requires_path(tmp_empty):
+    nb = _make_nb(["x = 1"], path=None)
+
+    with pytest.raises(ValueError, match="bytecode_cache=True requires"):
+        execute_notebook(nb, None, bytecode_cache=True)
@@ -0,0 +1,139 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from conftest import _make_nb, _read_nb
+from ploomber_engine import execute_notebook
+from ploomber_engine.checkpoint import CheckpointClient
+
+
+def _execute(cells, **kwargs):
+    nb = _make_nb(cells, path=None)
+    client = CheckpointClient(
+        nb, checkpoint_dir="checkpoint", progress_bar=False, **kwargs
+    )
+    return client.execute()
+
+
+def test_resumes_from_last_checkpoint(tmp_empty):
+    cells = [
+        "with open('log.txt', 'a') as f: f.write('a')\ndel f",
+        "x = 1",
+        "with open('log.txt', 'a') as f: f.write('b')\ndel f",
+        "y = x + 1",
+        "raise ValueError('boom')",
+        "print(x, y)",
+    ]
+
+    with pytest.raises(ValueError):
+        _execute(cells, every=2)
+
+    cells[4] = "z = y + 1"
+    nb = _execute(cells, every=2, resume=True)
+
+    # the first four cells are not executed again
+    assert Path("log.txt").read_text() == "ab"
+    assert nb.cells[5].outputs[0]["text"] == "1 2\n"
+    assert [c.execution_count for c in nb.cells] == [1, 2, 3, 4, 5, 6]
+    # the checkpoint is deleted after finishing
+    assert not Path("checkpoint").exists()
+
+
+def test_execute_async_resumes(tmp_empty):
+    cells = ["x = 1", "raise ValueError('boom')", "print(x)"]
+
+    with pytest.raises(ValueError):
+        _execute(cells, every=1)
+
+    cells[1] = "y = 2"
+    nb = _make_nb(cells, path=None)
+    client = CheckpointClient(
+        nb, checkpoint_dir="checkpoint", progress_bar=False, resume=True
+    )
+
+    async def main():
+        return [event async for event in client.execute_async()]
+
+    events = asyncio.run(main())
+
+    assert [e.index for e in events] == [0, 1, 2]
+    assert nb.cells[2].outputs[0]["text"] == "1\n"
+    assert not Path("checkpoint").exists()
+
+
+def test_checkpoint_tag(tmp_empty):
+    cells = [
+        "x = 1",
+        ("code", "y = 2", dict(tags=["checkpoint"])),
+        "x = 100",
+        "raise ValueError('boom')",
+    ]
+
+    with pytest.raises(ValueError):
+        _execute(cells)
+
+    cells[3] = "x + y"
+    nb = _execute(cells, resume=True)
+
+    # the cell after the checkpoint is executed again
+    assert nb.cells[3].outputs[0]["data"] == {"text/plain": "102"}
+
+
+def test_ignores_checkpoint_if_previous_cells_changed(tmp_empty):
+    cells = ["x = 1", ("code", "y = 2", dict(tags=["checkpoint"])), "1 / 0"]
+
+    with pytest.raises(ZeroDivisionError):
+        _execute(cells)
+
+    nb = _execute(["x = 10", cells[1], "x + y"], resume=True)
+
+    assert nb.cells[2].outputs[0]["data"] == {"text/plain": "12"}
+
+
+def test_restores_functions_and_modules(tmp_empty):
+    cells = [
+        "import math",
+        "def area(r):\n    return math.pi * r ** 2",
+        ("code", "radius = 2", dict(tags=["checkpoint"])),
+        "1 / 0",
+    ]
+
+    with pytest.raises(ZeroDivisionError):
+        _execute(cells)
+
+    cells[3] = "round(area(radius), 2)"
+    nb = _execute(cells, resume=True)
+
+    assert nb.cells[3].outputs[0]["data"] == {"text/plain": "12.57"}
+
+
+def test_warns_about_variables_that_cannot_be_stored(tmp_empty):
+    cells = [
+        "import threading; lock = threading.Lock()",
+        ("code", "x = 1", dict(tags=["checkpoint"])),
+        "1 / 0",
+    ]
+
+    with pytest.raises(ZeroDivisionError):
+        _execute(cells)
+
+    cells[2] = "x"
+
+    with pytest.warns(UserWarning, match="were not restored: lock"):
+        _execute(cells, resume=True)
+
+
+def test_execute_notebook_resume(tmp_empty):
+    _make_nb(["x = 1", "y = 2", "1 / 0"])
+
+    with pytest.raises(ZeroDivisionError):
+        execute_notebook("nb.ipynb", "out.ipynb", checkpoint=1, progress_bar=False)
+
+    assert Path("__ploomber_cache__", "checkpoints", "nb", "latest").is_dir()
+
+    _make_nb(["x = 1", "y = 2", "x + y"])
+    execute_notebook("nb.ipynb", "out.ipynb", resume=True, progress_bar=False)
+
+    nb = _read_nb("out.ipynb")
+    assert nb.cells[2].outputs[0]["data"] == {"text/plain": "3"}
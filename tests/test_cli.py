@@ -2,12 +2,16 @@
 Command-line interface tests
 """
 
+import json
+from pathlib import Path
 from unittest.mock import Mock, call
 
+import nbformat
 import pytest
 from click.testing import CliRunner
 
 from ploomber_engine import cli
+from ploomber_engine import execute
 from ploomber_engine import execute_notebook
 from conftest import _make_nb
 import re
@@ -104,7 +108,7 @@ def _make_call(**kwargs):
 )
 def test_cli(tmp_empty, monkeypatch, cli_args, call_expected):
     mock = Mock(wraps=execute_notebook)
-    monkeypatch.setattr(cli, "execute_notebook", mock)
+    monkeypatch.setattr(execute, "execute_notebook", mock)
 
     _make_nb(["1 + 1"])
 
@@ -222,3 +226,45 @@ def test_cli_save_profiling_not_valid_csv_path(
     assert result.exit_code == 1
     assert re.search(exception_msg, str(result.exception))
     assert isinstance(result.exception, exception_type)
+
+
+def _read_outputs(path):
+    nb = nbformat.read(path, as_version=nbformat.NO_CONVERT)
+    return [c.outputs for c in nb.cells if c.cell_type == "code"]
+
+
+def test_cli_batch(tmp_empty):
+    _make_nb(["1 + 1"], path="a.ipynb")
+    _make_nb(["1 + 2"], path="b.ipynb")
+    jobs = [
+        dict(input_path="a.ipynb", output_path="out-a.ipynb"),
+        dict(input_path="b.ipynb", output_path="out-b.ipynb"),
+    ]
+    Path("jobs.json").write_text(json.dumps(jobs))
+
+    result = CliRunner().invoke(cli.cli, ["--batch", "jobs.json", "--max-workers", "2"])
+
+    assert result.exit_code == 0, result.output
+    assert "Executed 2 notebooks, 0 failed" in result.output
+    assert _read_outputs("out-b.ipynb")[0][0]["data"] == {"text/plain": "3"}
+
+
+def test_cli_batch_failed(tmp_empty):
+    _make_nb(["1 / 0"], path="a.ipynb")
+    jobs = [dict(input_path="a.ipynb", output_path="out.ipynb")]
+    Path("jobs.json").write_text(json.dumps(jobs))
+
+    result = CliRunner().invoke(cli.cli, ["--batch", "jobs.json"])
+
+    assert result.exit_code == 1
+    assert "Executed 1 notebooks, 1 failed" in result.output
+
+
+def test_cli_batch_with_notebooks(tmp_empty):
+    _make_nb(["1 + 1"])
+    Path("jobs.json").write_text("[]")
+
+    result = CliRunner().invoke(cli.cli, ["nb.ipynb", "--batch", "jobs.json"])
+
+    assert result.exit_code == 2
+    assert "Do not pass notebooks when passing --batch" in result.output
@@ -0,0 +1,177 @@
+from time import perf_counter, sleep
+from unittest.mock import Mock
+
+import pytest
+from jupyter_client.manager import start_new_kernel
+
+from conftest import _make_nb_obj
+from ploomber_engine.client import (
+    PloomberNotebookClient,
+    flush_io,
+    _coalesce_streams,
+)
+
+
+@pytest.fixture(autouse=True)
+def ipykernel():
+    pytest.importorskip("ipykernel")
+
+
+def test_input(monkeypatch, capsys):
+    mock = Mock(side_effect=["Ada", "36"])
+    monkeypatch.setattr("builtins.input", mock)
+    nb = _make_nb_obj(
+        [
+            "print('before')",
+            "name = input('name: ')\nprint('hello', name)",
+            "age = input('age: ')\nprint('done')",
+            "name, age",
+        ]
+    )
+
+    out = PloomberNotebookClient(nb).execute()
+
+    assert [call.args for call in mock.call_args_list] == [("name: ",), ("age: ",)]
+    assert out.cells[1].outputs[0]["text"] == "hello Ada\n"
+    assert out.cells[2].outputs[0]["text"] == "done\n"
+    assert out.cells[3].outputs[0]["data"] == {"text/plain": "('Ada', '36')"}
+
+    # outputs are printed only for cells that request input
+    captured, _ = capsys.readouterr()
+    assert "before" not in captured
+    assert "hello Ada\n" in captured
+    assert "done\n" in captured
+
+
+def test_echoes_outputs_before_requesting_input(monkeypatch, capsys):
+    def input_(prompt):
+        captured, _ = capsys.readouterr()
+        assert captured == "some context\n"
+        return "value"
+
+    monkeypatch.setattr("builtins.input", input_)
+    nb = _make_nb_obj(["print('some context')\ninput()"])
+
+    out = PloomberNotebookClient(nb).execute()
+
+    assert out.cells[0].outputs[-1]["data"] == {"text/plain": "'value'"}
+
+
+@pytest.mark.parametrize("error", [EOFError, KeyboardInterrupt])
+def test_input_error_interrupts_the_kernel(monkeypatch, error):
+    monkeypatch.setattr("builtins.input", Mock(side_effect=error))
+    nb = _make_nb_obj(["name = input('name? ')", "1 + 1"])
+    client = PloomberNotebookClient(nb)
+
+    with client.setup_kernel():
+        with pytest.raises(error):
+            client.execute_cell(nb.cells[0], 0)
+
+        # the kernel is no longer waiting for the input
+        client.execute_cell(nb.cells[1], 1)
+
+    assert nb.cells[1].outputs[0]["data"] == {"text/plain": "2"}
+
+
+def test_no_delay_between_cells():
+    n_cells = 10
+    nb = _make_nb_obj(["1 + 1"] * n_cells)
+    client = PloomberNotebookClient(nb)
+
+    with client.setup_kernel():
+        start = perf_counter()
+
+        for index, cell in enumerate(nb.cells):
+            client.execute_cell(cell, index)
+
+        elapsed = perf_counter() - start
+
+    assert nb.cells[-1].outputs[0]["data"] == {"text/plain": "2"}
+    # cells used to wait one second for input requests
+    assert elapsed < n_cells * 0.5
+
+
+def _msg(msg_type, parent="a", **content):
+    return {
+        "header": {"msg_type": msg_type},
+        "msg_type": msg_type,
+        "parent_header": {"msg_id": parent},
+        "content": content,
+    }
+
+
+def test_coalesce_streams():
+    msgs = [
+        _msg("stream", name="stdout", text="1\n"),
+        _msg("stream", name="stdout", text="2\n"),
+        _msg("stream", name="stderr", text="error\n"),
+        _msg("stream", name="stdout", text="3\n"),
+        _msg("stream", name="stdout", parent="b", text="4\n"),
+        _msg("status", execution_state="idle"),
+        _msg("stream", name="stdout", text="5\n"),
+        _msg("stream", name="stdout", text="6\n"),
+    ]
+
+    coalesced = _coalesce_streams(msgs)
+
+    assert [m["content"].get("text") for m in coalesced] == [
+        "1\n2\n",
+        "error\n",
+        "3\n",
+        "4\n",
+        None,
+        "5\n6\n",
+    ]
+    # the original messages are not modified
+    assert msgs[0]["content"]["text"] == "1\n"
+
+
+def test_print_heavy_cell():
+    n_lines = 2000
+    nb = _make_nb_obj(
+        [
+            "import sys\n"
+            f"for i in range({n_lines}):\n"
+            "    print(i, flush=True)\n"
+            "    if i % 500 == 0:\n"
+            "        print(i, file=sys.stderr, flush=True)\n"
+            "'done'"
+        ]
+    )
+
+    out = PloomberNotebookClient(nb).execute()
+    outputs = out.cells[0].outputs
+
+    stdout = "".join(o["text"] for o in outputs if o.get("name") == "stdout")
+    assert stdout == "".join(f"{i}\n" for i in range(n_lines))
+
+    stderr = "".join(o["text"] for o in outputs if o.get("name") == "stderr")
+    assert stderr == "0\n500\n1000\n1500\n"
+    assert outputs[-1]["data"] == {"text/plain": "'done'"}
+
+
+def test_flush_io(capsys):
+    km, kc = start_new_kernel()
+
+    try:
+        kc.execute_interactive(
+            "for i in range(100): print(i, flush=True)",
+            output_hook=lambda msg: None,
+        )
+        kc.execute("print('hello'); 1 + 1")
+
+        captured = ""
+
+        for _ in range(50):
+            flush_io(kc)
+            captured += capsys.readouterr().out
+
+            if "2\n" in captured.split("hello\n")[-1]:
+                break
+
+            sleep(0.1)
+    finally:
+        kc.stop_channels()
+        km.shutdown_kernel(now=True)
+
+    assert captured.replace("\r", "").endswith("hello\n2\n")
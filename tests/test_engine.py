@@ -1,10 +1,15 @@
+import sys
+import subprocess
 from pathlib import Path
 from unittest.mock import Mock
 
 import pytest
 import papermill as pm
+from papermill.exceptions import PapermillExecutionError
 import nbformat
 
+from ploomber_engine.pool import KernelPool
+
 
 @pytest.mark.parametrize(
     "engine",
@@ -25,12 +30,18 @@ def test_crashing_notebook(tmp_assets, monkeypatch, capsys):
     with monkeypatch.context() as m:
         m.setattr("builtins.input", mock)
 
-        with pytest.raises(SystemExit):
+        with pytest.raises(PapermillExecutionError):
             pm.execute_notebook("crash.ipynb", "out.ipynb", engine_name="debug")
 
     out, _ = capsys.readouterr()
 
     assert "x is 1\n" in out
+    assert [call.args for call in mock.call_args_list] == [("ipdb> ",), ("ipdb> ",)]
+
+    # the debugging session is stored in the output notebook
+    nb = nbformat.v4.reads(Path("out.ipynb").read_text())
+    outputs = nb.cells[-1]["outputs"]
+    assert "x is 1\n" in "".join(o.get("text", "") for o in outputs)
 
 
 def test_managed_client(tmp_empty):
@@ -56,3 +67,72 @@ def test_managed_client(tmp_empty):
             "output_type": "execute_result",
         }
     ]
+
+
+def test_profiling_engine_execution_timeout(tmp_empty):
+    nb = nbformat.v4.new_notebook()
+    nb.cells = [
+        nbformat.v4.new_code_cell(source="import time"),
+        nbformat.v4.new_code_cell(source="time.sleep(10)"),
+    ]
+    Path("nb.ipynb").write_text(nbformat.v4.writes(nb))
+
+    with pytest.raises(pm.PapermillExecutionError, match="CellTimeoutError"):
+        pm.execute_notebook(
+            "nb.ipynb",
+            "out.ipynb",
+            engine_name="profiling",
+            kernel_name="python3",
+            execution_timeout=0.2,
+        )
+
+    out = nbformat.v4.reads(Path("out.ipynb").read_text())
+
+    assert out.cells[-1]["outputs"][0]["ename"] == "CellTimeoutError"
+    tags = [cell.metadata.get("tags") for cell in out.cells]
+    assert ["ploomber-engine-error-cell"] in tags
+
+
+@pytest.mark.parametrize("engine", ["debug", "debuglater"])
+def test_kernel_pool(tmp_empty, engine):
+    nb = nbformat.v4.new_notebook()
+    nb.cells = [
+        nbformat.v4.new_code_cell("import os; print(os.getpid(), os.getcwd())"),
+    ]
+    nbformat.write(nb, "nb.ipynb")
+
+    def execute():
+        out = pm.execute_notebook(
+            "nb.ipynb",
+            "out.ipynb",
+            engine_name=engine,
+            kernel_name="python3",
+            kernel_pool=pool,
+            path_to_dump="nb.dump",
+        )
+        # the output may be split into several messages
+        return "".join(output["text"] for output in out.cells[-1].outputs)
+
+    with KernelPool(size=1) as pool:
+        first, second = execute(), execute()
+
+    assert first == second
+    assert first.split()[1] == tmp_empty
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "from ploomber_engine.engine import DebugEngine",
+        "import papermill; from ploomber_engine.engine import DebugEngine",
+        "import ploomber_engine.papermill; from ploomber_engine.engine import "
+        "DebugEngine",
+    ],
+)
+def test_engines_are_loaded_through_entry_points(code):
+    # import order matters, so run it in a new interpreter
+    code += (
+        "\nfrom papermill.engines import papermill_engines"
+        "\nassert papermill_engines.get_engine('debug') is DebugEngine"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
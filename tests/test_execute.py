@@ -243,6 +243,16 @@ def test_execute_notebook_remove_tagged_cells(tmp_empty):
     assert [c.source for c in out.cells] == ["1 + 1"]
 
 
+def test_execute_notebook_save_profiling_data_writes_notebook(tmp_empty):
+    nb_in = _make_nb(["1 + 1"])
+
+    execute_notebook(nb_in, "out.ipynb", profile_runtime=True, save_profiling_data=True)
+
+    assert Path("out-profiling-data.csv").is_file()
+    nb = _read_nb("out.ipynb")
+    assert nb.cells[0].outputs[0]["data"] == {"text/plain": "2"}
+
+
 @pytest.mark.parametrize(
     "save_profiling_data_value, save_profiling_output",
     [(True, "out-profiling-data.csv"), ("test.csv", "test.csv")],
@@ -386,3 +396,16 @@ def test_execute_notebook_different_cwd(tmp_empty):
     cell = execute_notebook(nb_fname, nb_fname, cwd=run_dir).cells[-1]
     cell_cwd = cell["outputs"][-1]["text"].strip()
     assert cell_cwd == str(run_dir.absolute())
+
+
+def test_execute_notebook_max_memory_stores_partial_notebook(tmp_empty):
+    psutil = pytest.importorskip("psutil")
+    limit = psutil.Process().memory_info().rss / 1048576 + 100
+    _make_nb(
+        ["x = 1", "chunks = []\nwhile True:\n    chunks.append(b'x' * 10_000_000)"]
+    )
+
+    with pytest.raises(MemoryError):
+        execute_notebook("nb.ipynb", "out.ipynb", max_memory=limit)
+
+    assert _read_nb("out.ipynb").cells[-1].outputs[0]["ename"] == "MemoryLimitError"
@@ -0,0 +1,94 @@
+import os
+import sys
+
+import nbformat
+import pytest
+
+from conftest import _make_nb
+from ploomber_engine.forkserver import ForkServer
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+
+
+@pytest.fixture
+def server():
+    with ForkServer(preload=["json"], setup="shared = 41") as server:
+        yield server
+
+
+def test_execute_notebook(tmp_empty, server):
+    _make_nb(["import sys; print('json' in sys.modules)", "shared + 1"])
+
+    out = server.execute_notebook("nb.ipynb", "out.ipynb", progress_bar=False)
+
+    assert out.cells[0].outputs[0]["text"] == "True\n"
+    assert out.cells[1].outputs[0]["data"] == {"text/plain": "42"}
+    nb = nbformat.read("out.ipynb", as_version=nbformat.NO_CONVERT)
+    assert nb.cells[1].outputs[0]["data"] == {"text/plain": "42"}
+
+
+def test_children_are_isolated(tmp_empty, server):
+    _make_nb(["shared = 0", "import sys; sys.modules['some_module'] = None"])
+    _make_nb(["import sys; print(shared, 'some_module' in sys.modules)"], "b.ipynb")
+
+    server.execute_notebook("nb.ipynb", None, progress_bar=False)
+    out = server.execute_notebook("b.ipynb", None, progress_bar=False)
+
+    assert out.cells[0].outputs[0]["text"] == "41 False\n"
+
+
+def test_parameters(tmp_empty, server):
+    _make_nb([("code", "x = 1", dict(tags=["parameters"])), "x"])
+
+    out = server.execute_notebook(
+        "nb.ipynb", None, parameters=dict(x=2), progress_bar=False
+    )
+
+    assert out.cells[2].outputs[0]["data"] == {"text/plain": "2"}
+
+
+def test_raises_notebook_exception(tmp_empty, server):
+    _make_nb(["1 / 0"])
+
+    with pytest.raises(ZeroDivisionError) as excinfo:
+        server.execute_notebook("nb.ipynb", "out.ipynb", progress_bar=False)
+
+    assert "Traceback" in str(excinfo.value.__cause__)
+    nb = nbformat.read("out.ipynb", as_version=nbformat.NO_CONVERT)
+    assert nb.cells[2].outputs[0]["ename"] == "ZeroDivisionError"
+
+    # the server is still usable
+    _make_nb(["1 + 1"])
+    server.execute_notebook("nb.ipynb", None, progress_bar=False)
+
+
+def test_survives_crashing_child(tmp_empty, server):
+    _make_nb(["import os; os._exit(1)"])
+
+    with pytest.raises(ChildProcessError):
+        server.execute_notebook("nb.ipynb", None, progress_bar=False)
+
+    _make_nb(["1 + 1"])
+    out = server.execute_notebook("nb.ipynb", None, progress_bar=False)
+    assert out.cells[0].outputs[0]["data"] == {"text/plain": "2"}
+
+
+def test_error_if_preload_fails():
+    with pytest.raises(RuntimeError) as excinfo:
+        ForkServer(preload=["not_a_module"]).start()
+
+    assert "Failed to start fork server" in str(excinfo.value)
+
+
+def test_error_if_not_started():
+    with pytest.raises(RuntimeError) as excinfo:
+        ForkServer().execute_notebook("nb.ipynb", None)
+
+    assert "not running" in str(excinfo.value)
+
+
+def test_preloaded_modules_are_not_imported_in_caller(no_sys_modules_cache):
+    with ForkServer(preload=["tabnanny"]):
+        pass
+
+    assert "tabnanny" not in sys.modules
@@ -0,0 +1,72 @@
+"""
+Check that importing the package does not import heavy dependencies
+"""
+
+import sys
+import json
+import subprocess
+
+import pytest
+
+
+def _imported_after(statement):
+    """Returns the modules imported after running a statement in a new
+    interpreter
+    """
+    code = f"import sys\n{statement}\nimport json\nprint(json.dumps(list(sys.modules)))"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return set(json.loads(result.stdout))
+
+
+@pytest.mark.parametrize(
+    "statement, not_imported",
+    [
+        [
+            "import ploomber_engine",
+            [
+                "IPython",
+                "papermill",
+                "nbformat",
+                "nbclient",
+                "jupyter_client",
+                "traitlets",
+                "click",
+                "parso",
+                "tqdm",
+            ],
+        ],
+        [
+            "import ploomber_engine.cli",
+            [
+                "IPython",
+                "papermill",
+                "nbformat",
+                "nbclient",
+                "jupyter_client",
+                "traitlets",
+                "parso",
+                "tqdm",
+            ],
+        ],
+        ["import ploomber_engine.engine", ["IPython", "papermill"]],
+        ["from ploomber_engine import execute_notebook", ["papermill", "matplotlib"]],
+    ],
+)
+def test_does_not_import(statement, not_imported):
+    imported = _imported_after(statement)
+    assert not imported & set(not_imported)
+
+
+def test_lazy_attributes():
+    import ploomber_engine
+    from ploomber_engine.execute import execute_notebook
+    from ploomber_engine.batch import execute_notebooks, execute_notebooks_async
+
+    assert ploomber_engine.execute_notebook is execute_notebook
+    assert ploomber_engine.execute_notebooks is execute_notebooks
+    assert ploomber_engine.execute_notebooks_async is execute_notebooks_async
+
+    with pytest.raises(AttributeError):
+        ploomber_engine.unknown
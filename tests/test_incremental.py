@@ -0,0 +1,181 @@
+import asyncio
+from pathlib import Path
+
+import nbformat
+import pytest
+
+from conftest import _make_nb
+from ploomber_engine import execute_notebook
+from ploomber_engine.incremental import IncrementalClient
+
+
+def _execute(cells, **kwargs):
+    nb = _make_nb(cells, path=None)
+    return IncrementalClient(nb, cache_dir="cache", progress_bar=False).execute(
+        **kwargs
+    )
+
+
+def _cached(nb):
+    return [
+        c.metadata["ploomber"].get("cached", False)
+        for c in nb.cells
+        if c.cell_type == "code"
+    ]
+
+
+def _outputs(nb):
+    return [c.outputs for c in nb.cells if c.cell_type == "code"]
+
+
+def test_reuses_outputs(tmp_empty):
+    cells = ["x = 1", "y = x + 1", "print(y)"]
+
+    first = _execute(cells)
+    second = _execute(cells)
+
+    assert _cached(first) == [False, False, False]
+    assert _cached(second) == [True, True, True]
+    assert _outputs(first) == _outputs(second)
+    assert [c.execution_count for c in second.cells] == [1, 2, 3]
+
+
+def test_only_executes_affected_cells(tmp_empty):
+    _execute(["a = 1", "b = 2", "c = a + 1", "print(b)"])
+
+    nb = _execute(["a = 10", "b = 2", "c = a + 1", "print(b)"])
+
+    assert _cached(nb) == [False, True, False, True]
+
+
+def test_restores_upstream_variables(tmp_empty):
+    _execute(["import math", "data = [1, 2, 3]", "total = sum(data)", "total"])
+
+    nb = _execute(
+        ["import math", "data = [1, 2, 3]", "total = sum(data)", "math.sqrt(total)"]
+    )
+
+    assert _cached(nb) == [True, True, True, False]
+    assert nb.cells[3].outputs[0]["data"] == {"text/plain": "2.449489742783178"}
+
+
+def test_in_place_modifications(tmp_empty):
+    _execute(["data = [1]", "data.append(2)", "len(data)"])
+
+    nb = _execute(["data = [1]", "data.append(3)", "len(data)"])
+
+    assert _cached(nb) == [True, False, False]
+    assert nb.cells[2].outputs[0]["data"] == {"text/plain": "2"}
+
+
+def test_restores_functions(tmp_empty):
+    _execute(["factor = 2", "def double(x): return x * factor", "double(1)"])
+
+    nb = _execute(["factor = 2", "def double(x): return x * factor", "double(21)"])
+
+    assert _cached(nb) == [True, True, False]
+    assert nb.cells[2].outputs[0]["data"] == {"text/plain": "42"}
+
+
+def test_functions_that_modify_globals(tmp_empty):
+    cells = ["data = []", "def add():\n    data.append(1)", "add()", "print(data)"]
+    first = _execute(cells)
+
+    nb = _execute(cells[:-1] + ["print(data, len(data))"])
+
+    assert first.cells[3].outputs[0]["text"] == "[1]\n"
+    assert _cached(nb) == [True, True, True, False]
+    assert nb.cells[3].outputs[0]["text"] == "[1] 1\n"
+
+
+def test_executes_cells_calling_functions_with_unknown_effects(tmp_empty):
+    Path("script.py").write_text("data = []\ndef add():\n    data.append(1)\n")
+    cells = ["%run script.py", "add()", "print(data)"]
+    _execute(cells)
+
+    nb = _execute(cells)
+
+    # add() is executed even if nothing changed
+    assert _cached(nb)[1:] == [False, True]
+    assert nb.cells[2].outputs[0]["text"] == "[1]\n"
+
+
+def test_execute_async(tmp_empty):
+    cells = ["x = 1", "y = x + 1", "print(y)"]
+    _execute(cells)
+    nb = _make_nb(["x = 1", "y = x + 2", "print(y)"], path=None)
+    client = IncrementalClient(nb, cache_dir="cache", progress_bar=False)
+
+    async def main():
+        return [event async for event in client.execute_async()]
+
+    events = asyncio.run(main())
+
+    assert [e.index for e in events] == [0, 1, 2]
+    assert _cached(nb) == [True, False, False]
+    assert nb.cells[2].outputs[0]["text"] == "3\n"
+
+
+def test_executes_writer_of_unserializable_variable(tmp_empty):
+    cells = ["import threading", "lock = threading.Lock()", "x = 1", "print(lock, x)"]
+    _execute(cells)
+
+    nb = _execute(cells[:-1] + ["print(type(lock).__name__, x)"])
+
+    assert _cached(nb) == [True, False, True, False]
+    assert nb.cells[3].outputs[0]["text"] == "lock 1\n"
+
+
+def test_parameters_invalidate_downstream_cells(tmp_empty):
+    cells = ["data = 1", ("code", "x = 1", dict(tags=["parameters"])), "x", "data"]
+
+    _execute(cells, parameters=dict(x=1))
+    nb = _execute(cells, parameters=dict(x=2))
+
+    assert _cached(nb) == [True, True, False, False, True]
+    assert nb.cells[3].outputs[0]["data"] == {"text/plain": "2"}
+
+
+def test_magics_depend_on_previous_cells(tmp_empty):
+    _execute(["x = 1", "%time y = x", "y"])
+
+    nb = _execute(["x = 2", "%time y = x", "y"])
+
+    assert _cached(nb) == [False, False, False]
+    assert nb.cells[2].outputs[-1]["data"] == {"text/plain": "2"}
+
+
+def test_prunes_old_entries(tmp_empty):
+    _execute(["x = 1"])
+    _execute(["x = 2"])
+
+    assert len(list(Path("cache").iterdir())) == 1
+
+
+def test_stores_progress_before_failing(tmp_empty):
+    with pytest.raises(ZeroDivisionError):
+        _execute(["x = 1", "1 / 0"])
+
+    nb = _execute(["x = 1", "x"])
+
+    assert _cached(nb) == [True, False]
+
+
+def test_execute_notebook_incremental(tmp_empty):
+    _make_nb(["x = 1", "x + 1"])
+
+    execute_notebook("nb.ipynb", "out.ipynb", incremental=True)
+    execute_notebook("nb.ipynb", "out.ipynb", incremental=True)
+
+    nb = nbformat.read("out.ipynb", as_version=nbformat.NO_CONVERT)
+    assert _cached(nb) == [True, True]
+    assert Path("__ploomber_cache__", "incremental", "nb").is_dir()
+
+
+def test_execute_notebook_incremental_requires_path(tmp_empty):
+    nb = _make_nb(["x = 1"], path=None)
+
+    with pytest.raises(ValueError) as excinfo:
+        execute_notebook(nb, "out.ipynb", incremental=True)
+
+    assert "requires input_path to be a path" in str(excinfo.value)
@@ -1,17 +1,27 @@
+import re
+import json
+import pickle
 import inspect
 
 from pathlib import Path
 from copy import copy
 from unittest.mock import ANY
+from concurrent.futures import ThreadPoolExecutor
 
+import os
 import sys
+import time
+import asyncio
+import threading
+import subprocess
 import pytest
 import nbformat
 from IPython.core.interactiveshell import InteractiveShell
 
 from conftest import _make_nb
-from ploomber_engine.ipython import PloomberShell, PloomberClient
+from ploomber_engine.ipython import PloomberShell, PloomberClient, CellExecuted
 from ploomber_engine import ipython
+from ploomber_engine.pool import ShellPool
 
 
 def test_captures_display_data():
@@ -45,12 +55,10 @@ plt.plot([1, 2, 3])
 
 def test_client_captures_display_data():
     nb = nbformat.v4.new_notebook()
-    cell = nbformat.v4.new_code_cell(
-        source="""
+    cell = nbformat.v4.new_code_cell(source="""
 import matplotlib.pyplot as plt
 plt.plot([1, 2, 3])
-"""
-    )
+""")
     nb.cells.append(cell)
 
     with PloomberClient(nb) as client:
@@ -63,14 +71,12 @@ plt.plot([1, 2, 3])
 
 def test_client_captures_all_outputs():
     nb = nbformat.v4.new_notebook()
-    cell = nbformat.v4.new_code_cell(
-        source="""
+    cell = nbformat.v4.new_code_cell(source="""
 import matplotlib.pyplot as plt
 print('hello')
 plt.plot([1, 2, 3])
 'bye'
-"""
-    )
+""")
     nb.cells.append(cell)
 
     with PloomberClient(nb) as client:
@@ -83,16 +89,12 @@ plt.plot([1, 2, 3])
 
 def test_reports_exceptions():
     nb = nbformat.v4.new_notebook()
-    nb.cells.append(
-        nbformat.v4.new_code_cell(
-            source="""
+    nb.cells.append(nbformat.v4.new_code_cell(source="""
 def crash():
     raise ValueError("something went wrong")
 
 crash()
-"""
-        )
-    )
+"""))
 
     with pytest.raises(ValueError) as excinfo:
         PloomberClient(nb).execute()
@@ -109,9 +111,7 @@ crash()
 
 def test_displays_then_raises_exception():
     nb = nbformat.v4.new_notebook()
-    nb.cells.append(
-        nbformat.v4.new_code_cell(
-            source="""
+    nb.cells.append(nbformat.v4.new_code_cell(source="""
 print("hello!")
 print("hello!")
 
@@ -119,9 +119,7 @@ def crash():
     raise ValueError("something went wrong")
 
 crash()
-"""
-        )
-    )
+"""))
 
     with pytest.raises(ValueError) as excinfo:
         PloomberClient(nb).execute()
@@ -206,12 +204,10 @@ def test_client_gets_clean_shell():
 
 def test_output_to_sys_stderr():
     nb = nbformat.v4.new_notebook()
-    cell = nbformat.v4.new_code_cell(
-        source="""
+    cell = nbformat.v4.new_code_cell(source="""
 import sys
 print('error', file=sys.stderr)
-"""
-    )
+""")
     nb.cells.append(cell)
 
     out = PloomberClient(nb).execute()
@@ -223,12 +219,10 @@ print('error', file=sys.stderr)
 
 def test_displays_html_repr():
     nb = nbformat.v4.new_notebook()
-    cell = nbformat.v4.new_code_cell(
-        source="""
+    cell = nbformat.v4.new_code_cell(source="""
 import pandas as pd
 pd.DataFrame({'x': [1, 2, 3]})
-"""
-    )
+""")
     nb.cells.append(cell)
 
     out = PloomberClient(nb).execute()
@@ -388,12 +382,10 @@ def test_display_formats(source, expected):
 
 
 def test_adds_current_directory_to_sys_path(tmp_empty, no_sys_modules_cache):
-    Path("some_new_module.py").write_text(
-        """
+    Path("some_new_module.py").write_text("""
 def x():
     pass
-"""
-    )
+""")
 
     nb = nbformat.v4.new_notebook()
     nb.cells.append(nbformat.v4.new_code_cell(source="import some_new_module"))
@@ -442,26 +434,18 @@ def cell(source):
 def test_get_namespace():
     nb = nbformat.v4.new_notebook()
     nb.cells.append(cell("x = 1"))
-    nb.cells.append(
-        cell(
-            """
+    nb.cells.append(cell("""
 class SomeClass:
     pass
 
 some_object = SomeClass()
-"""
-        )
-    )
-    nb.cells.append(
-        cell(
-            """
+"""))
+    nb.cells.append(cell("""
 def add(x, y):
     return x + y
 
 result = add(100, 200)
-"""
-        )
-    )
+"""))
 
     ns = PloomberClient(nb).get_namespace()
 
@@ -476,21 +460,15 @@ result = add(100, 200)
 def test_get_definitions():
     nb = nbformat.v4.new_notebook()
     nb.cells.append(cell("x = 1"))
-    nb.cells.append(
-        cell(
-            """
+    nb.cells.append(cell("""
 class SomeClass:
     pass
 
 raise ValueError('some error happened')
 
 some_object = SomeClass()
-"""
-        )
-    )
-    nb.cells.append(
-        cell(
-            """
+"""))
+    nb.cells.append(cell("""
 def add(x, y):
     return x + y
 
@@ -498,9 +476,7 @@ def add(x, y):
 raise ValueError('another error happened')
 
 result = add(100, 200)
-"""
-        )
-    )
+"""))
     defs = PloomberClient(nb).get_definitions()
 
     assert set(defs) == {"SomeClass", "add"}
@@ -888,3 +864,641 @@ def test_pass_namespace():
     ns_second = client_second.get_namespace(namespace=ns_first)
 
     assert ns_second == {"x": 1, "y": 2}
+
+
+def _strip_timestamps(nb):
+    for cell in nb.cells:
+        cell.metadata.pop("ploomber", None)
+        cell.pop("id", None)
+
+    return nb
+
+
+def test_execute_sweep_matches_full_execution():
+    cells = [
+        "import random; data = list(range(10))",
+        ("code", "n = 1", dict(tags=["parameters"])),
+        "print(data[:n])",
+        "data.append(n)",
+        "data",
+    ]
+    parameters = [dict(n=1), dict(n=3)]
+
+    nbs = PloomberClient(_make_nb(cells, path=None)).execute_sweep(parameters)
+    expected = [
+        PloomberClient(_make_nb(cells, path=None)).execute(parameters=params)
+        for params in parameters
+    ]
+
+    assert [_strip_timestamps(nb) for nb in nbs] == [
+        _strip_timestamps(nb) for nb in expected
+    ]
+
+
+def test_execute_sweep_executes_prefix_once(tmp_empty):
+    cells = [
+        "with open('counter.txt', 'a') as f: f.write('x')",
+        ("code", "n = 1", dict(tags=["parameters"])),
+        "n",
+    ]
+
+    nbs = PloomberClient(_make_nb(cells, path=None)).execute_sweep(
+        [dict(n=1), dict(n=2), dict(n=3)]
+    )
+
+    assert Path("counter.txt").read_text() == "x"
+    assert [nb.cells[-1].outputs[0]["data"]["text/plain"] for nb in nbs] == [
+        "1",
+        "2",
+        "3",
+    ]
+
+
+def test_execute_sweep_raises_error():
+    cells = [("code", "n = 1", dict(tags=["parameters"])), "1 / n"]
+
+    with pytest.raises(ZeroDivisionError):
+        PloomberClient(_make_nb(cells, path=None)).execute_sweep([dict(n=1), dict(n=0)])
+
+
+@pytest.mark.parametrize(
+    "cells",
+    [
+        ["x = 1", "y = x + 1", "print(y)", "y"],
+        ["print('a')\n'b'", "import sys; print('err', file=sys.stderr)"],
+        ["from IPython.display import HTML", "display(HTML('<p>hi</p>'))", "x = 1"],
+        [
+            "import matplotlib.pyplot as plt",
+            "plt.plot([1, 2, 3])",
+            "print('after')",
+        ],
+        ["from __future__ import annotations", "def f(x: Undefined): pass", "f"],
+        # these go through run_cell
+        ["%time z = 1", "z", "!echo hi", "await_ = 1", "import asyncio"],
+    ],
+)
+def test_fast_path_matches_run_cell(cells):
+    fast = PloomberClient(_make_nb(cells, path=None), fast_path=True).execute()
+    slow = PloomberClient(_make_nb(cells, path=None)).execute()
+
+    def outputs(nb):
+        # remove memory addresses and timings
+        serialized = json.dumps([cell.get("outputs") for cell in nb.cells])
+        serialized = re.sub(r"0x[0-9a-f]+", "ADDRESS", serialized)
+        return re.sub(r'(CPU times|Wall time):[^\\"]+', "TIME", serialized)
+
+    assert outputs(fast) == outputs(slow)
+
+
+def test_fast_path_reports_exceptions():
+    def execute(fast_path):
+        nb = nbformat.v4.new_notebook()
+        nb.cells.append(
+            nbformat.v4.new_code_cell(
+                source="print('hello!')\n\ndef crash():\n"
+                "    raise ValueError('something went wrong')\n\ncrash()"
+            )
+        )
+
+        with pytest.raises(ValueError, match="something went wrong"):
+            PloomberClient(nb, fast_path=fast_path).execute()
+
+        return nb.cells[2].outputs
+
+    assert execute(fast_path=True) == execute(fast_path=False)
+
+
+def test_fast_path_skips_run_cell(monkeypatch):
+    nb = _make_nb(["x = 1", "%time y = x", "y"], path=None)
+    calls = []
+    original = PloomberShell.run_cell
+
+    def run_cell(self, source, *args, **kwargs):
+        calls.append(source)
+        return original(self, source, *args, **kwargs)
+
+    monkeypatch.setattr(PloomberShell, "run_cell", run_cell)
+
+    PloomberClient(nb, fast_path=True).execute()
+
+    assert calls == ["%time y = x"]
+
+
+def test_cell_timeout_interrupts_blocking_call():
+    nb = _make_nb(["import time", "time.sleep(10)", "x = 1"], path=None)
+    client = PloomberClient(nb, cell_timeout=0.2)
+    start = time.monotonic()
+
+    with pytest.raises(ipython.CellTimeoutError, match="0.2 seconds"):
+        client.execute()
+
+    assert time.monotonic() - start < 5
+    # error cells are inserted before the first cell and the one that failed
+    assert nb.cells[3].outputs[0]["ename"] == "CellTimeoutError"
+    assert nb.cells[4].execution_count is None
+
+
+def test_cell_timeout_in_other_thread():
+    nb = _make_nb(["while True:\n    pass"], path=None)
+    errors = []
+
+    def target(pool):
+        try:
+            PloomberClient(nb, cell_timeout=0.2, shell_pool=pool).execute()
+        except Exception as e:
+            errors.append(e)
+
+    # create the shell in this thread since its history database can only be
+    # used in the thread that created it
+    with ShellPool(size=1) as pool:
+        thread = threading.Thread(target=target, args=(pool,))
+        thread.start()
+        thread.join(timeout=10)
+
+    assert not thread.is_alive()
+    assert isinstance(errors[0], ipython.CellTimeoutError)
+    assert str(errors[0]) == "Cell execution exceeded the timeout of 0.2 seconds"
+    # the exception can be sent to other processes
+    assert pickle.loads(pickle.dumps(errors[0])).args == errors[0].args
+
+
+class _LateInterrupt:
+    """Raises the exception when exiting, like an interrupt that fires after
+    the cell finished but before it was cancelled
+    """
+
+    def __init__(self, seconds, exception):
+        self._exception = exception
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *args):
+        if self._exception is not None:
+            raise self._exception
+
+
+def test_cell_timeout_fires_after_the_cell_finished(monkeypatch):
+    monkeypatch.setattr(ipython, "interrupt_after", _LateInterrupt)
+    nb = _make_nb(["x = 1", "x + 1"], path=None)
+
+    out = PloomberClient(nb, cell_timeout=10).execute()
+
+    assert out.cells[1].outputs[0]["data"] == {"text/plain": "2"}
+
+
+def test_cell_timeout_fires_after_running_the_code(monkeypatch):
+    original = PloomberShell.run_cell
+
+    def run_cell(self, source, *args, **kwargs):
+        original(self, source, *args, **kwargs)
+        raise ipython.CellTimeoutError("Cell execution exceeded the timeout")
+
+    monkeypatch.setattr(PloomberShell, "run_cell", run_cell)
+    nb = _make_nb(["x = 1", "x + 1"], path=None)
+
+    with pytest.raises(ipython.CellTimeoutError):
+        PloomberClient(nb, cell_timeout=10).execute()
+
+    assert nb.cells[2].outputs[0]["ename"] == "CellTimeoutError"
+
+
+def test_cell_timeout_tag_overrides_default():
+    nb = _make_nb(
+        [
+            "import time",
+            ("code", "time.sleep(0.3)", dict(tags=["timeout=5"])),
+            "time.sleep(10)",
+        ],
+        path=None,
+    )
+
+    with pytest.raises(ipython.CellTimeoutError, match="0.1 seconds"):
+        PloomberClient(nb, cell_timeout=0.1).execute()
+
+    assert nb.cells[2].outputs == []
+    assert nb.cells[4].outputs[0]["ename"] == "CellTimeoutError"
+
+
+def test_cell_timeout_invalid_tag():
+    nb = _make_nb([("code", "1", dict(tags=["timeout=soon"]))], path=None)
+
+    with pytest.raises(ValueError, match="Invalid tag 'timeout=soon'"):
+        PloomberClient(nb).execute()
+
+
+def test_notebook_timeout():
+    nb = _make_nb(["import time"] + ["time.sleep(0.2)"] * 10, path=None)
+
+    with pytest.raises(ipython.CellTimeoutError, match="Notebook execution"):
+        PloomberClient(nb, timeout=0.5, cell_timeout=10).execute()
+
+    executed = [c for c in nb.cells if c.cell_type == "code" and c.execution_count]
+    assert 2 <= len(executed) <= 5
+
+
+def test_timeout_does_not_leak_alarm():
+    nb = _make_nb(["x = 1"], path=None)
+    PloomberClient(nb, timeout=0.2, cell_timeout=0.1).execute()
+
+    # the alarm was cancelled, so this does not raise
+    time.sleep(0.3)
+
+
+def test_max_memory_interrupts_cell():
+    psutil = pytest.importorskip("psutil")
+    limit = psutil.Process().memory_info().rss / 1048576 + 100
+    nb = _make_nb(
+        [
+            "chunks = []",
+            "while True:\n    chunks.append(b'x' * 10_000_000)",
+            "x = 1",
+        ],
+        path=None,
+    )
+
+    with pytest.raises(MemoryError, match="memory limit"):
+        PloomberClient(nb, max_memory=limit).execute()
+
+    assert nb.cells[3].outputs[0]["ename"] == "MemoryLimitError"
+    assert nb.cells[4].execution_count is None
+
+
+def test_max_memory_does_not_interrupt_cells_under_limit():
+    pytest.importorskip("psutil")
+    nb = _make_nb(["x = b'x' * 1000", "len(x)"], path=None)
+
+    out = PloomberClient(nb, max_memory=1_000_000).execute()
+
+    assert out.cells[1].outputs[0]["data"] == {"text/plain": "1000"}
+
+
+def test_lean_shell():
+    shell = PloomberShell(lean=True)
+
+    try:
+        assert not shell.history_manager.enabled
+        assert not shell.displayhook.do_full_cache
+        assert shell.autocall == 0
+
+        shell.run_cell("x = 1")
+        shell.run_cell("x + 1")
+
+        assert shell._get_output()[0]["data"] == {"text/plain": "2"}
+        assert "Out" not in shell.user_ns or not shell.user_ns["Out"]
+    finally:
+        shell.clear_instance()
+
+
+@pytest.mark.parametrize(
+    "cells",
+    [
+        ["x = 1", "x + 1", "print(x)", "%time y = x", "1 / 0"],
+        ["import matplotlib.pyplot as plt", "plt.plot([1, 2, 3])"],
+    ],
+)
+def test_lean_client_matches_default(cells):
+    def outputs(lean):
+        nb = _make_nb(cells, path=None)
+
+        try:
+            PloomberClient(nb, lean=lean).execute()
+        except ZeroDivisionError:
+            pass
+
+        serialized = json.dumps([cell.get("outputs") for cell in nb.cells])
+        serialized = re.sub(r"0x[0-9a-f]+", "ADDRESS", serialized)
+        return re.sub(r'(CPU times|Wall time):[^\\"]+', "TIME", serialized)
+
+    assert outputs(lean=True) == outputs(lean=False)
+
+
+def test_lean_shell_pool():
+    with ShellPool(size=1, lean=True) as pool:
+        shell = pool.acquire()
+        assert shell.lean
+        pool.release(shell)
+
+        out = PloomberClient(_make_nb(["1 + 1"], path=None), shell_pool=pool).execute()
+
+    assert out.cells[0].outputs[0]["data"] == {"text/plain": "2"}
+
+
+def _run_in_new_process(code):
+    # matplotlib is already imported in the process running the tests
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+def test_matplotlib_is_imported_lazily():
+    code = """
+import sys
+from ploomber_engine.ipython import PloomberClient
+from conftest import _make_nb
+
+PloomberClient(_make_nb(["x = 1", "x + 1"], path=None)).execute()
+print("matplotlib" in sys.modules)
+
+nb = _make_nb(["import matplotlib.pyplot as plt\\nplt.plot([1, 2, 3])"], path=None)
+out = PloomberClient(nb).execute()
+print(sorted(out.cells[0].outputs[1]["data"]))
+"""
+    stdout = _run_in_new_process(
+        f"import sys; sys.path.insert(0, {str(Path(__file__).parent)!r})\n" + code
+    )
+
+    assert stdout.splitlines() == ["False", "['image/png', 'text/plain']"]
+
+
+def test_matplotlib_is_enabled_in_pooled_shells():
+    code = """
+from ploomber_engine.ipython import PloomberClient
+from ploomber_engine.pool import ShellPool
+from conftest import _make_nb
+
+cells = ["import matplotlib.pyplot as plt", "plt.plot([1, 2, 3])"]
+
+def execute(pool):
+    out = PloomberClient(_make_nb(cells, path=None), shell_pool=pool).execute()
+    print([output["output_type"] for output in out.cells[1].outputs])
+
+with ShellPool(size=2) as pool:
+    # keep a shell busy so the next execution uses the other one
+    busy = pool.acquire()
+    execute(pool)
+    pool.release(busy)
+
+    # matplotlib was imported while this shell was not active
+    execute(pool)
+    # and again after resetting it
+    execute(pool)
+"""
+    stdout = _run_in_new_process(
+        f"import sys; sys.path.insert(0, {str(Path(__file__).parent)!r})\n" + code
+    )
+
+    assert stdout.splitlines() == ["['execute_result', 'display_data']"] * 3
+
+
+async def _collect_events(client, **kwargs):
+    return [event async for event in client.execute_async(**kwargs)]
+
+
+def test_execute_async():
+    nb = _make_nb(
+        [
+            ("code", "x = 1", dict(tags=["parameters"])),
+            ("markdown", "# Title", {}),
+            "print(x)",
+            "threading.current_thread().name",
+        ],
+        path=None,
+    )
+    nb.cells[-1].source = "import threading\n" + nb.cells[-1].source
+    client = PloomberClient(nb, progress_bar=False)
+
+    events = asyncio.run(_collect_events(client, parameters=dict(x=2)))
+
+    assert all(isinstance(event, CellExecuted) for event in events)
+    # index 1 has the injected parameters
+    assert [e.index for e in events] == [0, 1, 3, 4]
+    assert [e.execution_count for e in events] == [1, 2, 3, 4]
+    out = events[-1].nb
+    assert out.cells[3].outputs == [
+        {"output_type": "stream", "name": "stdout", "text": "2\n"}
+    ]
+    # cells run in a dedicated thread
+    thread_name = out.cells[4].outputs[0]["data"]["text/plain"]
+    assert thread_name.startswith("'ploomber-engine")
+    assert InteractiveShell._instance is None
+
+
+def test_execute_async_does_not_block_event_loop():
+    nb = _make_nb(["import time; time.sleep(0.5)"], path=None)
+    ticks = []
+
+    async def tick():
+        while True:
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.05)
+
+    async def main():
+        ticker = asyncio.ensure_future(tick())
+        await _collect_events(PloomberClient(nb, progress_bar=False))
+        ticker.cancel()
+
+    asyncio.run(main())
+
+    assert len(ticks) >= 5
+
+
+def test_execute_async_raises_cell_error():
+    nb = _make_nb(["x = 1", "1 / 0", "y = 2"], path=None)
+    client = PloomberClient(nb, progress_bar=False)
+    events = []
+
+    async def main():
+        async for event in client.execute_async():
+            events.append(event)
+
+    with pytest.raises(ZeroDivisionError):
+        asyncio.run(main())
+
+    assert len(events) == 1
+    assert client._nb.cells[3].outputs[0]["ename"] == "ZeroDivisionError"
+
+
+def test_execute_async_cancel_between_cells(tmp_empty):
+    nb = _make_nb(
+        [
+            "import time; time.sleep(0.5)",
+            "open('finished', 'w').close()",
+            "open('not-executed', 'w').close()",
+        ],
+        path=None,
+    )
+
+    async def main():
+        task = asyncio.ensure_future(
+            _collect_events(PloomberClient(nb, progress_bar=False))
+        )
+        await asyncio.sleep(0.1)
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+
+    # cancelling waits for the running cell to finish
+    assert nb.cells[0].execution_count == 1
+    assert nb.cells[1].execution_count is None
+    assert not Path("not-executed").exists()
+    assert InteractiveShell._instance is None
+
+
+def test_execute_async_stop_iterating(tmp_empty):
+    nb = _make_nb(["x = 1", "open('not-executed', 'w').close()"], path=None)
+
+    async def main():
+        async for event in PloomberClient(nb, progress_bar=False).execute_async():
+            break
+
+    asyncio.run(main())
+
+    assert not Path("not-executed").exists()
+
+
+def test_execute_async_uses_custom_execute():
+    class Client(PloomberClient):
+        def _execute(self):
+            # execute the cells in reverse order
+            for index, cell in reversed(list(enumerate(self._nb.cells))):
+                self.execute_cell(
+                    cell,
+                    cell_index=index,
+                    execution_count=index + 1,
+                    store_history=False,
+                )
+
+            return self._nb
+
+    nb = _make_nb(["1", "2", "3"], path=None)
+
+    events = asyncio.run(_collect_events(Client(nb, progress_bar=False)))
+
+    assert [e.index for e in events] == [2, 1, 0]
+
+
+def test_execute_async_shell_pool():
+    nb = _make_nb(["x = 41", "x + 1"], path=None)
+
+    with ShellPool(size=1) as pool:
+        client = PloomberClient(nb, progress_bar=False, shell_pool=pool)
+        events = asyncio.run(_collect_events(client))
+        assert pool.n_idle == 1
+
+    assert events[-1].cell.outputs[0]["data"] == {"text/plain": "42"}
+
+
+def _execute_in_thread(i):
+    nb = _make_nb(
+        [
+            f"import time\nx = {i}",
+            "for j in range(10):\n    print(x, j)\n    time.sleep(0.01)",
+            "display(x)\nget_ipython().user_ns['x']",
+        ],
+        path=None,
+    )
+    return PloomberClient(nb, progress_bar=False).execute()
+
+
+def test_concurrent_executions_in_threads():
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        nbs = list(executor.map(_execute_in_thread, range(8)))
+
+    for i, nb in enumerate(nbs):
+        text = "".join(output["text"] for output in nb.cells[1].outputs)
+        assert text == "".join(f"{i} {j}\n" for j in range(10))
+        assert [o["data"] for o in nb.cells[2].outputs] == [{"text/plain": str(i)}] * 2
+
+    assert InteractiveShell._instance is None
+    assert sys.displayhook is sys.__displayhook__
+
+
+def test_does_not_capture_other_threads(capsys):
+    started, printed = threading.Event(), threading.Event()
+    nb = _make_nb(["started.set()\nprinted.wait(10)\nprint('cell')"], path=None)
+    client = PloomberClient(nb, progress_bar=False)
+
+    def target():
+        with client:
+            client._shell.user_ns.update(started=started, printed=printed)
+            client._execute()
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    started.wait(10)
+    print("main")
+    printed.set()
+    thread.join(10)
+
+    assert nb.cells[0].outputs == [
+        {"output_type": "stream", "name": "stdout", "text": "cell\n"}
+    ]
+    assert capsys.readouterr().out == "main\n"
+
+
+def test_concurrent_executions_with_different_cwd(tmp_empty):
+    Path("a").mkdir()
+    Path("b").mkdir()
+    cwd, sys_path = os.getcwd(), list(sys.path)
+
+    def execute(directory):
+        nb = _make_nb(["import os, time", "time.sleep(0.1)", "os.getcwd()"], None)
+        client = PloomberClient(nb, progress_bar=False, cwd=directory)
+        out = client.execute()
+        return out.cells[2].outputs[0]["data"]["text/plain"]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        cwds = list(executor.map(execute, ["a", "b", "a", "b"]))
+
+    assert cwds == [repr(str(Path(d).resolve())) for d in ["a", "b", "a", "b"]]
+    assert os.getcwd() == cwd
+    assert sys.path == sys_path
+
+
+def test_shell_lookup_is_only_patched_while_executing():
+    nb = _make_nb(["'instance' in type(get_ipython()).__mro__[1].__dict__"], None)
+
+    out = PloomberClient(nb, progress_bar=False).execute()
+
+    assert out.cells[0].outputs[0]["data"] == {"text/plain": "True"}
+    assert "instance" not in InteractiveShell.__dict__
+
+
+def test_nested_working_directory(tmp_empty):
+    Path("a").mkdir()
+    Path("b").mkdir()
+    cwd = os.getcwd()
+
+    with ipython.add_to_sys_path("a"):
+        # no other executions are using it, so it can change it
+        with ipython.add_to_sys_path(str(Path(cwd, "b"))):
+            assert os.getcwd() == str(Path(cwd, "b"))
+
+        assert os.getcwd() == str(Path(cwd, "a"))
+
+    assert os.getcwd() == cwd
+
+
+def test_nested_working_directory_used_by_other_executions(tmp_empty):
+    Path("a").mkdir()
+    Path("b").mkdir()
+    cwd = os.getcwd()
+    entered, finish = threading.Event(), threading.Event()
+
+    def other():
+        with ipython.add_to_sys_path("a"):
+            entered.set()
+            finish.wait(10)
+
+    thread = threading.Thread(target=other)
+    thread.start()
+    entered.wait(10)
+
+    try:
+        with ipython.add_to_sys_path("a"):
+            with pytest.raises(RuntimeError, match="other executions"):
+                with ipython.add_to_sys_path(str(Path(cwd, "b"))):
+                    pass
+
+            assert os.getcwd() == str(Path(cwd, "a"))
+    finally:
+        finish.set()
+        thread.join(10)
+
+    assert os.getcwd() == cwd
@@ -1,88 +1,135 @@
+import gc
+import sys
+
 import pytest
 import nbformat
-from pathlib import Path
-from ploomber_engine.ipython import PloomberClient
-import copy
-
 
-def get_current_memory_usage():
-    """helper to get free and used expressed in GB"""
-    import psutil
+from ploomber_engine.ipython import PloomberClient, PloomberShell
+from ploomber_engine.pool import ShellPool
 
-    memory_usage = psutil.virtual_memory().used
+# weak references to the objects the notebook creates, the notebook's
+# variables are deleted after executing so they are stored here
+REFS = []
 
-    memory_usage = float(psutil._common.bytes2human(memory_usage)[:-1])
 
-    return memory_usage
+@pytest.fixture
+def refs():
+    REFS.clear()
+    yield REFS
+    REFS.clear()
 
 
-@pytest.mark.memory
-@pytest.fixture
-def path_notebook(tmpdir):
+def _make_nb(cells):
     nb = nbformat.v4.new_notebook()
-    cells = [
-        "array = [1 for i in range(10**7)]",
-        "array1 = array",
-        "arrays = [array,array1]",
-    ]
     nb.cells = [nbformat.v4.new_code_cell(cell) for cell in cells]
+    return nb
 
-    path_notebook = Path(tmpdir).joinpath("noteboook.ipynb")
-    nbformat.write(nb, path_notebook)
-    return path_notebook
 
+# objects referenced by the namespace, the last result, matplotlib, and the
+# last traceback
+_CELLS = [
+    """\
+import weakref
+from test_memory_release_nb import REFS
 
-def copy_shell(exit_method):
-    def new_exit(self, exc_type, exc_value, traceback):
-        self.user_ns_copy = self._shell.user_ns.keys()
-        self.user_ns_before_deletion = copy.deepcopy(tuple(self.user_ns_copy))
-        exit_method(self, exc_type, exc_value, traceback)
-        self.user_ns_after_deletion = copy.deepcopy(tuple(self.user_ns_copy))
+def register(obj):
+    REFS.append(weakref.ref(obj))
+    return obj
+""",
+    "class Big:\n    pass",
+    "big = Big()\nregister(big)",
+    "register(Big())",
+    "import matplotlib.pyplot as plt\nfig = plt.figure()\nregister(fig)",
+    "def fail(obj):\n    raise ValueError('boom')\n\nfail(register(Big()))",
+]
 
-    return new_exit
 
+def _raise(client):
+    try:
+        client.execute()
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected the notebook to fail")
 
-@pytest.mark.skip(reason="unsure why this started failing")
-def test_if_memory_leak_within_notebook(path_notebook):
-    """
-    epsilon is an amount of memory that is negligeable with respect
-    to the data declared on the test,
-    """
-    mem_usage_start = get_current_memory_usage()
 
-    # memory_usages.append(get_current_memory_usage())
-    client = PloomberClient.from_path(path_notebook)
+def test_releases_references_after_execution(refs):
+    client = PloomberClient(_make_nb(_CELLS))
 
-    PloomberClient.__exit__ = copy_shell(PloomberClient.__exit__)
+    _raise(client)
+    gc.collect()
 
-    new_variables = dict(a=[1 for _ in range(10**7)], b=[1 for _ in range(10**7)])
-    # injecting new variables in namespace
-    namespace = client.get_namespace(namespace=new_variables)
-    # executing notebook with execute method
+    assert len(refs) == 4
+    assert [ref() for ref in refs] == [None] * 4
 
-    nb_node = client.execute()
 
-    mem_usage_before_deletion = get_current_memory_usage()
+def test_releases_references_with_shell_pool(refs):
+    with ShellPool(size=1) as pool:
+        _raise(PloomberClient(_make_nb(_CELLS), shell_pool=pool))
+        gc.collect()
+
+        assert len(refs) == 4
+        assert [ref() for ref in refs] == [None] * 4
 
-    deleted_objets = set(client.user_ns_before_deletion).difference(
-        set(client.user_ns_after_deletion)
-    )
 
-    assert deleted_objets == {"array1", "array", "arrays"}
+def test_release_memory_clears_last_traceback():
+    shell = PloomberShell()
 
-    del nb_node
-    del namespace
-    del client
-    del new_variables
+    try:
+        shell.run_cell("x = 1\n1 / 0")
+        assert sys.last_traceback is not None
 
-    mem_usage_end = get_current_memory_usage()
+        shell.release_memory()
 
-    # mem_rate_consumption represents the rate of memory consumtion after the
-    # beginning until the deletion of  the created variables within the test
-    # (which should be negligeable in case of absence of memory leak) , and
-    # the memory usage from the beginning of the test until the
-    # creation of all the (memory heavy) variables.
-    mem_rate_consumption = (mem_usage_end - mem_usage_start) / (
-        mem_usage_before_deletion - mem_usage_start
+        assert sys.last_traceback is None
+        assert shell.InteractiveTB.tb is None
+        assert shell.last_execution_result is None
+        assert "x" not in shell.user_ns
+    finally:
+        shell.clear_instance()
+
+
+def test_reports_released_memory():
+    pytest.importorskip("psutil")
+    size = 200 * 1024**2
+    client = PloomberClient(
+        _make_nb(["data = bytearray(b'x' * %d)" % size, "len(data)"])
     )
-    print(mem_rate_consumption)
+
+    client.execute()
+
+    assert client.released_memory > size / 2
+
+
+def test_unfreezes_objects_after_execution():
+    PloomberClient(_make_nb(["x = 1"])).execute()
+
+    assert gc.get_freeze_count() == 0
+
+
+def test_does_not_unfreeze_objects_frozen_by_others():
+    gc.freeze()
+
+    try:
+        PloomberClient(_make_nb(["x = 1"])).execute()
+        assert gc.get_freeze_count() > 0
+    finally:
+        gc.unfreeze()
+
+
+def test_freeze_is_shared_by_shells():
+    first, second = PloomberShell(), PloomberShell()
+
+    try:
+        first.freeze_baseline()
+        second.freeze_baseline()
+
+        # the other shell still needs the objects frozen
+        first.release_memory()
+        assert gc.get_freeze_count() > 0
+
+        second.release_memory()
+        assert gc.get_freeze_count() == 0
+    finally:
+        first.clear_instance()
+        second.clear_instance()
@@ -0,0 +1,183 @@
+import time
+import asyncio
+import threading
+
+import pytest
+
+from conftest import _make_nb
+from ploomber_engine import execute_notebook
+from ploomber_engine.parallel import ParallelClient
+from ploomber_engine.ipython import (
+    PloomberClient,
+    CellTimeoutError,
+    MemoryLimitError,
+)
+
+
+def _execute(cells, client_class=ParallelClient, **kwargs):
+    nb = _make_nb(cells, path=None)
+    return client_class(nb, progress_bar=False, **kwargs).execute()
+
+
+def _outputs(nb):
+    return [(cell.execution_count, cell.outputs) for cell in nb.cells]
+
+
+@pytest.mark.parametrize(
+    "cells",
+    [
+        ["a = 1", "b = 2", "a + b"],
+        ["x = [1]", "y = 2", "x.append(y)", "print(x)", "x"],
+        ["print('a')", "print('b')", "display(1)", "'last'"],
+        ["import math", "value = 2", "%time math.sqrt(value)", "value"],
+        ["factor = 2", "def double(x):\n    return x * factor", "double(21)"],
+        ["import sys", "print('err', file=sys.stderr)", "x = 1"],
+        # add() modifies data, print(data) must wait for it
+        [
+            "import time\ndata = []",
+            "def add():\n    time.sleep(0.2)\n    data.append(1)",
+            "add()",
+            "print(data)",
+        ],
+        ["x = 1", *(f"x + {i}" for i in range(8))],
+    ],
+)
+def test_outputs_match_sequential_execution(cells):
+    parallel = _outputs(_execute(cells, max_workers=4))
+    sequential = _outputs(_execute(cells, client_class=PloomberClient))
+
+    # %time output changes between executions
+    if any(c.startswith("%time") for c in cells):
+        for outputs in (parallel, sequential):
+            del outputs[2][1][0]
+
+    assert parallel == sequential
+
+
+def test_executes_independent_cells_concurrently():
+    # both cells wait for the other one to start, this only finishes if they
+    # run at the same time
+    barrier = threading.Barrier(2, timeout=10)
+    cells = ["a = wait()", "b = wait()", "a + b"]
+    nb = _make_nb(cells, path=None)
+    client = ParallelClient(nb, progress_bar=False, max_workers=2)
+
+    with client:
+        client._shell.user_ns["wait"] = barrier.wait
+        out = client._execute()
+
+    assert out.cells[2].outputs[0]["data"] == {"text/plain": "1"}
+
+
+def test_execute_async():
+    cells = [
+        "import time\ntime.sleep(0.2)\na = 1",
+        "import time\ntime.sleep(0.2)\nb = 2",
+        "a + b",
+    ]
+    nb = _make_nb(cells, path=None)
+    client = ParallelClient(nb, progress_bar=False, max_workers=2)
+
+    async def main():
+        return [event async for event in client.execute_async()]
+
+    events = asyncio.run(main())
+
+    assert sorted(e.index for e in events) == [0, 1, 2]
+    assert events[-1].index == 2
+    assert _outputs(nb) == _outputs(_execute(cells, client_class=PloomberClient))
+
+
+def test_dependent_cells_run_in_order():
+    cells = ["x = []", "x.append(1)", "x.append(2)", "x.append(3)", "x"]
+
+    nb = _execute(cells, max_workers=4)
+
+    assert nb.cells[4].outputs[0]["data"] == {"text/plain": "[1, 2, 3]"}
+
+
+def test_error_in_concurrent_cell():
+    cells = ["a = 1", "raise ValueError('boom')", "b = 2", "c = a + b"]
+    nb = _make_nb(cells, path=None)
+    client = ParallelClient(nb, progress_bar=False, max_workers=4)
+
+    with pytest.raises(ValueError, match="boom"):
+        client.execute()
+
+    error = client._nb.cells[3].outputs[-1]
+    assert error["output_type"] == "error"
+    assert error["ename"] == "ValueError"
+    assert "boom" in "\n".join(error["traceback"])
+    assert client._nb.cells[0].metadata["tags"] == ["ploomber-engine-error-cell"]
+    assert client._nb.cells[2].metadata["tags"] == ["ploomber-engine-error-cell"]
+    # cells that depend on the failed one are not executed
+    assert client._nb.cells[5].outputs == []
+
+
+@pytest.mark.parametrize(
+    "kwargs, tags",
+    [
+        [dict(cell_timeout=0.5), []],
+        [dict(timeout=0.5), []],
+        [dict(), ["timeout=0.5"]],
+    ],
+)
+def test_timeout_in_concurrent_cells(kwargs, tags):
+    cells = [
+        "import time",
+        ("code", "for i in range(200):\n    time.sleep(0.05)", dict(tags=tags)),
+        ("code", "for j in range(200):\n    time.sleep(0.05)", dict(tags=tags)),
+    ]
+    nb = _make_nb(cells, path=None)
+    client = ParallelClient(nb, progress_bar=False, max_workers=2, **kwargs)
+    start = time.monotonic()
+
+    with pytest.raises(CellTimeoutError):
+        client.execute()
+
+    assert time.monotonic() - start < 5
+    errors = [
+        cell.outputs[-1]["ename"]
+        for cell in client._nb.cells
+        if cell.cell_type == "code" and cell.outputs
+    ]
+    assert errors == ["CellTimeoutError", "CellTimeoutError"]
+
+
+def test_max_memory_in_concurrent_cells():
+    psutil = pytest.importorskip("psutil")
+    limit = psutil.Process().memory_info().rss / 1048576 + 100
+    cells = [
+        "import time",
+        "a = []\nwhile True:\n    a.append(b'x' * 10_000_000)",
+        "for i in range(200):\n    time.sleep(0.05)",
+    ]
+    nb = _make_nb(cells, path=None)
+    client = ParallelClient(nb, progress_bar=False, max_workers=2, max_memory=limit)
+    start = time.monotonic()
+
+    with pytest.raises(MemoryLimitError, match="memory limit"):
+        client.execute()
+
+    assert time.monotonic() - start < 5
+    errors = [
+        cell.outputs[-1]["ename"]
+        for cell in client._nb.cells
+        if cell.cell_type == "code" and cell.outputs
+    ]
+    assert errors == ["MemoryLimitError", "MemoryLimitError"]
+
+
+def test_execute_notebook_parallel(tmp_empty):
+    _make_nb(["a = 1", "b = 2", "a + b"])
+
+    out = execute_notebook("nb.ipynb", "out.ipynb", parallel=True, progress_bar=False)
+
+    assert out.cells[2].outputs[0]["data"] == {"text/plain": "3"}
+
+
+def test_execute_notebook_parallel_incompatible_options(tmp_empty):
+    _make_nb(["a = 1"])
+
+    with pytest.raises(ValueError, match="parallel cannot be used together"):
+        execute_notebook("nb.ipynb", "out.ipynb", parallel=True, incremental=True)
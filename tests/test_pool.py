@@ -0,0 +1,220 @@
+import os
+import sys
+
+import nbformat
+import pytest
+from nbclient.util import run_sync
+from IPython.core.interactiveshell import InteractiveShell
+
+from conftest import _make_nb, _make_nb_obj
+from ploomber_engine import execute_notebook
+from ploomber_engine.ipython import PloomberClient
+from ploomber_engine.pool import ShellPool, KernelPool
+from ploomber_engine.client import PloomberNotebookClient
+
+
+def test_reuses_shells():
+    pool = ShellPool(size=1)
+
+    shell = pool.acquire()
+    pool.release(shell)
+
+    assert pool.acquire() is shell
+
+
+def test_does_not_leave_active_instance():
+    original = InteractiveShell._instance
+
+    ShellPool(size=2)
+
+    assert InteractiveShell._instance is original
+
+
+def test_grows_when_all_shells_are_in_use():
+    pool = ShellPool(size=1)
+
+    first = pool.acquire()
+    second = pool.acquire()
+    pool.release(first)
+    pool.release(second)
+
+    assert first is not second
+    assert pool.n_idle == 1
+
+
+def test_resets_namespace_between_executions():
+    pool = ShellPool(size=1)
+
+    PloomberClient(_make_nb_obj(["some_variable = 1"]), shell_pool=pool).execute()
+
+    with pytest.raises(NameError):
+        PloomberClient(
+            _make_nb_obj(["print(some_variable)"]), shell_pool=pool
+        ).execute()
+
+
+@pytest.mark.parametrize("lean", [False, True])
+def test_clears_output_cache_between_executions(lean):
+    pool = ShellPool(size=1, lean=lean)
+
+    PloomberClient(_make_nb_obj(["'first'", "'second'"]), shell_pool=pool).execute()
+    nb = PloomberClient(
+        _make_nb_obj(["print(dict(Out), dict(_oh), repr(_), repr(__), repr(___))"]),
+        shell_pool=pool,
+    ).execute()
+
+    assert nb.cells[0].outputs[0]["text"] == "{} {} '' '' ''\n"
+
+
+def test_keeps_setup_namespace():
+    pool = ShellPool(size=1, setup="from math import pi\nx = 1")
+
+    PloomberClient(_make_nb_obj(["x = 2\ny = 3"]), shell_pool=pool).execute()
+    nb = PloomberClient(_make_nb_obj(["print(pi, x)"]), shell_pool=pool).execute()
+
+    assert nb.cells[0].outputs[0]["text"] == "3.141592653589793 1\n"
+
+
+def test_restores_cwd_and_sys_path(tmp_empty):
+    pool = ShellPool(size=1)
+    sys_path = list(sys.path)
+    os.mkdir("subdir")
+
+    code = "import os, sys\nsys.path.append('something')\nos.chdir('subdir')"
+    PloomberClient(_make_nb_obj([code]), shell_pool=pool).execute()
+
+    assert os.getcwd() == tmp_empty
+    assert sys.path == sys_path
+
+
+def test_execute_notebook_with_shell_pool(tmp_empty):
+    _make_nb(["x = 1", "x + 41"])
+
+    with ShellPool(size=1) as pool:
+        execute_notebook("nb.ipynb", "out.ipynb", shell_pool=pool)
+        execute_notebook("nb.ipynb", "out.ipynb", shell_pool=pool)
+
+    nb = nbformat.read("out.ipynb", as_version=nbformat.NO_CONVERT)
+    assert nb.cells[1].outputs[0]["data"] == {"text/plain": "42"}
+    assert pool.n_idle == 0
+
+
+def test_error_if_invalid_size():
+    with pytest.raises(ValueError) as excinfo:
+        ShellPool(size=0)
+
+    assert "size must be at least 1" in str(excinfo.value)
+
+
+def _execute_in_pool(pool, cells, **kwargs):
+    nb = _make_nb_obj(cells)
+    return PloomberNotebookClient(nb, kernel_pool=pool, **kwargs).execute()
+
+
+def _pid(pool):
+    out = _execute_in_pool(pool, ["import os; os.getpid()"])
+    return out.cells[0].outputs[0]["data"]["text/plain"]
+
+
+@pytest.fixture
+def kernel_pool():
+    pytest.importorskip("ipykernel")
+
+    with KernelPool(size=1) as pool:
+        yield pool
+
+
+def test_kernel_pool_reuses_kernels(kernel_pool):
+    assert _pid(kernel_pool) == _pid(kernel_pool)
+    assert kernel_pool.n_idle == 1
+
+
+def test_kernel_pool_resets_namespace(kernel_pool):
+    _execute_in_pool(kernel_pool, ["x = 1"])
+
+    out = _execute_in_pool(kernel_pool, ["'x' in globals()"])
+
+    assert out.cells[0].outputs[0]["data"] == {"text/plain": "False"}
+
+
+def test_kernel_pool_changes_cwd(kernel_pool, tmp_path):
+    out = _execute_in_pool(
+        kernel_pool,
+        ["import os; print(os.getcwd())"],
+        resources=dict(metadata=dict(path=str(tmp_path))),
+    )
+
+    assert out.cells[0].outputs[0]["text"] == f"{tmp_path}\n"
+
+
+def test_kernel_pool_replaces_dead_kernels(kernel_pool):
+    pid = _pid(kernel_pool)
+    km = kernel_pool.acquire()
+    run_sync(km.shutdown_kernel)(now=True)
+    kernel_pool.release(km)
+
+    assert _pid(kernel_pool) != pid
+
+
+def test_kernel_pool_max_uses():
+    pytest.importorskip("ipykernel")
+
+    with KernelPool(size=1, max_uses=2) as pool:
+        pids = [_pid(pool) for _ in range(3)]
+
+    assert pids[0] == pids[1]
+    assert pids[1] != pids[2]
+
+
+def test_kernel_pool_does_not_replace_kernels_if_full(monkeypatch):
+    pytest.importorskip("ipykernel")
+
+    with KernelPool(size=1, max_uses=1) as pool:
+        first, second = pool.acquire(), pool.acquire()
+        pool.release(first)
+
+        started = []
+        start = pool._async_start_kernel
+
+        async def _async_start_kernel():
+            km = await start()
+            started.append(km)
+            return km
+
+        monkeypatch.setattr(pool, "_async_start_kernel", _async_start_kernel)
+        pool.release(second)
+
+        assert not started
+        assert not run_sync(second.is_alive)()
+        assert pool.n_idle == 1
+        assert pool._uses == {pool._idle[0]: 0}
+
+
+def test_kernel_pool_max_rss():
+    pytest.importorskip("ipykernel")
+
+    with KernelPool(size=1, max_rss=1) as pool:
+        pids = [_pid(pool) for _ in range(2)]
+
+    assert pids[0] != pids[1]
+
+
+def test_kernel_pool_close():
+    pytest.importorskip("ipykernel")
+
+    pool = KernelPool(size=2)
+    kernels = [pool.acquire(), pool.acquire()]
+
+    for km in kernels:
+        pool.release(km)
+
+    assert pool.n_idle == 2
+    pool.close()
+
+    assert pool.n_idle == 0
+    assert not any(run_sync(km.is_alive)() for km in kernels)
+
+
+def test_kernel_pool_error_if_invalid_size():
+    with pytest.raises(ValueError, match="size must be at least 1"):
+        KernelPool(size=0)
@@ -0,0 +1,96 @@
+import json
+import tracemalloc
+from pathlib import Path
+
+import pytest
+import nbformat
+
+from ploomber_engine._reader import read_without_outputs
+
+
+def _remove_outputs(nb):
+    for cell in nb.cells:
+        if "outputs" in cell:
+            cell.outputs = []
+
+    return nb
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        "crash.ipynb",
+        "debuglater.ipynb",
+        "different-outputs.ipynb",
+        "profiling.ipynb",
+        "sample.ipynb",
+    ],
+)
+def test_matches_nbformat(tmp_assets, name):
+    expected = _remove_outputs(nbformat.read(name, as_version=nbformat.NO_CONVERT))
+    assert read_without_outputs(name) == expected
+
+
+def _make_nb_with_outputs(size):
+    nb = nbformat.v4.new_notebook(metadata={"language_info": {"name": "python"}})
+    cell = nbformat.v4.new_code_cell('print("a \\"quoted\\" [string] {")\n1 + 1')
+    cell.outputs = [
+        nbformat.v4.new_output(
+            "display_data",
+            data={"image/png": "A" * size, "text/plain": 'with "quotes" and ]}'},
+            metadata={"nested": [{"a": [1, 2.5, None, True]}]},
+        ),
+        nbformat.v4.new_output("stream", name="stdout", text="\\ [{\n"),
+        nbformat.v4.new_output("stream", name="stderr", text="trailing \\"),
+    ]
+    nb.cells = [
+        nbformat.v4.new_markdown_cell('# {title} [with] "brackets"'),
+        cell,
+        nbformat.v4.new_raw_cell("raw"),
+    ]
+    return nb
+
+
+def test_skips_outputs(tmp_empty):
+    nb = _make_nb_with_outputs(size=100)
+    nbformat.write(nb, "nb.ipynb")
+
+    out = read_without_outputs("nb.ipynb")
+
+    assert out == _remove_outputs(nb)
+    assert out.cells[1].source == 'print("a \\"quoted\\" [string] {")\n1 + 1'
+
+
+def test_does_not_load_outputs(tmp_empty):
+    size = 50_000_000
+    nbformat.write(_make_nb_with_outputs(size=size), "nb.ipynb")
+
+    tracemalloc.start()
+
+    try:
+        read_without_outputs("nb.ipynb")
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert peak < size / 10
+
+
+def test_falls_back_to_nbformat_for_other_versions(tmp_empty):
+    Path("nb.ipynb").write_text(
+        json.dumps(
+            {"nbformat": 3, "nbformat_minor": 0, "metadata": {}, "worksheets": []}
+        )
+    )
+
+    assert read_without_outputs("nb.ipynb") == nbformat.read(
+        "nb.ipynb", as_version=nbformat.NO_CONVERT
+    )
+
+
+@pytest.mark.parametrize("content", ["", "{", '{"cells": [}'])
+def test_invalid_json_raises_nbformat_error(tmp_empty, content):
+    Path("nb.ipynb").write_text(content)
+
+    with pytest.raises(nbformat.reader.NotJSONError):
+        read_without_outputs("nb.ipynb")
@@ -0,0 +1,144 @@
+import base64
+import copy
+from pathlib import Path
+
+import pytest
+import nbformat
+
+from conftest import _make_nb, _read_nb
+from ploomber_engine import execute_notebook
+from ploomber_engine.spill import spill_outputs, inline_outputs
+from ploomber_engine.writer import NotebookWriter
+from ploomber_engine.ipython import PloomberClient
+
+_PNG = base64.b64encode(b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 10).decode()
+
+
+def _make_executed_nb():
+    nb = nbformat.v4.new_notebook()
+    cell = nbformat.v4.new_code_cell("plot()")
+    cell.outputs = [
+        nbformat.v4.new_output("stream", name="stdout", text="log line\n" * 100),
+        nbformat.v4.new_output(
+            "display_data",
+            data={"image/png": _PNG, "text/plain": "<Figure>"},
+        ),
+        nbformat.v4.new_output(
+            "execute_result",
+            data={"application/json": {"values": list(range(100))}},
+            execution_count=1,
+        ),
+        nbformat.v4.new_output("stream", name="stdout", text="small\n"),
+    ]
+    nb.cells = [nbformat.v4.new_markdown_cell("# title"), cell]
+    return nb
+
+
+def test_spill_and_inline_roundtrip(tmp_empty):
+    nb = _make_executed_nb()
+    original = copy.deepcopy(nb)
+
+    spill_outputs(nb, "outputs", max_size=100)
+    outputs = nb.cells[1].outputs
+
+    assert outputs[0]["text"].startswith("[output stored in outputs/")
+    assert outputs[1]["data"] == {"text/plain": "<Figure>"}
+    assert outputs[1]["metadata"]["ploomber"]["spilled"]["image/png"].endswith(".png")
+    assert outputs[2]["data"] == {}
+    assert outputs[3]["text"] == "small\n"
+    nbformat.validate(nb)
+
+    # images are stored decoded
+    path = outputs[1]["metadata"]["ploomber"]["spilled"]["image/png"]
+    assert Path(path).read_bytes() == base64.b64decode(_PNG)
+
+    assert inline_outputs(nb) == original
+
+
+def test_spill_limits_per_mime_type(tmp_empty):
+    nb = _make_executed_nb()
+
+    spill_outputs(nb, "outputs", max_size={"image/png": 100})
+    outputs = nb.cells[1].outputs
+
+    assert outputs[0]["text"] == "log line\n" * 100
+    assert set(outputs[1]["data"]) == {"text/plain"}
+    assert outputs[2]["data"] == {"application/json": {"values": list(range(100))}}
+
+
+def test_spill_stores_identical_outputs_once(tmp_empty):
+    nb = _make_executed_nb()
+    nb.cells.append(copy.deepcopy(nb.cells[1]))
+
+    spill_outputs(nb, "outputs", max_size=100)
+
+    assert nb.cells[1].outputs == nb.cells[2].outputs
+    assert len(list(Path("outputs").iterdir())) == 3
+
+
+def test_inline_outputs_from_path(tmp_empty):
+    Path("dir").mkdir()
+    nb = _make_executed_nb()
+    original = copy.deepcopy(nb)
+    spill_outputs(nb, Path("dir", "outputs"), max_size=100, root="dir")
+    nbformat.write(nb, Path("dir", "out.ipynb"))
+
+    assert (
+        inline_outputs(Path("dir", "out.ipynb"), directory=Path("dir", "outputs"))
+        == original
+    )
+
+
+@pytest.mark.parametrize(
+    "reference",
+    ["secret.txt", "../secret.txt", "outputs/../secret.txt", "/etc/hostname"],
+)
+def test_inline_outputs_rejects_files_outside_the_directory(tmp_empty, reference):
+    Path("secret.txt").write_text("secret")
+    nb = _make_executed_nb()
+    spill_outputs(nb, "outputs", max_size=100)
+    nb.cells[1].outputs[0]["text"] = f"[output stored in {reference}]\n"
+
+    with pytest.raises(ValueError, match="not in the outputs directory"):
+        inline_outputs(nb, directory="outputs")
+
+
+def test_inline_outputs_checks_the_hash(tmp_empty):
+    nb = _make_executed_nb()
+    spill_outputs(nb, "outputs", max_size=100)
+    path = nb.cells[1].outputs[1]["metadata"]["ploomber"]["spilled"]["image/png"]
+    Path(path).write_bytes(b"modified")
+
+    with pytest.raises(ValueError, match="does not match its hash"):
+        inline_outputs(nb, directory="outputs")
+
+
+def test_execute_notebook_max_output_size(tmp_empty):
+    _make_nb(["print('x' * 1000)", "print('y')"])
+
+    out = execute_notebook("nb.ipynb", "out.ipynb", max_output_size=100)
+
+    written = _read_nb("out.ipynb")
+    assert written == out
+    assert (
+        written.cells[0].outputs[0]["text"].startswith("[output stored in out-outputs/")
+    )
+    assert written.cells[1].outputs[0]["text"] == "y\n"
+    assert inline_outputs("out.ipynb").cells[0].outputs[0]["text"] == "x" * 1000 + "\n"
+
+
+def test_writer_spills_outputs(tmp_empty):
+    nb = _make_nb(["print('x' * 1000)", "print('y')"], path=None)
+    writer = NotebookWriter("out.ipynb", interval=0, max_output_size=100)
+
+    out = PloomberClient(nb, writer=writer).execute()
+
+    assert out.cells[0].outputs[0]["text"].startswith("[output stored in out-outputs/")
+    assert _read_nb("out.ipynb") == out
+
+
+def test_execute_notebook_max_output_size_requires_output_path(tmp_empty):
+    _make_nb(["1"])
+
+    with pytest.raises(ValueError, match="requires output_path"):
+        execute_notebook("nb.ipynb", None, max_output_size=100)
@@ -1,6 +1,9 @@
 from conftest import _make_nb_obj
 
+import ctypes.util
+
 import pytest
+from ploomber_engine import _util
 from ploomber_engine._util import parametrize_notebook, add_debuglater_cells
 
 
@@ -108,3 +111,23 @@ def test_add_debuglater_cells(nb, idx, cells_total):
     assert "\npatch_ipython()\n" in nb.cells[idx].source
     assert nb.cells[idx].metadata.tags == ["injected-debuglater"]
     assert len(nb.cells) == cells_total
+
+
+def test_malloc_trim_finds_the_library_once(monkeypatch):
+    calls = []
+    find_library = ctypes.util.find_library
+
+    def find_library_and_count(name):
+        calls.append(name)
+        return find_library(name)
+
+    monkeypatch.setattr(ctypes.util, "find_library", find_library_and_count)
+    _util._malloc_trim_function.cache_clear()
+
+    try:
+        for _ in range(3):
+            _util.malloc_trim()
+    finally:
+        _util._malloc_trim_function.cache_clear()
+
+    assert calls == ["c"]
@@ -0,0 +1,167 @@
+import os
+import signal
+
+import pytest
+
+from conftest import _make_nb
+from ploomber_engine.worker import Worker, WorkerCrashedError
+
+
+@pytest.fixture(scope="module")
+def worker():
+    with Worker(preload=["json"], setup="shared = 41") as worker:
+        yield worker
+
+
+def test_execute(worker):
+    nb = _make_nb(["import sys; print('json' in sys.modules)", "shared + 1"], None)
+
+    out = worker.execute(nb, progress_bar=False)
+
+    assert out is nb
+    assert out.cells[0].outputs[0]["text"] == "True\n"
+    assert out.cells[1].outputs[0]["data"] == {"text/plain": "42"}
+
+
+def test_runs_in_another_process(worker):
+    nb = _make_nb(["import os; os.getpid()"], None)
+
+    out = worker.execute(nb, progress_bar=False)
+
+    assert out.cells[0].outputs[0]["data"] == {"text/plain": str(worker.pid)}
+    assert worker.pid != os.getpid()
+
+
+def test_streams_executed_cells(worker):
+    executed = []
+
+    def on_cell_executed(index, cell):
+        executed.append((index, cell.outputs[0]["data"]["text/plain"]))
+
+    nb = _make_nb(["1", ("markdown", "# Title", {}), "2"], None)
+
+    worker.execute(nb, on_cell_executed=on_cell_executed, progress_bar=False)
+
+    assert executed == [(0, "1"), (2, "2")]
+
+
+def test_streams_outputs_of_running_cell(worker, tmp_path):
+    received_path = tmp_path / "received"
+    source = f"""\
+import time
+from pathlib import Path
+print('started')
+path = Path({str(received_path)!r})
+for _ in range(200):
+    if path.exists():
+        break
+    time.sleep(0.05)
+print(path.exists())
+display(1)"""
+    received = []
+
+    def on_output(index, output):
+        received.append((index, output["output_type"], output.get("text")))
+        # the cell waits until the parent receives its first output
+        received_path.touch()
+
+    out = worker.execute(
+        _make_nb([source], None), on_output=on_output, progress_bar=False
+    )
+
+    assert received == [
+        (0, "stream", "started"),
+        (0, "stream", "\n"),
+        (0, "stream", "True"),
+        (0, "stream", "\n"),
+        (0, "display_data", None),
+    ]
+    assert out.cells[0].outputs[0]["text"] == "started\nTrue\n"
+    assert out.cells[0].outputs[1]["data"] == {"text/plain": "1"}
+
+
+def test_keeps_outputs_sent_before_crash(worker):
+    nb = _make_nb(["print('before crash')\nimport os\nos._exit(1)"], None)
+
+    with pytest.raises(WorkerCrashedError):
+        worker.execute(nb, progress_bar=False)
+
+    assert nb.cells[0].outputs[0]["text"] == "before crash\n"
+    assert nb.cells[0].outputs[1]["ename"] == "WorkerCrashedError"
+
+
+def test_passes_client_arguments(worker):
+    nb = _make_nb([("code", "1 / 0", dict(tags=["remove"])), "1 + 1"], None)
+
+    out = worker.execute(nb, progress_bar=False, remove_tagged_cells="remove")
+
+    assert len(out.cells) == 1
+    assert out.cells[0].outputs[0]["data"] == {"text/plain": "2"}
+
+
+def test_raises_notebook_exception(worker):
+    nb = _make_nb(["x = 1", "1 / 0"], None)
+
+    with pytest.raises(ZeroDivisionError) as excinfo:
+        worker.execute(nb, progress_bar=False)
+
+    assert "Traceback" in str(excinfo.value.__cause__)
+    # the notebook is updated in place, including the error cells
+    assert nb.cells[3].outputs[0]["ename"] == "ZeroDivisionError"
+
+    # the worker is still usable
+    out = worker.execute(_make_nb(["1 + 1"], None), progress_bar=False)
+    assert out.cells[0].outputs[0]["data"] == {"text/plain": "2"}
+
+
+@pytest.mark.parametrize(
+    "source, exitcode",
+    [
+        ["import sys; sys.exit(3)", 3],
+        ["import os; os._exit(1)", 1],
+        pytest.param(
+            "import os, signal; os.kill(os.getpid(), signal.SIGSEGV)",
+            -signal.SIGSEGV,
+            marks=pytest.mark.skipif(os.name == "nt", reason="requires SIGSEGV"),
+        ),
+    ],
+    ids=["sys-exit", "os-exit", "segfault"],
+)
+def test_survives_crash(worker, source, exitcode):
+    pid = worker.pid
+    nb = _make_nb(["x = 1", "print(x)", source, "x + 1"], None)
+
+    with pytest.raises(WorkerCrashedError) as excinfo:
+        worker.execute(nb, progress_bar=False)
+
+    error = excinfo.value
+    assert error.exitcode == exitcode
+    assert error.cell_index == 2
+    assert error.nb is nb
+    assert nb.cells[1].outputs[0]["text"] == "1\n"
+    assert nb.cells[2].outputs[-1]["output_type"] == "error"
+    assert nb.cells[3].outputs == []
+    assert worker.pid is None
+
+    # a new process is started for the next execution
+    out = worker.execute(_make_nb(["shared"], None), progress_bar=False)
+    assert out.cells[0].outputs[0]["data"] == {"text/plain": "41"}
+    assert worker.pid != pid
+
+
+def test_starts_lazily():
+    worker = Worker()
+
+    try:
+        assert worker.pid is None
+        out = worker.execute(_make_nb(["1 + 1"], None), progress_bar=False)
+        assert out.cells[0].outputs[0]["data"] == {"text/plain": "2"}
+    finally:
+        worker.stop()
+
+    assert worker.pid is None
+
+
+def test_setup_error():
+    with pytest.raises(RuntimeError, match="Failed to start worker"):
+        Worker(setup="1 / 0").start()
@@ -0,0 +1,133 @@
+import os
+import stat
+from pathlib import Path
+
+import pytest
+
+from conftest import _make_nb, _read_nb
+from ploomber_engine import execute_notebook
+from ploomber_engine.ipython import PloomberClient
+from ploomber_engine.parallel import ParallelClient
+from ploomber_engine.incremental import IncrementalClient
+from ploomber_engine.writer import NotebookWriter
+
+
+def _outputs(nb):
+    return [(c.execution_count, c.outputs) for c in nb.cells]
+
+
+def test_writes_notebook_while_executing(tmp_empty):
+    nb = _make_nb(
+        [
+            "from pathlib import Path\nfrom conftest import _read_nb",
+            "print('hello')",
+            # the output notebook already contains the previous cells
+            "written = _read_nb('out.ipynb')\nwritten.cells[1].outputs[0]['text']",
+        ],
+        path=None,
+    )
+    writer = NotebookWriter("out.ipynb", interval=0)
+
+    out = PloomberClient(nb, writer=writer).execute()
+
+    assert out.cells[2].outputs[0]["data"] == {"text/plain": "'hello\\n'"}
+    assert _outputs(_read_nb("out.ipynb")) == _outputs(out)
+    # the spool file is deleted after finishing
+    assert not Path("out-outputs.jsonl").exists()
+
+
+def test_does_not_rewrite_before_interval(tmp_empty):
+    nb = _make_nb(["1", "2"], path=None)
+    writer = NotebookWriter("out.ipynb", interval=3600)
+    writes = []
+    original = writer._write
+
+    def _write(nb):
+        writes.append(nb)
+        original(nb)
+
+    writer._write = _write
+
+    PloomberClient(nb, writer=writer).execute()
+
+    # when starting and when finishing
+    assert len(writes) == 2
+
+
+def test_drop_outputs(tmp_empty):
+    cells = ["print('a')", "'b'", "from IPython.display import HTML\nHTML('<p>c</p>')"]
+    expected = PloomberClient(_make_nb(cells, path=None)).execute()
+    writer = NotebookWriter("out.ipynb", interval=0, drop_outputs=True)
+
+    out = PloomberClient(_make_nb(cells, path=None), writer=writer).execute()
+
+    assert all(cell.outputs == [] for cell in out.cells)
+    assert _outputs(_read_nb("out.ipynb")) == _outputs(expected)
+
+
+@pytest.mark.parametrize(
+    "make_client",
+    [
+        lambda nb, writer: ParallelClient(nb, writer=writer, max_workers=2),
+        lambda nb, writer: IncrementalClient(nb, writer=writer, cache_dir="cache"),
+    ],
+    ids=["parallel", "incremental"],
+)
+def test_drop_outputs_custom_clients(tmp_empty, make_client):
+    cells = ["a = 1", "b = 2", "print(a)", "b"]
+    expected = PloomberClient(_make_nb(cells, path=None)).execute()
+
+    for _ in range(2):
+        # the second time, IncrementalClient restores all the cells
+        writer = NotebookWriter("out.ipynb", interval=0, drop_outputs=True)
+        out = make_client(_make_nb(cells, path=None), writer).execute()
+
+        assert all(cell.outputs == [] for cell in out.cells)
+        assert _outputs(_read_nb("out.ipynb")) == _outputs(expected)
+
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX file modes")
+def test_written_notebook_mode(tmp_empty):
+    umask = os.umask(0)
+    os.umask(umask)
+
+    def execute():
+        nb = _make_nb(["1"], path=None)
+        PloomberClient(nb, writer=NotebookWriter("out.ipynb", interval=0)).execute()
+        return stat.S_IMODE(os.stat("out.ipynb").st_mode)
+
+    # new files get the default mode
+    assert execute() == 0o666 & ~umask
+
+    # existing files keep their mode
+    os.chmod("out.ipynb", 0o640)
+    assert execute() == 0o640
+
+
+def test_writes_partial_notebook_on_error(tmp_empty):
+    nb = _make_nb(["print('a')", "raise ValueError('boom')", "1"], path=None)
+    writer = NotebookWriter("out.ipynb", interval=3600, drop_outputs=True)
+
+    with pytest.raises(ValueError):
+        PloomberClient(nb, writer=writer).execute()
+
+    written = _read_nb("out.ipynb")
+    assert written.cells[1].outputs[0]["text"] == "a\n"
+    assert written.cells[3].outputs[0]["ename"] == "ValueError"
+    assert written.cells[2].metadata["tags"] == ["ploomber-engine-error-cell"]
+
+
+def test_execute_notebook_write_interval(tmp_empty):
+    _make_nb(["x = 1", "print(x)"])
+
+    out = execute_notebook("nb.ipynb", "out.ipynb", write_interval=0, drop_outputs=True)
+
+    assert out.cells[1].outputs == []
+    assert _read_nb("out.ipynb").cells[1].outputs[0]["text"] == "1\n"
+
+
+def test_execute_notebook_drop_outputs_requires_write_interval(tmp_empty):
+    _make_nb(["x = 1"])
+
+    with pytest.raises(ValueError, match="requires write_interval"):
+        execute_notebook("nb.ipynb", "out.ipynb", drop_outputs=True)